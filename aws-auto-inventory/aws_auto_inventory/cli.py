@@ -5,13 +5,23 @@ import os
 import sys
 import argparse
 import logging
+from datetime import datetime
 from typing import List, Optional
 
 import boto3
 
 from .config.loader import ConfigLoader
 from .config.validator import ConfigValidator
+from .core.async_engine import AsyncScanEngine
+from .core.checkpoint import CheckpointJournal
+from .core.credentials import CACHE_KEY_ENV, CredentialBroker
+from .core.incremental import DeltaTracker
+from .core.metrics import MetricsCollector
+from .core.planner import ScanPlanner
 from .core.scan_engine import ScanEngine
+from .core.scheduler import DurationHistory, PriorityScheduler
+from .output.jsonl import JsonlSink
+from .output.parquet import ParquetSink
 from .output.processor import OutputProcessor
 from .utils.logging import setup_logging
 
@@ -59,8 +69,14 @@ def parse_args() -> argparse.Namespace:
     )
     
     parser.add_argument(
-        "-f", "--format", choices=["json", "excel", "both"], default="json",
-        help="Output format (default: json)"
+        "-f", "--format", choices=["json", "excel", "both", "jsonl", "parquet"], default="json",
+        help="Output format. jsonl streams each result to disk as soon as it is "
+             "scanned; parquet writes one partitioned table per sheet (default: json)"
+    )
+    
+    parser.add_argument(
+        "--compression", choices=["gzip", "zstd"], default=None,
+        help="Compression of jsonl output (default: none)"
     )
     
     parser.add_argument(
@@ -68,6 +84,16 @@ def parse_args() -> argparse.Namespace:
         help="Maximum number of regions to scan concurrently"
     )
     
+    parser.add_argument(
+        "--max-accounts", type=int, default=None,
+        help="Maximum number of accounts to scan concurrently in organization scans"
+    )
+    
+    parser.add_argument(
+        "--max-total-regions", type=int, default=None,
+        help="Maximum number of region scans in flight across all accounts in organization scans"
+    )
+    
     parser.add_argument(
         "--max-services", type=int, default=None,
         help="Maximum number of services to scan concurrently per region"
@@ -80,7 +106,85 @@ def parse_args() -> argparse.Namespace:
     
     parser.add_argument(
         "--retry-delay", type=int, default=2,
-        help="Base delay in seconds between retries (default: 2)"
+        help="Base delay in seconds of the jittered backoff between retries (default: 2)"
+    )
+    
+    parser.add_argument(
+        "--max-rate", type=float, default=20.0,
+        help="Maximum API requests per second for each account, region and service; "
+             "reduced automatically when throttled (default: 20)"
+    )
+    
+    parser.add_argument(
+        "--state-file", default=None,
+        help="Fingerprint file for incremental scans. Only resources added, changed or "
+             "removed since the previous scan are output, and sheets whose ttl has not "
+             "expired are skipped"
+    )
+    
+    parser.add_argument(
+        "--cache-dir", default=None,
+        help="Directory caching enabled regions, service availability and call durations "
+             "(default: <output-dir>/cache)"
+    )
+    
+    parser.add_argument(
+        "--cache-ttl", type=int, default=86400,
+        help="Seconds before cached regions and service availability are refreshed (default: 86400)"
+    )
+    
+    parser.add_argument(
+        "--checkpoint-dir", default=None,
+        help="Directory of the journals recording the work completed by each run "
+             "(default: <output-dir>/checkpoints)"
+    )
+    
+    parser.add_argument(
+        "--resume", metavar="RUN_ID", default=None,
+        help="Resume an interrupted run, scanning only the account, region and sheet "
+             "units missing from its checkpoint journal"
+    )
+    
+    parser.add_argument(
+        "--role-duration", type=int, default=3600,
+        help="Lifetime in seconds of the credentials of roles assumed in member accounts; "
+             "they are refreshed automatically when a scan outlives them (default: 3600)"
+    )
+    
+    parser.add_argument(
+        "--credential-cache", default=None,
+        help=f"File caching assumed role credentials between organization scans, "
+             f"encrypted with the Fernet key in ${CACHE_KEY_ENV} (default: no cache)"
+    )
+    
+    parser.add_argument(
+        "--engine", choices=["threads", "async", "priority"], default="threads",
+        help="Scan engine: nested thread pools per account and region, one event loop "
+             "scheduling every call, or one pool of workers running the calls that took "
+             "longest in previous scans first (default: threads)"
+    )
+    
+    parser.add_argument(
+        "--max-concurrency", type=int, default=64,
+        help="Maximum number of API calls in flight with the async and priority engines "
+             "(default: 64)"
+    )
+    
+    parser.add_argument(
+        "--metrics-file", default=None,
+        help="Write per-call duration, page, byte, retry, throttle and queue wait metrics "
+             "to this file in the Prometheus text format after the scan"
+    )
+    
+    parser.add_argument(
+        "--metrics-port", type=int, default=None,
+        help="Serve the metrics for Prometheus to scrape on this port during the scan"
+    )
+    
+    parser.add_argument(
+        "--metrics-host", default="127.0.0.1",
+        help="Address the metrics port listens on, e.g. 0.0.0.0 for every "
+             "interface (default: 127.0.0.1)"
     )
     
     parser.add_argument(
@@ -106,6 +210,10 @@ def main() -> int:
     # Parse command-line arguments
     args = parse_args()
     
+    if args.compression and args.format != "jsonl":
+        print(f"Error: --compression only applies to jsonl output, not {args.format}")
+        return 1
+    
     # Set up logging
     log_dir = os.path.join(args.output_dir, "logs")
     logger = setup_logging(log_dir, args.log_level)
@@ -153,13 +261,92 @@ def main() -> int:
         if args.format in ["excel", "both"]:
             formats.append("excel")
         
+        # Assumed role credentials, optionally cached on disk between runs
+        try:
+            credential_broker = CredentialBroker(
+                duration_seconds=args.role_duration,
+                cache_path=args.credential_cache,
+                cache_key=os.environ.get(CACHE_KEY_ENV)
+            )
+        except ValueError as e:
+            logger.error(f"Error setting up credential cache: {e}")
+            print(f"Error setting up credential cache: {e}")
+            return 1
+        
+        # Journal completed work so an interrupted run can be resumed
+        try:
+            checkpoint = CheckpointJournal(
+                args.checkpoint_dir or os.path.join(args.output_dir, "checkpoints"),
+                run_id=args.resume
+            )
+        except ValueError as e:
+            logger.error(str(e))
+            print(f"Error resuming run: {e}")
+            return 1
+        logger.info(f"Run ID: {checkpoint.run_id}")
+        
+        # Stream results to disk as they are scanned instead of keeping them in memory
+        timestamp = datetime.now().isoformat(timespec="minutes").replace(":", "-")
+        if args.format == "jsonl":
+            try:
+                sink = JsonlSink(
+                    os.path.join(args.output_dir, f"scan_results_{timestamp}.jsonl"),
+                    compression=args.compression
+                )
+            except ValueError as e:
+                logger.error(f"Error setting up JSONL output: {e}")
+                print(f"Error setting up JSONL output: {e}")
+                return 1
+        elif args.format == "parquet":
+            try:
+                sink = ParquetSink(os.path.join(args.output_dir, f"scan_results_{timestamp}"))
+            except ValueError as e:
+                logger.error(f"Error setting up Parquet output: {e}")
+                print(f"Error setting up Parquet output: {e}")
+                return 1
+        else:
+            # JSON and Excel are written in parallel with the scan
+            try:
+                sink = OutputProcessor(os.path.join(args.output_dir, f"scan_results_{timestamp}"), formats, config)
+            except ValueError as e:
+                logger.error(f"Error setting up output: {e}")
+                print(f"Error setting up output: {e}")
+                return 1
+        
+        # Measure every API call, to find slow and throttled services
+        metrics = MetricsCollector()
+        metrics_server = metrics.serve(args.metrics_port, args.metrics_host) if args.metrics_port else None
+        
         # Create scan engine
-        scan_engine = ScanEngine(
+        cache_dir = args.cache_dir or os.path.join(args.output_dir, "cache")
+        engine_options = dict(
             max_retries=args.max_retries,
             retry_delay=args.retry_delay,
             max_workers_regions=args.max_regions,
-            max_workers_services=args.max_services
+            max_workers_services=args.max_services,
+            max_workers_accounts=args.max_accounts,
+            max_workers_total=args.max_total_regions,
+            max_rate=args.max_rate,
+            sink=sink,
+            retain_results=False,
+            delta_tracker=DeltaTracker(args.state_file) if args.state_file else None,
+            planner=ScanPlanner(cache_dir, ttl=args.cache_ttl),
+            credential_broker=credential_broker,
+            checkpoint=checkpoint,
+            metrics=metrics
         )
+        if args.engine == "async":
+            scan_engine = AsyncScanEngine(max_concurrency=args.max_concurrency, **engine_options)
+        elif args.engine == "priority":
+            scan_engine = ScanEngine(
+                scheduler=PriorityScheduler(
+                    max_workers=args.max_concurrency,
+                    history=DurationHistory(os.path.join(cache_dir, "durations.json"))
+                ),
+                **engine_options
+            )
+        else:
+            scan_engine = ScanEngine(**engine_options)
         
         # Run scan
         logger.info("Starting scan")
@@ -168,12 +355,29 @@ def main() -> int:
         except Exception as e:
             logger.error(f"Error during scan: {e}")
             print(f"Error during scan: {e}")
+            print(f"Resume the scan with --resume {checkpoint.run_id}")
             return 1
+        finally:
+            if scan_engine.scheduler is not None:
+                scan_engine.scheduler.shutdown()
+            checkpoint.close()
+            sink.close()
+            if metrics_server is not None:
+                metrics_server.shutdown()
+            if args.metrics_file:
+                metrics.write_prometheus(args.metrics_file)
+        
+        logger.info(f"API call summary:\n{metrics.format_summary()}")
+        
+        # Failed units are not journaled, so keep the journal to scan them on resume
+        if any(result.has_failures() for result in results):
+            logger.warning(f"Scan completed with failures, resume run {checkpoint.run_id} to retry them")
+            print(f"Scan completed with failures. Results stored in {args.output_dir}")
+            print(f"Retry the failed units with --resume {checkpoint.run_id}")
+            return 0
         
-        # Process output
-        logger.info("Processing output")
-        output_processor = OutputProcessor()
-        output_processor.process(results, args.output_dir, formats)
+        # The run is complete, nothing is left to resume
+        checkpoint.remove()
         
         logger.info("Scan completed successfully")
         print(f"Scan completed successfully. Results stored in {args.output_dir}")
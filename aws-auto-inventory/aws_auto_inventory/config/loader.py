@@ -4,10 +4,15 @@ Configuration loader for AWS Auto Inventory.
 import os
 import json
 import yaml
+import logging
 from typing import Union, Dict, Any
 
+from ..core.query import QuerySyntaxError, compile_query
 from .models import Config
 
+# Set up logger
+logger = logging.getLogger(__name__)
+
 
 class ConfigLoader:
     """
@@ -45,7 +50,33 @@ class ConfigLoader:
         if self._is_legacy_format(config_data):
             config_data = self._convert_legacy_format(config_data)
         
-        return Config.from_dict(config_data)
+        config = Config.from_dict(config_data)
+        self._compile_queries(config)
+        
+        return config
+    
+    def _compile_queries(self, config: Config) -> None:
+        """
+        Compile the jq expressions of all sheets once, so scans reuse them.
+        
+        Args:
+            config: Loaded configuration.
+        """
+        for inventory in config.inventories:
+            for sheet in inventory.sheets:
+                expressions = {"result_key": sheet.result_key}
+                if sheet.depends_on is not None:
+                    expressions["depends_on value_key"] = sheet.depends_on.value_key
+                
+                for field, expression in expressions.items():
+                    if expression and expression.startswith('.'):
+                        try:
+                            compile_query(expression)
+                        except QuerySyntaxError as e:
+                            logger.warning(
+                                f"Sheet {sheet.name} {field} is not supported by the query compiler "
+                                f"and will be evaluated with pyjq: {e}"
+                            )
     
     def _detect_format(self, path: str) -> str:
         """
@@ -110,7 +141,11 @@ class ConfigLoader:
                                 "service": item['service'],
                                 "function": item['function'],
                                 "result_key": item.get('result_key'),
-                                "parameters": item.get('parameters', {})
+                                "parameters": item.get('parameters', {}),
+                                "page_size": item.get('page_size'),
+                                "max_items": item.get('max_items'),
+                                "ttl": item.get('ttl'),
+                                "scope": item.get('scope')
                             }
                             for item in config_data
                         ]
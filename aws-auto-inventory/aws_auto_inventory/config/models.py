@@ -1,7 +1,7 @@
 """
 Configuration models for AWS Auto Inventory.
 """
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Union, Literal
 from pydantic import BaseModel, Field
 
 
@@ -19,6 +19,14 @@ class AWSConfig(BaseModel):
     role_name: str = "OrganizationAccountAccessRole"
 
 
+class DependsOn(BaseModel):
+    """Parameter values taken from the results of another sheet."""
+    sheet: str
+    parameter: str
+    value_key: str
+    batch_size: Optional[int] = None
+
+
 class Sheet(BaseModel):
     """Sheet configuration for inventory."""
     name: str
@@ -26,6 +34,11 @@ class Sheet(BaseModel):
     function: str
     result_key: Optional[str] = None
     parameters: Dict[str, Any] = Field(default_factory=dict)
+    page_size: Optional[int] = None
+    max_items: Optional[int] = None
+    ttl: Optional[int] = None
+    scope: Optional[Literal["global", "regional"]] = None
+    depends_on: Optional[DependsOn] = None
 
 
 class Inventory(BaseModel):
@@ -1,15 +1,27 @@
 """
 Configuration validator for AWS Auto Inventory.
 """
-import boto3
 from typing import List, Optional, Dict, Any
 
+from botocore.validate import ParamValidator
+
+from ..core.global_services import is_global
+from ..utils.service_models import (
+    get_available_profiles,
+    get_available_services,
+    get_operation_model,
+    get_operation_names
+)
 from .models import Config, Inventory, Sheet
 
 
 class ConfigValidator:
     """
     Validates AWS Auto Inventory configurations.
+    
+    Services, functions and parameters are checked against botocore's service
+    models, loaded once per process, so validation creates no clients, needs
+    no credentials and makes no network calls.
     """
     
     def validate(self, config: Config) -> List[str]:
@@ -62,6 +74,53 @@ class ConfigValidator:
             sheet_errors = self._validate_sheet(sheet)
             errors.extend([f"Sheet '{sheet.name}': {error}" for error in sheet_errors])
         
+        # Validate dependencies between sheets
+        dependency_errors = self._validate_dependencies(inventory)
+        errors.extend(dependency_errors)
+        
+        return errors
+    
+    def _validate_dependencies(self, inventory: Inventory) -> List[str]:
+        """
+        Validate the depends_on settings of an inventory's sheets.
+        
+        Args:
+            inventory: Inventory to validate.
+            
+        Returns:
+            List of validation errors. Empty list if dependencies are valid.
+        """
+        errors = []
+        sheets = {sheet.name: sheet for sheet in inventory.sheets}
+        
+        for sheet in inventory.sheets:
+            if sheet.depends_on is None:
+                continue
+            
+            source = sheets.get(sheet.depends_on.sheet)
+            if source is None:
+                errors.append(f"Sheet '{sheet.name}': Depends on unknown sheet '{sheet.depends_on.sheet}'")
+                continue
+            
+            if source is sheet:
+                errors.append(f"Sheet '{sheet.name}': Depends on itself")
+                continue
+            
+            # Regional and global sheets are scanned separately
+            if is_global(source) != is_global(sheet):
+                errors.append(
+                    f"Sheet '{sheet.name}': Depends on sheet '{source.name}', which is not scanned in the same scope"
+                )
+            
+            # Follow the chain of sources back to this sheet
+            seen = {sheet.name}
+            current = source
+            while current is not None and current.depends_on is not None and current.name not in seen:
+                seen.add(current.name)
+                current = sheets.get(current.depends_on.sheet)
+            if current is not None and current.name == sheet.name:
+                errors.append(f"Sheet '{sheet.name}': Dependency cycle through sheet '{source.name}'")
+        
         return errors
     
     def _validate_aws_config(self, inventory: Inventory) -> List[str]:
@@ -80,15 +139,10 @@ class ConfigValidator:
         if not inventory.aws.region:
             errors.append("No regions specified")
         
-        # Check if profile exists (if specified)
-        if inventory.aws.profile:
-            try:
-                session = boto3.Session(profile_name=inventory.aws.profile)
-                # Try to get caller identity to verify credentials
-                sts = session.client('sts')
-                sts.get_caller_identity()
-            except Exception as e:
-                errors.append(f"Invalid AWS profile '{inventory.aws.profile}': {str(e)}")
+        # Check if profile exists (if specified). Credentials are checked before scanning.
+        if inventory.aws.profile and inventory.aws.profile not in get_available_profiles():
+            errors.append(f"Invalid AWS profile '{inventory.aws.profile}': The config profile "
+                          f"({inventory.aws.profile}) could not be found")
         
         return errors
     
@@ -111,19 +165,47 @@ class ConfigValidator:
         if not sheet.function:
             errors.append("No function specified")
         
-        # Check if service and function exist in boto3
-        try:
-            session = boto3.Session()
-            if sheet.service not in session.get_available_services():
-                errors.append(f"Invalid AWS service: {sheet.service}")
-            else:
-                # Check if function exists
-                client = session.client(sheet.service, region_name='us-east-1')
-                if not hasattr(client, sheet.function):
-                    errors.append(f"Function '{sheet.function}' does not exist for service '{sheet.service}'")
-                elif not sheet.function.startswith(('describe_', 'get_', 'list_')):
-                    errors.append(f"Function '{sheet.function}' is not a read-only operation")
-        except Exception as e:
-            errors.append(f"Error validating service and function: {str(e)}")
-        
-        return errors
\ No newline at end of file
+        if errors:
+            return errors
+        
+        # Check if service and function exist in botocore's models
+        if sheet.service not in get_available_services():
+            errors.append(f"Invalid AWS service: {sheet.service}")
+            return errors
+        
+        if sheet.function not in get_operation_names(sheet.service):
+            errors.append(f"Function '{sheet.function}' does not exist for service '{sheet.service}'")
+            return errors
+        
+        if not sheet.function.startswith(('describe_', 'get_', 'list_')):
+            errors.append(f"Function '{sheet.function}' is not a read-only operation")
+        
+        # Check parameter names, types and required parameters against the input shape
+        operation_model = get_operation_model(sheet.service, sheet.function)
+        input_shape = operation_model.input_shape
+        depends_on = sheet.depends_on
+        if input_shape is None:
+            if sheet.parameters or depends_on is not None:
+                errors.append(f"Function '{sheet.function}' takes no parameters")
+            return errors
+        
+        # The depends_on parameter is filled in at scan time
+        dependent_line = None
+        if depends_on is not None:
+            dependent_line = f'Missing required parameter in input: "{depends_on.parameter}"'
+            if depends_on.parameter not in input_shape.members:
+                errors.append(f"Function '{sheet.function}' has no parameter '{depends_on.parameter}'")
+            if depends_on.parameter in sheet.parameters:
+                errors.append(f"Parameter '{depends_on.parameter}' is set by depends_on")
+            if depends_on.batch_size is not None and depends_on.batch_size < 1:
+                errors.append("depends_on batch_size must be positive")
+        
+        report = ParamValidator().validate(sheet.parameters, input_shape)
+        if report.has_errors():
+            errors.extend(
+                f"Invalid parameters: {line.strip()}"
+                for line in report.generate_report().splitlines()
+                if line.strip() and line.strip() != dependent_line
+            )
+        
+        return errors
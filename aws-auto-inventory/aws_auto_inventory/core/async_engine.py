@@ -0,0 +1,420 @@
+"""
+Asyncio scan engine for AWS Auto Inventory.
+"""
+import time
+import asyncio
+import logging
+import concurrent.futures
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+
+from ..config.models import Config, Inventory, Sheet
+from .global_services import GLOBAL_REGION, get_home_region
+from .dependencies import SheetDependencies
+from .organization import AccountResult
+from .region import RegionResult
+from .scan_engine import ScanEngine, ScanResult
+from .service import ServiceResult
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class AsyncScanEngine(ScanEngine):
+    """
+    Scan engine driving every (account, region, sheet) call from one event loop.
+
+    The threaded engine opens a pool per account and per region, so the number of
+    threads grows with regions x services. This engine schedules each API call as
+    a task on a single event loop, bounded by one semaphore, and runs the blocking
+    boto3 calls on a single shared executor. Results are returned as the same
+    ScanResult, AccountResult and RegionResult objects as ScanEngine.
+    """
+
+    def __init__(self, *args: Any, max_concurrency: int = 64, **kwargs: Any):
+        """
+        Initialize async scan engine.
+
+        Args:
+            *args: Positional arguments passed to ScanEngine.
+            max_concurrency: Maximum number of API calls in flight across all
+                             accounts, regions and sheets.
+            **kwargs: Keyword arguments passed to ScanEngine.
+        """
+        super().__init__(*args, **kwargs)
+        self.max_concurrency = max_concurrency
+
+    def scan(self, config: Config) -> List[ScanResult]:
+        """
+        Perform scanning based on configuration.
+
+        Args:
+            config: Configuration to use for scanning.
+
+        Returns:
+            List of scan results, one for each inventory in the configuration.
+        """
+        return asyncio.run(self.scan_async(config))
+
+    async def scan_async(self, config: Config) -> List[ScanResult]:
+        """
+        Perform scanning based on configuration from a running event loop.
+
+        Args:
+            config: Configuration to use for scanning.
+
+        Returns:
+            List of scan results, one for each inventory in the configuration.
+        """
+        results = []
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="aws-auto-inventory"
+        ) as executor:
+            scan = _AsyncScan(self, executor)
+            # The calls of dependent sheets run on the same executor, so they
+            # count against max_concurrency
+            service_scanner = self.region_scanner.service_scanner
+            service_scanner.executor = executor
+
+            try:
+                for inventory in config.inventories:
+                    logger.info(f"Starting scan for inventory: {inventory.name}")
+
+                    if inventory.aws.organization:
+                        result = await scan.scan_organization(inventory)
+                    else:
+                        result = await scan.scan_account(inventory)
+
+                    results.append(result)
+                    logger.info(f"Completed scan for inventory: {inventory.name}")
+            finally:
+                service_scanner.executor = None
+
+        if self.delta_tracker is not None:
+            self.delta_tracker.save()
+        self.organization_scanner.credential_broker.save()
+
+        return results
+
+
+class _AsyncScan:
+    """
+    State shared by the tasks of one AsyncScanEngine.scan_async call.
+    """
+
+    def __init__(self, engine: AsyncScanEngine, executor: concurrent.futures.Executor):
+        """
+        Initialize the scan state.
+
+        Args:
+            engine: Engine holding the scanners and limits.
+            executor: Executor running the blocking boto3 calls.
+        """
+        self.engine = engine
+        self.executor = executor
+        self.region_scanner = engine.region_scanner
+        self.organization_scanner = engine.organization_scanner
+        self.call_slots = asyncio.Semaphore(engine.max_concurrency)
+        self.account_slots = asyncio.Semaphore(
+            engine.max_workers_accounts or engine.max_concurrency
+        )
+
+    async def run(self, function: Any, *args: Any) -> Any:
+        """
+        Run a blocking function on the shared executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def scan_account(self, inventory: Inventory) -> ScanResult:
+        """
+        Scan a single account.
+
+        Args:
+            inventory: Inventory configuration.
+
+        Returns:
+            Scan result.
+        """
+        logger.info(f"Starting account scan for inventory: {inventory.name}")
+
+        session = boto3.Session(profile_name=inventory.aws.profile)
+        region_results = await self.scan_regions(inventory, session)
+
+        logger.info(f"Completed account scan for inventory: {inventory.name}")
+
+        return ScanResult(
+            inventory_name=inventory.name,
+            region_results=region_results
+        )
+
+    async def scan_organization(self, inventory: Inventory) -> ScanResult:
+        """
+        Scan across an organization.
+
+        Args:
+            inventory: Inventory configuration.
+
+        Returns:
+            Scan result.
+        """
+        logger.info(f"Starting organization scan for inventory: {inventory.name}")
+
+        management_session = boto3.Session(profile_name=inventory.aws.profile)
+        accounts = await self.run(
+            self.organization_scanner.get_organization_accounts, management_session
+        )
+
+        if not accounts:
+            logger.warning("No accounts found in the organization")
+            return ScanResult(inventory_name=inventory.name, account_results=[])
+
+        # Clients are thread-safe, the session they come from is not
+        sts_client = management_session.client('sts')
+        await self.run(
+            self.organization_scanner.credential_broker.prefetch,
+            sts_client,
+            [account['id'] for account in accounts],
+            inventory.aws.role_name
+        )
+
+        account_results = await asyncio.gather(*[
+            self.scan_member_account(inventory, management_session, account, sts_client)
+            for account in accounts
+        ])
+
+        logger.info(f"Completed organization scan for inventory: {inventory.name}")
+
+        return ScanResult(
+            inventory_name=inventory.name,
+            account_results=list(account_results)
+        )
+
+    async def scan_member_account(
+        self,
+        inventory: Inventory,
+        management_session: boto3.Session,
+        account: Dict[str, str],
+        sts_client: Any
+    ) -> AccountResult:
+        """
+        Assume a role in a member account and scan all its regions.
+
+        Args:
+            inventory: Inventory configuration.
+            management_session: boto3 Session for the management account.
+            account: Account information (id, name, email).
+            sts_client: STS client of the management session.
+
+        Returns:
+            Account scan result.
+        """
+        account_id = account['id']
+        account_name = account['name']
+
+        async with self.account_slots:
+            logger.info(f"Processing account: {account_name} ({account_id})")
+
+            try:
+                account_session = await self.run(
+                    self.organization_scanner.assume_role,
+                    management_session,
+                    account_id,
+                    inventory.aws.role_name,
+                    sts_client
+                )
+
+                if not account_session:
+                    return AccountResult(
+                        account_id=account_id,
+                        account_name=account_name,
+                        regions=[],
+                        success=False,
+                        error=f"Failed to assume role in account {account_id}"
+                    )
+
+                region_results = await self.scan_regions(inventory, account_session, account)
+
+            except Exception as e:
+                logger.error(f"Error scanning account {account_id}: {str(e)}")
+                return AccountResult(
+                    account_id=account_id,
+                    account_name=account_name,
+                    regions=[],
+                    success=False,
+                    error=f"Error scanning account: {str(e)}"
+                )
+
+            logger.info(f"Completed account: {account_name} ({account_id})")
+
+            return AccountResult(
+                account_id=account_id,
+                account_name=account_name,
+                regions=region_results
+            )
+
+    async def scan_regions(
+        self,
+        inventory: Inventory,
+        session: boto3.Session,
+        account: Optional[Dict[str, str]] = None
+    ) -> List[RegionResult]:
+        """
+        Scan every sheet in every configured region of one account.
+
+        Args:
+            inventory: Inventory configuration.
+            session: boto3 Session for the account.
+            account: Account information (id, name) for organization scans.
+
+        Returns:
+            List of region scan results, in configuration order.
+        """
+        # Create the session's credential resolver before tasks share it across threads
+        await self.run(session.get_credentials)
+
+        regions = inventory.aws.region
+        if self.engine.planner is not None:
+            regions = await self.run(self.engine.planner.get_regions, inventory, session, account)
+
+        region_results = []
+        tasks = [
+            self.start_sheets(
+                inventory,
+                session,
+                [(sheet, region) for sheet in self.region_scanner.get_sheets(inventory, region)],
+                account
+            )
+            for region in regions
+        ]
+        # Global services are scanned once for the account, in their home region
+        global_sheets = self.region_scanner.get_global_sheets(inventory)
+        tasks.append(self.start_sheets(
+            inventory,
+            session,
+            [(sheet, get_home_region(sheet, regions)) for sheet in global_sheets],
+            account
+        ))
+        services_by_region = await asyncio.gather(
+            *[asyncio.gather(*region_tasks) for region_tasks in tasks]
+        )
+
+        for region, services in zip(regions, services_by_region):
+            logger.info(f"Completed scanning region {region}")
+            region_results.append(RegionResult(region=region, services=list(services)))
+
+        if global_sheets:
+            region_results.append(RegionResult(region=GLOBAL_REGION, services=list(services_by_region[-1])))
+
+        return region_results
+
+    def start_sheets(
+        self,
+        inventory: Inventory,
+        session: boto3.Session,
+        sheet_regions: List[Tuple[Sheet, str]],
+        account: Optional[Dict[str, str]] = None
+    ) -> List["asyncio.Task"]:
+        """
+        Start the scans of sheets scanned together, each dependent sheet waiting
+        for the sheet it depends on.
+
+        Args:
+            inventory: Inventory configuration.
+            session: boto3 Session.
+            sheet_regions: Sheets and the region to scan each one in.
+            account: Account information (id, name) for organization scans.
+
+        Returns:
+            Tasks of the sheet scans, in the order of sheet_regions.
+        """
+        dependencies = SheetDependencies([sheet for sheet, _ in sheet_regions])
+        regions = {sheet.name: region for sheet, region in sheet_regions}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def start(sheet: Sheet) -> asyncio.Task:
+            if sheet.name not in tasks:
+                source = dependencies.get_source(sheet)
+                source_task = start(source) if source is not None else None
+                tasks[sheet.name] = asyncio.ensure_future(self.scan_sheet(
+                    inventory, sheet, session, regions[sheet.name], account, dependencies, source_task
+                ))
+            return tasks[sheet.name]
+
+        return [start(sheet) for sheet, _ in sheet_regions]
+
+    async def scan_sheet(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        session: boto3.Session,
+        region: str,
+        account: Optional[Dict[str, str]] = None,
+        dependencies: Optional[SheetDependencies] = None,
+        source_task: Optional["asyncio.Task"] = None
+    ) -> ServiceResult:
+        """
+        Scan one sheet in one region once a call slot is free.
+
+        Args:
+            inventory: Inventory configuration.
+            sheet: Sheet configuration.
+            session: boto3 Session.
+            region: AWS region.
+            account: Account information (id, name) for organization scans.
+            dependencies: Dependencies between the sheets scanned with this one.
+            source_task: Scan of the sheet this one depends on, to wait for.
+
+        Returns:
+            Service scan result.
+        """
+        if source_task is not None:
+            # The source's result is recorded by its own task, only its values are needed
+            await asyncio.wait([source_task])
+
+        submitted_at = time.monotonic()
+        async with self.call_slots:
+            try:
+                service_result = await self.run(
+                    self.region_scanner.scan_sheet,
+                    inventory,
+                    sheet,
+                    session,
+                    region,
+                    account,
+                    submitted_at,
+                    dependencies
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error processing service {sheet.service} with function {sheet.function} in region {region}: {str(e)}"
+                )
+                service_result = ServiceResult(
+                    service=sheet.service,
+                    function=sheet.function,
+                    region=region,
+                    result=None,
+                    success=False,
+                    error=f"Error processing service: {str(e)}",
+                    sheet=sheet.name
+                )
+
+            try:
+                await self.run(self.region_scanner.record_result, inventory, service_result, account)
+            except Exception as e:
+                logger.error(
+                    f"Error writing result of service {sheet.service} with function {sheet.function} in region {region}: {str(e)}"
+                )
+                service_result = ServiceResult(
+                    service=sheet.service,
+                    function=sheet.function,
+                    region=region,
+                    result=None,
+                    success=False,
+                    error=f"Error writing result: {str(e)}",
+                    sheet=sheet.name
+                )
+            return service_result
@@ -4,7 +4,7 @@ AWS client with retry logic for AWS Auto Inventory.
 import time
 import json
 import logging
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, Iterable, Iterator, TYPE_CHECKING
 
 import boto3
 import botocore
@@ -17,6 +17,13 @@ except ImportError:
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
     import pyjq_mock as pyjq
 
+from .client_cache import ClientCache
+from .query import QuerySyntaxError, compile_query
+from .rate_limiter import THROTTLING_ERROR_CODES, jittered_backoff
+
+if TYPE_CHECKING:
+    from .metrics import MetricsCollector
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
@@ -40,18 +47,31 @@ class AWSClient:
     AWS client with retry logic for API calls.
     """
     
-    def __init__(self, session: boto3.Session, max_retries: int = 3, retry_delay: int = 2):
+    def __init__(
+        self, 
+        session: boto3.Session, 
+        max_retries: int = 3, 
+        retry_delay: int = 2,
+        client_cache: Optional[ClientCache] = None,
+        metrics: Optional["MetricsCollector"] = None
+    ):
         """
         Initialize AWS client.
         
         Args:
             session: boto3 Session.
             max_retries: Maximum number of retries for API calls.
-            retry_delay: Base delay (in seconds) between retries.
+            retry_delay: Base delay (in seconds) of the jittered exponential backoff between retries.
+            client_cache: Cache of boto3 clients to share between AWSClient instances.
+                          A private cache is created if not provided.
+            metrics: Collector receiving the duration, pages, bytes, retries and
+                     throttles of every call.
         """
         self.session = session
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.client_cache = client_cache if client_cache is not None else ClientCache()
+        self.metrics = metrics
     
     def call_api(
         self, 
@@ -59,17 +79,25 @@ class AWSClient:
         function_name: str, 
         region: Optional[str] = None, 
         parameters: Optional[Dict[str, Any]] = None,
-        result_key: Optional[str] = None
+        result_key: Optional[str] = None,
+        page_size: Optional[int] = None,
+        max_items: Optional[int] = None
     ) -> Any:
         """
         Call AWS API with retry logic.
         
+        Operations that support pagination are followed across all pages. Pages are
+        fetched lazily and result_key is applied to each page as it arrives, so only
+        the extracted data is kept in memory.
+        
         Args:
             service: AWS service name.
             function_name: API function name.
             region: AWS region.
             parameters: API parameters.
             result_key: Key to extract from the response.
+            page_size: Number of items to request per page for paginated operations.
+            max_items: Maximum number of items to return for paginated operations.
             
         Returns:
             API response or extracted data if result_key is specified.
@@ -77,44 +105,59 @@ class AWSClient:
         Raises:
             AWSClientError: If the API call fails after all retries.
         """
-        client = self.session.client(service, region_name=region)
+        if self.metrics is None:
+            return self._call_api(
+                service, function_name, region, parameters, result_key, page_size, max_items
+            )
+        
+        call = self.metrics.start_call(service, function_name, region)
+        try:
+            return self._call_api(
+                service, function_name, region, parameters, result_key, page_size, max_items
+            )
+        except Exception:
+            call.success = False
+            raise
+        finally:
+            self.metrics.finish_call(call)
+    
+    def _call_api(
+        self,
+        service: str,
+        function_name: str,
+        region: Optional[str],
+        parameters: Optional[Dict[str, Any]],
+        result_key: Optional[str],
+        page_size: Optional[int],
+        max_items: Optional[int]
+    ) -> Any:
+        """
+        Call AWS API with retry logic, see call_api.
+        """
+        client = self.client_cache.get_client(self.session, service, region)
         
         if not hasattr(client, function_name):
             raise AWSClientError(f"Function {function_name} does not exist for service {service}")
         
-        function_to_call = getattr(client, function_name)
-        
         for attempt in range(self.max_retries):
             try:
-                if parameters:
-                    response = function_to_call(**parameters)
-                else:
-                    response = function_to_call()
+                pages = self.iter_pages(client, function_name, parameters, page_size, max_items)
                 
                 # Process the response
-                if result_key:
-                    if result_key.startswith('.'):
-                        # Use pyjq for complex queries
-                        return pyjq.all(result_key, json.loads(json.dumps(response, default=str)))
-                    else:
-                        # Simple key extraction
-                        return response.get(result_key)
-                else:
-                    # Return full response with metadata removed
-                    if isinstance(response, dict):
-                        response.pop("ResponseMetadata", None)
-                    return response
+                return extract_result(pages, result_key)
                 
             except botocore.exceptions.ClientError as error:
                 error_code = error.response["Error"]["Code"]
-                if error_code in ["Throttling", "RequestLimitExceeded"]:
+                if error_code in THROTTLING_ERROR_CODES:
                     if attempt < (self.max_retries - 1):
-                        wait_time = self.retry_delay ** attempt
+                        wait_time = jittered_backoff(attempt, self.retry_delay)
                         logger.warning(
-                            f"Throttling for {service}.{function_name}, retrying in {wait_time}s "
+                            f"Throttling for {service}.{function_name}, retrying in {wait_time:.2f}s "
                             f"(attempt {attempt + 1}/{self.max_retries})"
                         )
                         time.sleep(wait_time)
+                        if self.metrics is not None:
+                            self.metrics.add_retry()
                         continue
                     else:
                         raise ThrottlingError(service, function_name)
@@ -123,12 +166,14 @@ class AWSClient:
                     raise AWSClientError(f"AWS API error: {error}")
             except botocore.exceptions.BotoCoreError as error:
                 if attempt < (self.max_retries - 1):
-                    wait_time = self.retry_delay ** attempt
+                    wait_time = jittered_backoff(attempt, self.retry_delay)
                     logger.warning(
-                        f"BotoCore error for {service}.{function_name}, retrying in {wait_time}s "
+                        f"BotoCore error for {service}.{function_name}, retrying in {wait_time:.2f}s "
                         f"(attempt {attempt + 1}/{self.max_retries})"
                     )
                     time.sleep(wait_time)
+                    if self.metrics is not None:
+                        self.metrics.add_retry()
                     continue
                 else:
                     logger.error(f"BotoCore error for {service}.{function_name}: {error}")
@@ -138,4 +183,127 @@ class AWSClient:
                 raise AWSClientError(f"Unexpected error: {error}")
         
         # This should not be reached, but just in case
-        raise AWSClientError(f"Failed to call {service}.{function_name} after {self.max_retries} attempts")
\ No newline at end of file
+        raise AWSClientError(f"Failed to call {service}.{function_name} after {self.max_retries} attempts")
+    
+    def iter_pages(
+        self,
+        client: Any,
+        function_name: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None,
+        max_items: Optional[int] = None
+    ) -> Iterable[Dict[str, Any]]:
+        """
+        Get the response pages of an API call.
+        
+        Paginated operations return a botocore PageIterator that requests each page
+        only when the caller iterates to it. Other operations return a single response.
+        
+        Args:
+            client: boto3 client.
+            function_name: API function name.
+            parameters: API parameters.
+            page_size: Number of items to request per page.
+            max_items: Maximum number of items to return across all pages.
+            
+        Returns:
+            Iterable of response pages.
+        """
+        parameters = parameters or {}
+        
+        if not client.can_paginate(function_name):
+            return [getattr(client, function_name)(**parameters)]
+        
+        pagination_config = {}
+        if page_size:
+            pagination_config["PageSize"] = page_size
+        if max_items:
+            pagination_config["MaxItems"] = max_items
+        
+        paginator = client.get_paginator(function_name)
+        return paginator.paginate(PaginationConfig=pagination_config, **parameters)
+
+
+def extract_result(pages: Iterable[Dict[str, Any]], result_key: Optional[str] = None) -> Any:
+    """
+    Extract the result of an API call from its response pages.
+    
+    With a result_key, the key or jq expression is applied to each page as it is
+    fetched. Without one, the pages are merged into a single response with its
+    metadata removed.
+    
+    Args:
+        pages: Response pages, as returned by AWSClient.iter_pages.
+        result_key: Key or jq expression to extract from each page.
+        
+    Returns:
+        API response or extracted data if result_key is specified.
+    """
+    if result_key:
+        return collect_results(pages, result_key)
+    
+    if hasattr(pages, "build_full_result"):
+        response = pages.build_full_result()
+    else:
+        response = next(iter(pages))
+    if isinstance(response, dict):
+        response.pop("ResponseMetadata", None)
+    return response
+
+
+def collect_results(pages: Iterable[Dict[str, Any]], result_key: str) -> Any:
+    """
+    Extract result_key from every page and combine the results.
+    
+    Lists are concatenated across pages. Any other value is taken from the first
+    page, which matches the result of an unpaginated call.
+    
+    Args:
+        pages: Response pages.
+        result_key: Key or jq expression to extract from each page.
+        
+    Returns:
+        Extracted data.
+    """
+    collected = None
+    
+    for extracted in extract_pages(pages, result_key):
+        if isinstance(collected, list) and isinstance(extracted, list):
+            collected.extend(extracted)
+        elif collected is None:
+            collected = extracted
+    
+    return collected
+
+
+def extract_pages(pages: Iterable[Dict[str, Any]], result_key: str) -> Iterator[Any]:
+    """
+    Apply result_key to each page as it is fetched.
+    
+    jq expressions are compiled once and evaluated directly on the response
+    objects. Expressions outside the supported subset fall back to pyjq, which
+    needs a JSON copy of each page.
+    
+    Args:
+        pages: Response pages.
+        result_key: Key or jq expression to extract from each page.
+        
+    Yields:
+        Data extracted from each page.
+    """
+    query = None
+    if result_key.startswith('.'):
+        try:
+            query = compile_query(result_key)
+        except QuerySyntaxError as error:
+            logger.debug(f"Evaluating {result_key!r} with pyjq: {error}")
+    
+    for page in pages:
+        if query is not None:
+            yield query.all(page)
+        elif result_key.startswith('.'):
+            # Use pyjq for expressions the query compiler does not support
+            yield pyjq.all(result_key, json.loads(json.dumps(page, default=str)))
+        else:
+            # Simple key extraction
+            yield page.get(result_key)
@@ -0,0 +1,226 @@
+"""
+Checkpoint journal for resumable scans in AWS Auto Inventory.
+"""
+import os
+import json
+import uuid
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from ..config.models import Inventory, Sheet
+from ..output.encoder import InventoryJSONEncoder
+from .incremental import sheet_key
+from .service import ServiceResult
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class CheckpointJournal:
+    """
+    Append-only journal of the (account, region, sheet) units a scan has completed.
+
+    Each successful service result is appended to the run's journal file and
+    flushed as soon as it completes. When an interrupted run is resumed, units
+    found in the journal are replayed from it instead of calling AWS again, so
+    only the missing and failed units are scanned. Only the offset of each entry
+    is kept in memory.
+    """
+
+    def __init__(self, directory: str, run_id: Optional[str] = None):
+        """
+        Initialize checkpoint journal.
+
+        Args:
+            directory: Directory holding one journal file per run.
+            run_id: ID of an interrupted run to resume. A new run is started if not set.
+
+        Raises:
+            ValueError: If there is no journal for the run to resume.
+        """
+        self.run_id = run_id or new_run_id()
+        self.path = os.path.join(directory, f"{self.run_id}.jsonl")
+        self._offsets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._reader = None
+
+        if run_id is not None:
+            if not os.path.exists(self.path):
+                raise ValueError(f"No checkpoint journal for run {run_id} in {directory}")
+            self._load()
+            logger.info(f"Resuming run {run_id} with {len(self._offsets)} completed units")
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+        self._file = open(self.path, "ab")
+
+    def get(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        region: str,
+        account: Optional[Dict[str, str]] = None
+    ) -> Optional[ServiceResult]:
+        """
+        Get the result of a unit completed earlier in the run.
+
+        Args:
+            inventory: Inventory configuration.
+            sheet: Sheet configuration.
+            region: AWS region.
+            account: Account information (id, name) for organization scans.
+
+        Returns:
+            The journaled service result, or None if the unit has not completed.
+        """
+        entry = self._read(sheet_key(inventory, sheet, region, account))
+        if entry is None:
+            return None
+
+        record = entry["result"]
+        return ServiceResult(
+            service=record["service"],
+            function=record["function"],
+            region=record["region"],
+            result=record["result"],
+            success=record["success"],
+            error=record["error"],
+            delta=record.get("delta")
+        )
+
+    def get_fingerprints(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        region: str,
+        account: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the delta tracker fingerprints journaled with a completed unit.
+
+        Args:
+            inventory: Inventory configuration.
+            sheet: Sheet configuration.
+            region: AWS region.
+            account: Account information (id, name) for organization scans.
+
+        Returns:
+            The fingerprints, or None if the unit has not completed or has none.
+        """
+        entry = self._read(sheet_key(inventory, sheet, region, account))
+        return entry.get("fingerprints") if entry is not None else None
+
+    def record(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        service_result: ServiceResult,
+        account: Optional[Dict[str, str]] = None,
+        fingerprints: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Journal a completed unit.
+
+        Failed results are not journaled, so they are scanned again on resume.
+
+        Args:
+            inventory: Inventory configuration.
+            sheet: Sheet configuration.
+            service_result: Service scan result.
+            account: Account information (id, name) for organization scans.
+            fingerprints: Delta tracker fingerprints of the unit, restored on
+                          replay since an interrupted run never saves its state.
+        """
+        if not service_result.success:
+            return
+
+        key = sheet_key(inventory, sheet, service_result.region, account)
+        entry: Dict[str, Any] = {"key": key, "result": service_result.to_dict()}
+        if fingerprints is not None:
+            entry["fingerprints"] = fingerprints
+        line = json.dumps(entry, cls=InventoryJSONEncoder).encode("utf-8") + b"\n"
+
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._offsets[key] = offset
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the journal entry of a unit, or None if the unit has not completed.
+        """
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is None:
+                return None
+            if self._reader is None:
+                self._reader = open(self.path, "rb")
+            self._reader.seek(offset)
+            return json.loads(self._reader.readline())
+
+    def close(self) -> None:
+        """
+        Close the journal file, keeping it for a later resume.
+        """
+        with self._lock:
+            self._file.close()
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def remove(self) -> None:
+        """
+        Close and delete the journal once the run has completed.
+        """
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            logger.warning(f"Could not remove checkpoint journal {self.path}: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._offsets)
+
+    def _load(self) -> None:
+        """
+        Index the entries of an existing journal.
+
+        A partial last line, left by a crash in the middle of a write, is truncated
+        so new entries start on a line of their own.
+        """
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            for line in iter(f.readline, b""):
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._offsets[entry["key"]] = valid_size
+                valid_size += len(line)
+
+        if valid_size < os.path.getsize(self.path):
+            logger.warning(f"Truncating incomplete entry at the end of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_size)
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def new_run_id() -> str:
+    """
+    Generate the ID of a new run.
+
+    Returns:
+        Sortable ID made of the start time and a random suffix.
+    """
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
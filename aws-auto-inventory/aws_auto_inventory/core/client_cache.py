@@ -0,0 +1,139 @@
+"""
+Thread-safe boto3 client cache for AWS Auto Inventory.
+"""
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple, TYPE_CHECKING
+
+import boto3
+from botocore.config import Config
+
+from .rate_limiter import RateLimiter
+
+if TYPE_CHECKING:
+    from .metrics import MetricsCollector
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class ClientCache:
+    """
+    Bounded LRU cache of boto3 clients keyed by credentials, service and region.
+
+    Creating a client loads the botocore service model and endpoint data, which is
+    far more expensive than the API call for small inventories. Clients are
+    thread-safe once created, so a single client per (credentials, service, region)
+    is shared by every scan thread, together with its connection pool.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        max_pool_connections: int = 50,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional["MetricsCollector"] = None
+    ):
+        """
+        Initialize client cache.
+
+        Args:
+            max_size: Maximum number of clients to keep. The least recently used
+                      client is evicted when the cache is full.
+            max_pool_connections: Maximum number of connections kept in each client's
+                                  connection pool.
+            rate_limiter: Rate limiter to attach to every client, keyed by
+                          (credentials, region, service).
+            metrics: Collector measuring the responses, retries and throttles of
+                     every client.
+        """
+        self.max_size = max_size
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.client_config = Config(max_pool_connections=max_pool_connections)
+        self._clients: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._session_locks: "weakref.WeakKeyDictionary[boto3.Session, threading.Lock]" = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get_client(self, session: boto3.Session, service: str, region: Optional[str] = None) -> Any:
+        """
+        Get a client for a service in a region, creating it on first use.
+
+        Args:
+            session: boto3 Session whose credentials the client should use.
+            service: AWS service name.
+            region: AWS region.
+
+        Returns:
+            boto3 client.
+        """
+        # Resolving credentials may refresh them through STS, so it is serialized per
+        # session rather than under the lock every lookup waits on. boto3 sessions
+        # are not thread-safe, so client creation stays serialized too.
+        with self._get_session_lock(session):
+            credentials_key = get_session_key(session)
+        with self._lock:
+            key = (credentials_key, service, region)
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return client
+
+            self.misses += 1
+            logger.debug(f"Creating client for {service} in region {region}")
+            client = session.client(service, region_name=region, config=self.client_config)
+            if self.rate_limiter is not None:
+                self.rate_limiter.register(client, (credentials_key, region, service))
+            if self.metrics is not None:
+                self.metrics.register(client)
+            self._clients[key] = client
+
+            if len(self._clients) > self.max_size:
+                (evicted_credentials, evicted_service, evicted_region), _ = self._clients.popitem(last=False)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.discard((evicted_credentials, evicted_region, evicted_service))
+
+            return client
+
+    def _get_session_lock(self, session: boto3.Session) -> threading.Lock:
+        """
+        Get the lock serializing credential resolution of a session.
+        """
+        with self._lock:
+            lock = self._session_locks.get(session)
+            if lock is None:
+                lock = self._session_locks[session] = threading.Lock()
+            return lock
+
+    def clear(self) -> None:
+        """
+        Remove all cached clients.
+        """
+        with self._lock:
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+
+def get_session_key(session: boto3.Session) -> Hashable:
+    """
+    Build a key identifying the credentials a session resolves to.
+
+    Args:
+        session: boto3 Session.
+
+    Returns:
+        Hashable key. Sessions resolving to the same access key get the same key.
+    """
+    credentials = session.get_credentials()
+    if credentials is None:
+        return (session.profile_name, None)
+
+    return (session.profile_name, credentials.access_key)
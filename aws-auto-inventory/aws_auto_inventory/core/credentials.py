@@ -0,0 +1,293 @@
+"""
+STS credential broker for AWS Auto Inventory.
+"""
+import os
+import json
+import logging
+import threading
+import concurrent.futures
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+
+import boto3
+import botocore.session
+from botocore.credentials import RefreshableCredentials
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    # The encrypted on-disk cache is optional
+    Fernet = None
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Environment variable holding the key of the on-disk credential cache
+CACHE_KEY_ENV = "AWS_AUTO_INVENTORY_CACHE_KEY"
+
+
+class CredentialBroker:
+    """
+    Broker assuming roles in member accounts and caching their credentials.
+
+    Credentials are reused until shortly before they expire, so accounts scanned
+    by several inventories, or by repeated runs when the encrypted on-disk cache is
+    enabled, do not call STS again. Sessions handed out use botocore refreshable
+    credentials, which assume the role again when a long account scan outlives them.
+    """
+
+    def __init__(
+        self,
+        duration_seconds: int = 3600,
+        refresh_margin: int = 900,
+        cache_path: Optional[str] = None,
+        cache_key: Optional[Union[str, bytes]] = None,
+        session_name: str = "AWSAutoInventorySession"
+    ):
+        """
+        Initialize credential broker.
+
+        Args:
+            duration_seconds: Lifetime requested for assumed role credentials.
+            refresh_margin: Time (in seconds) before expiry at which credentials are
+                            no longer reused and are refreshed. Matches botocore's
+                            advisory refresh window by default.
+            cache_path: File persisting credentials between runs, encrypted with
+                        cache_key. Credentials are only kept in memory if not set.
+            cache_key: Fernet key encrypting the cache file, as generated by
+                       cryptography.fernet.Fernet.generate_key().
+            session_name: Role session name recorded in CloudTrail.
+        """
+        self.duration_seconds = duration_seconds
+        self.refresh_margin = refresh_margin
+        self.cache_path = cache_path
+        self.session_name = session_name
+        self._credentials: Dict[str, Dict[str, str]] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._role_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._fernet = None
+
+        if cache_path is not None:
+            if Fernet is None:
+                raise ValueError("The credential cache requires the cryptography package")
+            if not cache_key:
+                raise ValueError(f"The credential cache requires a key, set {CACHE_KEY_ENV}")
+            self._fernet = Fernet(cache_key)
+            self._load()
+
+    def get_session(
+        self,
+        sts_client: Any,
+        account_id: str,
+        role_name: str
+    ) -> boto3.Session:
+        """
+        Get a session for a role in an account.
+
+        Args:
+            sts_client: STS client of the management session. Clients are
+                        thread-safe, so one client can be shared by all accounts.
+            account_id: AWS account ID to assume the role in.
+            role_name: Name of the IAM role to assume.
+
+        Returns:
+            boto3 Session whose credentials refresh themselves before they expire.
+
+        Raises:
+            Exception: The error of the STS call if the role cannot be assumed.
+        """
+        role_arn = get_role_arn(account_id, role_name)
+        metadata = self.get_credentials(sts_client, role_arn)
+
+        credentials = RefreshableCredentials.create_from_metadata(
+            metadata=metadata,
+            refresh_using=lambda: self.get_credentials(sts_client, role_arn, refresh=True),
+            method="sts-assume-role"
+        )
+        botocore_session = botocore.session.get_session()
+        botocore_session._credentials = credentials
+        return boto3.Session(botocore_session=botocore_session)
+
+    def get_credentials(
+        self,
+        sts_client: Any,
+        role_arn: str,
+        refresh: bool = False
+    ) -> Dict[str, str]:
+        """
+        Get credentials for a role, from the cache if they are not about to expire.
+
+        Args:
+            sts_client: STS client of the management session.
+            role_arn: ARN of the role to assume.
+            refresh: Whether to assume the role even if cached credentials exist.
+
+        Returns:
+            Credential metadata (access_key, secret_key, token, expiry_time) as
+            expected by botocore's RefreshableCredentials.
+
+        Raises:
+            Exception: The error of the STS call if the role cannot be assumed.
+                       Failures are remembered, so each role is tried once per run.
+        """
+        with self._lock:
+            role_lock = self._role_locks.setdefault(role_arn, threading.Lock())
+
+        # Threads asking for the same role wait for a single STS call
+        with role_lock:
+            with self._lock:
+                error = self._errors.get(role_arn)
+                metadata = self._credentials.get(role_arn)
+            if error is not None and not refresh:
+                raise error
+            if metadata is not None and not refresh and self._is_fresh(metadata):
+                return metadata
+
+            logger.info(f"Assuming role {role_arn}")
+            try:
+                response = sts_client.assume_role(
+                    RoleArn=role_arn,
+                    RoleSessionName=self.session_name,
+                    DurationSeconds=self.duration_seconds
+                )
+            except Exception as e:
+                with self._lock:
+                    self._errors[role_arn] = e
+                raise
+
+            credentials = response["Credentials"]
+            metadata = {
+                "access_key": credentials["AccessKeyId"],
+                "secret_key": credentials["SecretAccessKey"],
+                "token": credentials["SessionToken"],
+                "expiry_time": _to_utc(credentials["Expiration"]).isoformat(),
+            }
+            with self._lock:
+                self._credentials[role_arn] = metadata
+                self._errors.pop(role_arn, None)
+            return metadata
+
+    def prefetch(
+        self,
+        sts_client: Any,
+        account_ids: List[str],
+        role_name: str,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Exception]:
+        """
+        Assume a role in many accounts concurrently.
+
+        Credentials are cached, so the account scans started afterwards do not
+        wait on STS one after the other.
+
+        Args:
+            sts_client: STS client of the management session.
+            account_ids: AWS account IDs to assume the role in.
+            role_name: Name of the IAM role to assume.
+            max_workers: Maximum number of concurrent STS calls.
+
+        Returns:
+            Errors of the accounts the role could not be assumed in, by account ID.
+        """
+        errors = {}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_account = {
+                executor.submit(
+                    self.get_credentials,
+                    sts_client,
+                    get_role_arn(account_id, role_name)
+                ): account_id
+                for account_id in account_ids
+            }
+
+            for future in concurrent.futures.as_completed(future_to_account):
+                account_id = future_to_account[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Failed to assume role in account {account_id}: {str(e)}")
+                    errors[account_id] = e
+
+        return errors
+
+    def save(self) -> None:
+        """
+        Write the credentials that have not expired to the encrypted cache file.
+        """
+        if self._fernet is None:
+            return
+
+        with self._lock:
+            data = {
+                role_arn: metadata
+                for role_arn, metadata in self._credentials.items()
+                if self._is_fresh(metadata)
+            }
+
+        token = self._fernet.encrypt(json.dumps(data).encode("utf-8"))
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.cache_path}.{threading.get_ident()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(token)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write credential cache {self.cache_path}: {e}")
+
+    def _load(self) -> None:
+        """
+        Read the encrypted cache file, ignoring missing, corrupt or foreign files.
+        """
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = json.loads(self._fernet.decrypt(f.read()))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, InvalidToken) as e:
+            logger.warning(f"Ignoring unreadable credential cache {self.cache_path}: {e}")
+            return
+
+        self._credentials = {
+            role_arn: metadata
+            for role_arn, metadata in data.items()
+            if self._is_fresh(metadata)
+        }
+        logger.debug(f"Loaded {len(self._credentials)} cached role credentials")
+
+    def _is_fresh(self, metadata: Dict[str, str]) -> bool:
+        """
+        Check whether credentials are valid for longer than the refresh margin.
+        """
+        expiry_time = datetime.fromisoformat(metadata["expiry_time"])
+        remaining = (expiry_time - datetime.now(timezone.utc)).total_seconds()
+        return remaining > self.refresh_margin
+
+
+def get_role_arn(account_id: str, role_name: str) -> str:
+    """
+    Build the ARN of a role in an account.
+
+    Args:
+        account_id: AWS account ID.
+        role_name: Name of the IAM role.
+
+    Returns:
+        Role ARN.
+    """
+    return f"arn:aws:iam::{account_id}:role/{role_name}"
+
+
+def _to_utc(value: Union[datetime, str]) -> datetime:
+    """
+    Parse an STS expiration into an aware UTC datetime.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
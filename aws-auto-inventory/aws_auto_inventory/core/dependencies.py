@@ -0,0 +1,160 @@
+"""
+Dependencies between sheets for AWS Auto Inventory.
+"""
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..config.models import Sheet
+from .aws_client import extract_pages
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class SheetDependencies:
+    """
+    Parameter values passed between the sheets scanned together in one region.
+
+    A sheet with depends_on is scanned once its source sheet has completed,
+    with the values its value_key selects from the source's resources. Sources
+    publish the values as soon as their scan returns, before delta tracking or
+    the sink drop the resources from the result.
+    """
+
+    def __init__(self, sheets: Sequence[Sheet]):
+        """
+        Initialize sheet dependencies.
+
+        Args:
+            sheets: Sheets scanned together. Dependencies on sheets outside this
+                    group, or in a cycle, are unresolvable: those sheets are
+                    scanned without waiting and fail for lack of values.
+        """
+        self._sheets = {sheet.name: sheet for sheet in sheets}
+        self._sources: Dict[str, Sheet] = {}
+        self._dependents: Dict[str, List[Sheet]] = {}
+        self._values: Dict[str, Optional[List[Any]]] = {}
+        self._lock = threading.Lock()
+
+        for sheet in sheets:
+            source = self._resolve_source(sheet)
+            if source is not None:
+                self._sources[sheet.name] = source
+                self._dependents.setdefault(source.name, []).append(sheet)
+
+    def get_source(self, sheet: Sheet) -> Optional[Sheet]:
+        """
+        Get the sheet a sheet must wait for.
+
+        Args:
+            sheet: Sheet configuration.
+
+        Returns:
+            The source sheet, or None if the sheet can be scanned right away.
+        """
+        return self._sources.get(sheet.name)
+
+    def get_dependents(self, sheet: Sheet) -> List[Sheet]:
+        """
+        Get the sheets waiting for a sheet.
+
+        Args:
+            sheet: Sheet configuration.
+
+        Returns:
+            Sheets to scan once the sheet has completed.
+        """
+        return list(self._dependents.get(sheet.name, []))
+
+    def publish(self, sheet: Sheet, result: Any, success: bool = True) -> None:
+        """
+        Extract the parameter values of a sheet's dependents from its result.
+
+        Args:
+            sheet: Completed sheet.
+            result: Resources returned by the sheet.
+            success: Whether the sheet's scan succeeded. Dependents of a failed or
+                     skipped sheet get no values.
+        """
+        for dependent in self._dependents.get(sheet.name, []):
+            values = None
+            if success and result is not None:
+                try:
+                    values = extract_values(result, dependent.depends_on.value_key)
+                except Exception as e:
+                    logger.error(
+                        f"Error selecting {dependent.depends_on.value_key} from sheet {sheet.name} "
+                        f"for sheet {dependent.name}: {e}"
+                    )
+            with self._lock:
+                self._values[dependent.name] = values
+
+    def get_values(self, sheet: Sheet) -> Optional[List[Any]]:
+        """
+        Get the parameter values published for a dependent sheet.
+
+        Args:
+            sheet: Dependent sheet.
+
+        Returns:
+            Parameter values, or None if its source failed, was skipped or has
+            not completed.
+        """
+        with self._lock:
+            return self._values.get(sheet.name)
+
+    def _resolve_source(self, sheet: Sheet) -> Optional[Sheet]:
+        """
+        Find the source of a sheet in the group, following the chain of sources
+        to make sure it does not loop.
+        """
+        if sheet.depends_on is None:
+            return None
+
+        source = self._sheets.get(sheet.depends_on.sheet)
+        if source is None:
+            logger.warning(f"Sheet {sheet.name} depends on sheet {sheet.depends_on.sheet}, which is not scanned with it")
+            return None
+
+        seen = {sheet.name}
+        current = source
+        while current is not None:
+            if current.name in seen:
+                logger.warning(f"Sheet {sheet.name} is part of a dependency cycle")
+                return None
+            seen.add(current.name)
+            current = self._sheets.get(current.depends_on.sheet) if current.depends_on is not None else None
+        return source
+
+
+def extract_values(result: Any, value_key: str) -> List[Any]:
+    """
+    Select parameter values from the resources of a sheet.
+
+    Args:
+        result: Resources returned by a sheet: a list, or a single resource.
+        value_key: Key or jq expression applied to each resource.
+
+    Returns:
+        Distinct values, in order of first appearance. Lists are flattened and
+        None is dropped.
+    """
+    resources = result if isinstance(result, list) else [result]
+
+    values: List[Any] = []
+    seen = set()
+    for resource in resources:
+        if not value_key.startswith('.') and not isinstance(resource, dict):
+            continue
+        extracted = next(extract_pages([resource], value_key))
+        for value in (extracted if isinstance(extracted, list) else [extracted]):
+            if value is None:
+                continue
+            # Values such as filters may be dictionaries, which are not hashable
+            marker = json.dumps(value, sort_keys=True, default=str)
+            if marker not in seen:
+                seen.add(marker)
+                values.append(value)
+    return values
@@ -0,0 +1,69 @@
+"""
+Global AWS services for AWS Auto Inventory.
+"""
+from typing import List, Optional
+
+from ..config.models import Sheet
+
+# Region name under which results of global services are reported
+GLOBAL_REGION = "global"
+
+# Services whose APIs return the same account-wide data from every region, mapped
+# to the region their API must be called in (None: any scanned region works)
+GLOBAL_SERVICES = {
+    "iam": None,
+    "organizations": "us-east-1",
+    "cloudfront": "us-east-1",
+    "route53": "us-east-1",
+    "route53domains": "us-east-1",
+    "shield": "us-east-1",
+    "waf": "us-east-1",
+    "globalaccelerator": "us-west-2",
+    "budgets": "us-east-1",
+    "ce": "us-east-1",
+    "cur": "us-east-1",
+    "account": "us-east-1",
+    "health": "us-east-1",
+    "support": "us-east-1",
+    "trustedadvisor": "us-east-1",
+    "artifact": "us-east-1",
+}
+
+
+def is_global(sheet: Sheet) -> bool:
+    """
+    Check whether a sheet calls a global API.
+
+    Args:
+        sheet: Sheet configuration. Its scope, if set, overrides the built-in list
+               of global services.
+
+    Returns:
+        True if the sheet should be scanned once per account.
+    """
+    if sheet.scope is not None:
+        return sheet.scope == "global"
+    return sheet.service in GLOBAL_SERVICES
+
+
+def get_home_region(sheet: Sheet, regions: List[str]) -> Optional[str]:
+    """
+    Get the region to call a global API in.
+
+    Args:
+        sheet: Sheet configuration.
+        regions: Regions scanned in the account.
+
+    Returns:
+        The service's home region in the commercial partition, otherwise the first
+        scanned region, which keeps the call in the partition being scanned.
+    """
+    home_region = GLOBAL_SERVICES.get(sheet.service)
+    first_region = regions[0] if regions else home_region
+    if home_region is None or first_region is None:
+        return first_region
+
+    # Other partitions (aws-cn, aws-us-gov) have their own global endpoints
+    if first_region.startswith(("cn-", "us-gov-", "us-iso")):
+        return first_region
+    return home_region
@@ -0,0 +1,291 @@
+"""
+Incremental (delta) scanning for AWS Auto Inventory.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from ..config.models import Inventory, Sheet
+from ..output.encoder import InventoryJSONEncoder
+from .service import ServiceResult
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Keys that identify a resource, in order of preference
+IDENTITY_KEY_SUFFIXES = ("Arn", "ARN", "Id", "ID", "Name")
+
+STATE_VERSION = 1
+
+
+class DeltaTracker:
+    """
+    Fingerprint store turning full scan results into deltas against the previous run.
+
+    A content hash of every resource is kept per (inventory, account, region,
+    service, function). On the next run each result is compared against it and
+    replaced by the resources that were added, changed or removed. Sheets with a
+    TTL are not scanned again until the TTL has expired since their last scan.
+    """
+
+    def __init__(self, state_path: str):
+        """
+        Initialize delta tracker.
+
+        Args:
+            state_path: Path of the JSON state file. It is created on the first save.
+        """
+        self.state_path = state_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(state_path):
+            with open(state_path, "r") as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                self._entries = state.get("entries", {})
+            else:
+                logger.warning(f"Ignoring state file {state_path} with unsupported version")
+
+        logger.info(f"Loaded {len(self._entries)} fingerprints from {state_path}")
+
+    def is_fresh(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        region: str,
+        account: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        Check whether a sheet was scanned within its TTL.
+
+        Args:
+            inventory: Inventory configuration.
+            sheet: Sheet configuration.
+            region: AWS region.
+            account: Account information (id, name) for organization scans.
+
+        Returns:
+            True if the sheet has a TTL that has not expired since its last scan.
+        """
+        if not sheet.ttl:
+            return False
+
+        with self._lock:
+            entry = self._entries.get(self._key(inventory, sheet, region, account))
+
+        return entry is not None and time.time() - entry["scanned_at"] < sheet.ttl
+
+    def skipped_result(self, sheet: Sheet, region: str) -> ServiceResult:
+        """
+        Build the result reported for a sheet skipped because of its TTL.
+
+        Args:
+            sheet: Sheet configuration.
+            region: AWS region.
+
+        Returns:
+            Successful service result without data and with a skipped delta.
+        """
+        return ServiceResult(
+            service=sheet.service,
+            function=sheet.function,
+            region=region,
+            result=None,
+            delta={"skipped": True, "added": [], "changed": [], "removed": []}
+        )
+
+    def apply(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        service_result: ServiceResult,
+        account: Optional[Dict[str, str]] = None
+    ) -> ServiceResult:
+        """
+        Replace a service result's data by its delta against the previous run.
+
+        The new fingerprints are stored for the next run. Failed results are left
+        untouched and keep the previous fingerprints.
+
+        Args:
+            inventory: Inventory configuration.
+            sheet: Sheet configuration.
+            service_result: Service scan result.
+            account: Account information (id, name) for organization scans.
+
+        Returns:
+            The same service result, with result set to None and delta set.
+        """
+        if not service_result.success:
+            return service_result
+
+        resources = _index_resources(service_result.result)
+        hashes = {resource_id: digest for resource_id, (digest, _) in resources.items()}
+        key = self._key(inventory, sheet, service_result.region, account)
+
+        with self._lock:
+            previous = self._entries.get(key, {}).get("resources", {})
+            self._entries[key] = {"scanned_at": time.time(), "resources": hashes}
+
+        delta: Dict[str, Any] = {"skipped": False, "added": [], "changed": [], "removed": []}
+        for resource_id, (digest, resource) in resources.items():
+            if resource_id not in previous:
+                delta["added"].append(resource)
+            elif previous[resource_id] != digest:
+                delta["changed"].append(resource)
+        delta["removed"] = [resource_id for resource_id in previous if resource_id not in hashes]
+        delta["unchanged"] = len(resources) - len(delta["added"]) - len(delta["changed"])
+
+        service_result.result = None
+        service_result.delta = delta
+        return service_result
+
+    def get_fingerprints(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        region: str,
+        account: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the fingerprints stored for a sheet, to journal them with its result.
+
+        Args:
+            inventory: Inventory configuration.
+            sheet: Sheet configuration.
+            region: AWS region.
+            account: Account information (id, name) for organization scans.
+
+        Returns:
+            The sheet's state entry, or None if it has none.
+        """
+        with self._lock:
+            return self._entries.get(self._key(inventory, sheet, region, account))
+
+    def restore(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        region: str,
+        fingerprints: Dict[str, Any],
+        account: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Restore the fingerprints of a sheet replayed from a checkpoint journal.
+
+        Args:
+            inventory: Inventory configuration.
+            sheet: Sheet configuration.
+            region: AWS region.
+            fingerprints: State entry returned by get_fingerprints.
+            account: Account information (id, name) for organization scans.
+        """
+        with self._lock:
+            self._entries[self._key(inventory, sheet, region, account)] = fingerprints
+
+    def save(self) -> None:
+        """
+        Write the fingerprints to the state file.
+        """
+        with self._lock:
+            state = {"version": STATE_VERSION, "entries": self._entries}
+            directory = os.path.dirname(self.state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Replace the file atomically so an interrupted save keeps the old state
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path)
+
+        logger.info(f"Saved {len(self._entries)} fingerprints to {self.state_path}")
+
+    def _key(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        region: str,
+        account: Optional[Dict[str, str]]
+    ) -> str:
+        """
+        Build the state key of a sheet.
+        """
+        return sheet_key(inventory, sheet, region, account)
+
+
+def sheet_key(
+    inventory: Inventory,
+    sheet: Sheet,
+    region: str,
+    account: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Build a key identifying one sheet scanned in one account and region.
+
+    Args:
+        inventory: Inventory configuration.
+        sheet: Sheet configuration.
+        region: AWS region.
+        account: Account information (id, name) for organization scans.
+
+    Returns:
+        Key made of the inventory, account, region, service and function, plus a
+        hash of the parameters so sheets calling the same function do not collide.
+    """
+    account_id = account["id"] if account else inventory.aws.profile or "default"
+    key = f"{inventory.name}/{account_id}/{region}/{sheet.service}.{sheet.function}"
+    if sheet.parameters:
+        key += "#" + _digest(sheet.parameters)[:12]
+    return key
+
+
+def resource_id(resource: Any) -> Optional[str]:
+    """
+    Find the identifier of a resource.
+
+    Args:
+        resource: Resource from an API response.
+
+    Returns:
+        The value of the first key ending in Arn, Id or Name, or None if the
+        resource has no such key.
+    """
+    if isinstance(resource, str):
+        return resource
+    if not isinstance(resource, dict):
+        return None
+
+    for suffix in IDENTITY_KEY_SUFFIXES:
+        for key, value in resource.items():
+            if key.endswith(suffix) and isinstance(value, str):
+                return value
+    return None
+
+
+def _index_resources(result: Any) -> Dict[str, Any]:
+    """
+    Map each resource of a result to its content hash and the resource itself.
+
+    Resources without an identifier are identified by their content hash, so a
+    change to them is reported as a removal and an addition.
+    """
+    items: List[Any] = result if isinstance(result, list) else ([] if result is None else [result])
+    resources = {}
+    for item in items:
+        digest = _digest(item)
+        resources[resource_id(item) or digest] = (digest, item)
+    return resources
+
+
+def _digest(value: Any) -> str:
+    """
+    Hash a JSON-serializable value independently of key order.
+    """
+    encoded = json.dumps(value, sort_keys=True, cls=InventoryJSONEncoder)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
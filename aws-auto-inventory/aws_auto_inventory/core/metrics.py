@@ -0,0 +1,398 @@
+"""
+Scan metrics for AWS Auto Inventory.
+"""
+import os
+import math
+import time
+import logging
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .rate_limiter import THROTTLING_ERROR_CODES
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Quantiles reported in summaries and exported to Prometheus
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Call being measured in the current thread. boto3 calls run synchronously in
+# the calling thread, so botocore event handlers can attribute their data to it.
+_current = threading.local()
+
+
+class CallMetrics:
+    """
+    Measurements of one AWSClient.call_api call, across all its pages and retries.
+    """
+
+    def __init__(self, service: str, function: str, region: Optional[str]):
+        """
+        Initialize call metrics.
+
+        Args:
+            service: AWS service name.
+            function: API function name.
+            region: AWS region.
+        """
+        self.service = service
+        self.function = function
+        self.region = region or ""
+        self.started_at = time.monotonic()
+        self.duration = 0.0
+        self.pages = 0
+        self.bytes = 0
+        self.retries = 0
+        self.throttles = 0
+        self.success = True
+        self.parent: Optional["CallMetrics"] = None
+
+
+class MetricsCollector:
+    """
+    Thread-safe collector of per-call latency, page, byte, retry and throttle metrics.
+
+    Calls are grouped by (service, function, region). Every duration is kept, so
+    exact percentiles can be reported at the end of a scan, and the totals can be
+    exported in the Prometheus text format to a file or over HTTP.
+    """
+
+    def __init__(self):
+        """
+        Initialize metrics collector.
+        """
+        self._durations: Dict[Tuple[str, str, str], List[float]] = defaultdict(list)
+        self._counters: Dict[Tuple[str, str, str], Dict[str, float]] = defaultdict(
+            lambda: {"calls": 0, "errors": 0, "pages": 0, "bytes": 0, "retries": 0, "throttles": 0}
+        )
+        self._queue_waits: Dict[Tuple[str, str, str], List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def start_call(self, service: str, function: str, region: Optional[str]) -> CallMetrics:
+        """
+        Start measuring a call in the current thread.
+
+        Args:
+            service: AWS service name.
+            function: API function name.
+            region: AWS region.
+
+        Returns:
+            Metrics of the call, to pass to finish_call.
+        """
+        call = CallMetrics(service, function, region)
+        call.parent = getattr(_current, "call", None)
+        _current.call = call
+        return call
+
+    def finish_call(self, call: CallMetrics) -> None:
+        """
+        Stop measuring a call and add it to the totals.
+
+        Args:
+            call: Metrics returned by start_call.
+        """
+        call.duration = time.monotonic() - call.started_at
+        _current.call = call.parent
+
+        key = (call.service, call.function, call.region)
+        with self._lock:
+            self._durations[key].append(call.duration)
+            counters = self._counters[key]
+            counters["calls"] += 1
+            counters["errors"] += 0 if call.success else 1
+            counters["pages"] += call.pages
+            counters["bytes"] += call.bytes
+            counters["retries"] += call.retries
+            counters["throttles"] += call.throttles
+
+    def add_retry(self) -> None:
+        """
+        Count a retry of the call being measured in the current thread.
+        """
+        call = current_call()
+        if call is not None:
+            call.retries += 1
+
+    def observe_queue_wait(self, service: str, function: str, region: str, seconds: float) -> None:
+        """
+        Record the time a sheet waited for a worker before its scan started.
+
+        Args:
+            service: AWS service name.
+            function: API function name.
+            region: AWS region.
+            seconds: Time waited.
+        """
+        with self._lock:
+            self._queue_waits[(service, function, region)].append(seconds)
+
+    def register(self, client: Any) -> None:
+        """
+        Measure the HTTP responses, throttles and retries of a boto3 client.
+
+        Args:
+            client: boto3 client.
+        """
+        client.meta.events.register(
+            "after-call", _on_after_call, unique_id="aws-auto-inventory-metrics"
+        )
+        client.meta.events.register(
+            "needs-retry", _on_needs_retry, unique_id="aws-auto-inventory-metrics-throttle"
+        )
+
+    def summary(self, by: Tuple[str, ...] = ("service",)) -> List[Dict[str, Any]]:
+        """
+        Summarize the calls made so far.
+
+        Args:
+            by: Fields to group by, among "service", "function" and "region".
+
+        Returns:
+            One row per group, sorted by p99 duration, slowest first, with the
+            group fields, calls, errors, p50/p95/p99 durations, pages, bytes,
+            retries, throttles and the p95 queue wait.
+        """
+        fields = ("service", "function", "region")
+        groups: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+        with self._lock:
+            for key, durations in self._durations.items():
+                group_key = tuple(value for field, value in zip(fields, key) if field in by)
+                group = groups.setdefault(group_key, {"durations": [], "waits": [], "counters": defaultdict(float)})
+                group["durations"].extend(durations)
+                for name, value in self._counters[key].items():
+                    group["counters"][name] += value
+            for key, waits in self._queue_waits.items():
+                group_key = tuple(value for field, value in zip(fields, key) if field in by)
+                if group_key in groups:
+                    groups[group_key]["waits"].extend(waits)
+
+        rows = []
+        for group_key, group in groups.items():
+            row: Dict[str, Any] = dict(zip([field for field in fields if field in by], group_key))
+            durations = sorted(group["durations"])
+            row["calls"] = int(group["counters"]["calls"])
+            row["errors"] = int(group["counters"]["errors"])
+            for quantile in QUANTILES:
+                row[f"p{int(quantile * 100)}"] = percentile(durations, quantile)
+            for name in ("pages", "bytes", "retries", "throttles"):
+                row[name] = int(group["counters"][name])
+            row["queue_wait_p95"] = percentile(sorted(group["waits"]), 0.95)
+            rows.append(row)
+
+        return sorted(rows, key=lambda row: row["p99"], reverse=True)
+
+    def format_summary(self, by: Tuple[str, ...] = ("service",)) -> str:
+        """
+        Format the summary as a text table.
+
+        Args:
+            by: Fields to group by, among "service", "function" and "region".
+
+        Returns:
+            Table with one line per group.
+        """
+        rows = self.summary(by)
+        columns = list(by) + [
+            "calls", "errors", "p50", "p95", "p99", "pages", "bytes", "retries", "throttles", "queue_wait_p95"
+        ]
+
+        def cell(value: Any) -> str:
+            return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+        table = [columns] + [[cell(row[column]) for column in columns] for row in rows]
+        widths = [max(len(line[index]) for line in table) for index in range(len(columns))]
+        return "\n".join(
+            "  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip()
+            for line in table
+        )
+
+    def to_prometheus(self) -> str:
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        Returns:
+            Metrics text, with call durations and queue waits as summaries and the
+            other measurements as counters labelled by service, function and region.
+        """
+        lines = []
+
+        with self._lock:
+            durations = {key: sorted(values) for key, values in self._durations.items()}
+            counters = {key: dict(values) for key, values in self._counters.items()}
+            queue_waits = {key: sorted(values) for key, values in self._queue_waits.items()}
+
+        lines.append("# HELP aws_inventory_call_duration_seconds Duration of API calls, including pages and retries.")
+        lines.append("# TYPE aws_inventory_call_duration_seconds summary")
+        for key, values in sorted(durations.items()):
+            labels = _labels(service=key[0], function=key[1], region=key[2])
+            for quantile in QUANTILES:
+                quantile_labels = _labels(service=key[0], function=key[1], region=key[2], quantile=str(quantile))
+                lines.append(f"aws_inventory_call_duration_seconds{quantile_labels} {percentile(values, quantile)}")
+            lines.append(f"aws_inventory_call_duration_seconds_sum{labels} {math.fsum(values)}")
+            lines.append(f"aws_inventory_call_duration_seconds_count{labels} {len(values)}")
+
+        counter_help = {
+            "calls": "API calls made.",
+            "errors": "API calls that failed after all retries.",
+            "pages": "Response pages fetched.",
+            "bytes": "Response bytes received.",
+            "retries": "Retried requests.",
+            "throttles": "Requests rejected by throttling.",
+        }
+        for name, help_text in counter_help.items():
+            metric = f"aws_inventory_{name}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for key, values in sorted(counters.items()):
+                lines.append(f"{metric}{_labels(service=key[0], function=key[1], region=key[2])} {int(values[name])}")
+
+        lines.append("# HELP aws_inventory_queue_wait_seconds Time sheets waited for a worker.")
+        lines.append("# TYPE aws_inventory_queue_wait_seconds summary")
+        for key, values in sorted(queue_waits.items()):
+            labels = _labels(service=key[0], function=key[1], region=key[2])
+            for quantile in QUANTILES:
+                quantile_labels = _labels(service=key[0], function=key[1], region=key[2], quantile=str(quantile))
+                lines.append(f"aws_inventory_queue_wait_seconds{quantile_labels} {percentile(values, quantile)}")
+            lines.append(f"aws_inventory_queue_wait_seconds_sum{labels} {math.fsum(values)}")
+            lines.append(f"aws_inventory_queue_wait_seconds_count{labels} {len(values)}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Write the metrics to a Prometheus text file, e.g. for the node exporter's
+        textfile collector.
+
+        Args:
+            path: Path of the .prom file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Replace the file atomically so collectors never read a partial file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+
+        logger.info(f"Wrote metrics to {path}")
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve the metrics over HTTP for Prometheus to scrape during the scan.
+
+        Args:
+            port: Port to listen on.
+            host: Address to listen on. Defaults to the loopback interface, so the
+                  metrics are only exposed to other hosts when asked for.
+
+        Returns:
+            Running server. Call shutdown() on it to stop serving.
+        """
+        collector = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = collector.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(f"Metrics request: {format % args}")
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=server.serve_forever, name="aws-auto-inventory-metrics", daemon=True)
+        thread.start()
+
+        logger.info(f"Serving metrics on {server.server_address[0]}:{server.server_address[1]}")
+        return server
+
+
+def current_call() -> Optional[CallMetrics]:
+    """
+    Get the call being measured in the current thread.
+
+    Returns:
+        Call metrics, or None if no call is being measured.
+    """
+    return getattr(_current, "call", None)
+
+
+def percentile(values: List[float], quantile: float) -> float:
+    """
+    Get a percentile of sorted values by the nearest-rank method.
+
+    Args:
+        values: Sorted values.
+        quantile: Quantile between 0 and 1.
+
+    Returns:
+        The percentile, or 0.0 for no values.
+    """
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(quantile * len(values)))
+    return values[rank - 1]
+
+
+def _on_after_call(http_response: Optional[Any] = None, parsed: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+    """
+    botocore "after-call" handler counting the pages, bytes and retries of a response.
+
+    The event is emitted once per request (each page of a paginated call), after
+    botocore's own retries.
+    """
+    call = current_call()
+    if call is None:
+        return
+
+    if http_response is not None:
+        if http_response.status_code < 300:
+            call.pages += 1
+        length = http_response.headers.get("content-length")
+        if length is not None:
+            call.bytes += int(length)
+        elif getattr(http_response, "_content", None) is not None:
+            # Streaming bodies are never read here, only content already loaded
+            call.bytes += len(http_response._content)
+
+    if parsed:
+        call.retries += parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+
+def _on_needs_retry(response: Optional[Any] = None, **kwargs: Any) -> None:
+    """
+    botocore "needs-retry" handler counting throttling errors.
+    """
+    call = current_call()
+    if call is None or response is None:
+        return
+
+    if response[1].get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+        call.throttles += 1
+
+
+def _labels(**labels: str) -> str:
+    """
+    Format Prometheus labels, escaping their values.
+    """
+    formatted = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + formatted + "}"
+
+
+def _escape(value: str) -> str:
+    """
+    Escape a Prometheus label value.
+    """
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
@@ -2,13 +2,20 @@
 Organization scanner for AWS Auto Inventory.
 """
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+import concurrent.futures
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
 
 import boto3
 
 from ..config.models import Inventory
+from .credentials import CredentialBroker
+from .global_services import GLOBAL_REGION
 from .region import RegionScanner, RegionResult
 
+if TYPE_CHECKING:
+    from .planner import ScanPlanner
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
@@ -63,11 +70,30 @@ class OrganizationScanner:
     Scanner for AWS organizations.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers_accounts: Optional[int] = None,
+        max_workers_regions: Optional[int] = None,
+        max_workers_total: Optional[int] = None,
+        planner: Optional["ScanPlanner"] = None,
+        credential_broker: Optional[CredentialBroker] = None
+    ):
         """
         Initialize organization scanner.
+        
+        Args:
+            max_workers_accounts: Maximum number of accounts to scan concurrently.
+            max_workers_regions: Maximum number of regions to scan concurrently within each account.
+            max_workers_total: Maximum number of region scans in flight across all accounts.
+            planner: Planner resolving "all" regions to the regions enabled in each account.
+            credential_broker: Broker assuming roles in member accounts and caching
+                               their credentials. Defaults to an in-memory cache.
         """
-        pass
+        self.max_workers_accounts = max_workers_accounts
+        self.max_workers_regions = max_workers_regions
+        self.max_workers_total = max_workers_total
+        self.planner = planner
+        self.credential_broker = credential_broker or CredentialBroker()
     
     def get_organization_accounts(self, session: boto3.Session) -> List[Dict[str, str]]:
         """
@@ -107,7 +133,8 @@ class OrganizationScanner:
         self, 
         session: boto3.Session, 
         account_id: str, 
-        role_name: str
+        role_name: str,
+        sts_client: Optional[Any] = None
     ) -> Optional[boto3.Session]:
         """
         Assume a role in the specified account.
@@ -116,28 +143,22 @@ class OrganizationScanner:
             session: boto3 Session for the management account.
             account_id: AWS account ID to assume the role in.
             role_name: Name of the IAM role to assume.
+            sts_client: STS client of the management session. Pass a client created up
+                        front when assuming roles from several threads, since boto3
+                        sessions are not thread-safe.
             
         Returns:
             New boto3 Session with the assumed role credentials, or None if the role assumption fails.
+            The credentials come from the broker's cache when still valid and are
+            refreshed automatically before they expire.
         """
         logger.info(f"Assuming role {role_name} in account {account_id}")
         
-        sts_client = session.client('sts')
-        role_arn = f'arn:aws:iam::{account_id}:role/{role_name}'
+        if sts_client is None:
+            sts_client = session.client('sts')
         
         try:
-            response = sts_client.assume_role(
-                RoleArn=role_arn,
-                RoleSessionName='AWSAutoInventorySession',
-                DurationSeconds=3600
-            )
-            
-            credentials = response['Credentials']
-            assumed_session = boto3.Session(
-                aws_access_key_id=credentials['AccessKeyId'],
-                aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken']
-            )
+            assumed_session = self.credential_broker.get_session(sts_client, account_id, role_name)
             
             logger.info(f"Successfully assumed role in account {account_id}")
             return assumed_session
@@ -175,53 +196,153 @@ class OrganizationScanner:
         
         account_results = []
         
-        # Scan each account
-        for account in accounts:
-            account_id = account['id']
-            account_name = account['name']
-            
-            logger.info(f"Processing account: {account_name} ({account_id})")
-            
-            # Assume role in the account
-            account_session = self.assume_role(
-                management_session, 
-                account_id, 
-                inventory.aws.role_name
-            )
+        # Clients are thread-safe, the session they come from is not
+        sts_client = management_session.client('sts')
+        
+        # Assume roles in all accounts up front, so account scans never queue on STS
+        self.credential_broker.prefetch(
+            sts_client,
+            [account['id'] for account in accounts],
+            inventory.aws.role_name
+        )
+        
+        # Account threads only assume roles and wait; region scans from every account
+        # share one pool, which bounds the work in flight across the organization
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers_total
+        ) as region_executor, concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers_accounts
+        ) as executor:
+            # Create a future for each account
+            future_to_account = {
+                executor.submit(
+                    self.scan_account,
+                    inventory,
+                    region_scanner,
+                    management_session,
+                    account,
+                    sts_client,
+                    region_executor
+                ): account
+                for account in accounts
+            }
             
-            if account_session:
-                # Scan regions in the account
-                region_results = []
-                
-                for region in inventory.aws.region:
-                    try:
-                        region_result = region_scanner.scan_region(
-                            inventory, 
-                            account_session, 
-                            region
+            # Process completed futures
+            for future in concurrent.futures.as_completed(future_to_account):
+                account = future_to_account[future]
+                try:
+                    account_results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Error scanning account {account['id']}: {str(e)}")
+                    account_results.append(
+                        AccountResult(
+                            account_id=account['id'],
+                            account_name=account['name'],
+                            regions=[],
+                            success=False,
+                            error=f"Error scanning account: {str(e)}"
                         )
-                        region_results.append(region_result)
-                    except Exception as e:
-                        logger.error(f"Error scanning region {region} in account {account_id}: {str(e)}")
-                
-                account_results.append(
-                    AccountResult(
-                        account_id=account_id,
-                        account_name=account_name,
-                        regions=region_results
-                    )
-                )
-            else:
-                account_results.append(
-                    AccountResult(
-                        account_id=account_id,
-                        account_name=account_name,
-                        regions=[],
-                        success=False,
-                        error=f"Failed to assume role in account {account_id}"
                     )
-                )
         
         logger.info("Completed organization scan")
         
-        return account_results
\ No newline at end of file
+        return account_results
+    
+    def scan_account(
+        self,
+        inventory: Inventory,
+        region_scanner: RegionScanner,
+        management_session: boto3.Session,
+        account: Dict[str, str],
+        sts_client: Any,
+        region_executor: concurrent.futures.Executor
+    ) -> AccountResult:
+        """
+        Scan all configured regions in a single member account.
+        
+        Args:
+            inventory: Inventory configuration.
+            region_scanner: Region scanner to use for scanning regions.
+            management_session: boto3 Session for the management account.
+            account: Account information (id, name, email).
+            sts_client: STS client of the management session.
+            region_executor: Executor shared by all accounts for region scans.
+            
+        Returns:
+            Account scan result.
+        """
+        account_id = account['id']
+        account_name = account['name']
+        
+        logger.info(f"Processing account: {account_name} ({account_id})")
+        
+        # Assume role in the account
+        account_session = self.assume_role(
+            management_session, 
+            account_id, 
+            inventory.aws.role_name,
+            sts_client
+        )
+        
+        if not account_session:
+            return AccountResult(
+                account_id=account_id,
+                account_name=account_name,
+                regions=[],
+                success=False,
+                error=f"Failed to assume role in account {account_id}"
+            )
+        
+        regions = inventory.aws.region
+        if self.planner is not None:
+            regions = self.planner.get_regions(inventory, account_session, account)
+        
+        # Scan regions in the account concurrently, at most max_workers_regions at a time
+        region_results = []
+        region_slots = threading.BoundedSemaphore(
+            self.max_workers_regions or len(regions) or 1
+        )
+        future_to_region = {}
+        
+        for region in regions:
+            region_slots.acquire()
+            future = region_executor.submit(
+                region_scanner.scan_region,
+                inventory,
+                account_session,
+                region,
+                account=account
+            )
+            future.add_done_callback(lambda _: region_slots.release())
+            future_to_region[future] = region
+        
+        # Global services are scanned once for the account
+        region_slots.acquire()
+        future = region_executor.submit(
+            region_scanner.scan_global,
+            inventory,
+            account_session,
+            regions,
+            account=account
+        )
+        future.add_done_callback(lambda _: region_slots.release())
+        future_to_region[future] = GLOBAL_REGION
+        
+        # Process completed futures
+        for future in concurrent.futures.as_completed(future_to_region):
+            region = future_to_region[future]
+            try:
+                region_result = future.result()
+                if region_result is not None:
+                    region_results.append(region_result)
+            except Exception as e:
+                logger.error(f"Error scanning region {region} in account {account_id}: {str(e)}")
+                region_results.append(RegionResult(region=region, services=[], error=str(e)))
+        
+        logger.info(f"Completed account: {account_name} ({account_id})")
+        
+        return AccountResult(
+            account_id=account_id,
+            account_name=account_name,
+            regions=region_results
+        )
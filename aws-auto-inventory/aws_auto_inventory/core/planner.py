@@ -0,0 +1,260 @@
+"""
+Scan planning for AWS Auto Inventory.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import boto3
+import botocore
+import botocore.session
+
+from ..config.models import Inventory, Sheet
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Region list value meaning every region enabled in the account
+ALL_REGIONS = "all"
+
+
+class ScanPlanner:
+    """
+    Planner deciding which regions and sheets are worth scanning.
+
+    The regions enabled in each account and the regions each service is offered
+    in (from botocore's endpoint data) are cached on disk, so an inventory can ask
+    for all regions without a describe_regions call on every run, and sheets are
+    never sent to regions where their service does not exist.
+    """
+
+    def __init__(self, cache_dir: str, ttl: int = 86400):
+        """
+        Initialize scan planner.
+
+        Args:
+            cache_dir: Directory holding the region and service availability caches.
+            ttl: Time (in seconds) after which cached data is refreshed.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._regions_path = os.path.join(cache_dir, "enabled_regions.json")
+        self._services_path = os.path.join(cache_dir, "service_regions.json")
+        self._enabled_regions: Optional[Dict[str, Any]] = None
+        self._service_regions: Optional[Dict[str, List[str]]] = None
+        self._generated_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_regions(
+        self,
+        inventory: Inventory,
+        session: boto3.Session,
+        account: Optional[Dict[str, str]] = None
+    ) -> List[str]:
+        """
+        Get the regions to scan for an inventory in an account.
+
+        Args:
+            inventory: Inventory configuration.
+            session: boto3 Session for the account.
+            account: Account information (id, name) for organization scans.
+
+        Returns:
+            The configured regions, or every region enabled in the account when the
+            configured list is empty or "all".
+        """
+        configured = inventory.aws.region
+        if configured and configured != [ALL_REGIONS]:
+            return configured
+
+        account_key = account["id"] if account else get_account_key(session)
+        return self.get_enabled_regions(session, account_key)
+
+    def get_enabled_regions(self, session: boto3.Session, account_key: str) -> List[str]:
+        """
+        Get the regions enabled in an account, from the cache if it is fresh.
+
+        Args:
+            session: boto3 Session for the account.
+            account_key: Key identifying the account in the cache.
+
+        Returns:
+            Sorted list of region names.
+        """
+        with self._lock:
+            if self._enabled_regions is None:
+                self._enabled_regions = _load_json(self._regions_path) or {}
+            entry = self._enabled_regions.get(account_key)
+
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+            return entry["regions"]
+
+        logger.info(f"Discovering enabled regions for {account_key}")
+        ec2_client = session.client("ec2", region_name=session.region_name or "us-east-1")
+        regions = sorted(
+            region["RegionName"]
+            for region in ec2_client.describe_regions()["Regions"]
+            if region.get("OptInStatus") in (None, "opt-in-not-required", "opted-in")
+        )
+
+        with self._lock:
+            self._enabled_regions[account_key] = {"regions": regions, "fetched_at": time.time()}
+            _save_json(self._regions_path, self._enabled_regions)
+
+        return regions
+
+    def is_available(self, service: str, region: str) -> bool:
+        """
+        Check whether a service is offered in a region.
+
+        Args:
+            service: AWS service name.
+            region: AWS region.
+
+        Returns:
+            False only if botocore's endpoint data lists the service's regions and the
+            region is not one of them. Global services and services without regional
+            endpoint data are treated as available everywhere.
+        """
+        regions = self._get_service_regions(service)
+        return not regions or region in regions
+
+    def get_sheets(self, sheets: List[Sheet], region: str) -> List[Sheet]:
+        """
+        Drop the sheets whose service is not offered in a region.
+
+        Args:
+            sheets: Sheet configurations.
+            region: AWS region.
+
+        Returns:
+            Sheets worth scanning in the region.
+        """
+        self._ensure_service_regions(sheet.service for sheet in sheets)
+        planned = []
+        for sheet in sheets:
+            if self.is_available(sheet.service, region):
+                planned.append(sheet)
+            else:
+                logger.debug(f"Skipping service {sheet.service} in region {region}, not offered there")
+        return planned
+
+    def _get_service_regions(self, service: str) -> List[str]:
+        """
+        Get the regions a service is offered in, from the availability matrix.
+
+        Args:
+            service: AWS service name.
+
+        Returns:
+            Sorted region names, empty for global services.
+        """
+        self._ensure_service_regions([service])
+        with self._lock:
+            return self._service_regions[service]
+
+    def _ensure_service_regions(self, services: Iterable[str]) -> None:
+        """
+        Add the services missing from the availability matrix.
+
+        Missing services are built with one botocore session, outside the lock, and
+        the matrix is written once. It is cached on disk per botocore version,
+        since the endpoint data only changes when botocore is upgraded.
+
+        Args:
+            services: AWS service names.
+        """
+        with self._lock:
+            if self._service_regions is None:
+                cached = _load_json(self._services_path)
+                if (
+                    cached
+                    and cached.get("botocore_version") == botocore.__version__
+                    and time.time() - cached.get("generated_at", 0) < self.ttl
+                ):
+                    self._service_regions = cached["services"]
+                    self._generated_at = cached["generated_at"]
+                else:
+                    self._service_regions = {}
+                    self._generated_at = time.time()
+            missing = sorted(set(services) - set(self._service_regions))
+
+        if not missing:
+            return
+
+        built = build_service_regions(missing)
+        with self._lock:
+            self._service_regions.update(built)
+            _save_json(self._services_path, {
+                "botocore_version": botocore.__version__,
+                "generated_at": self._generated_at,
+                "services": self._service_regions
+            })
+
+
+def get_account_key(session: boto3.Session) -> str:
+    """
+    Build a cache key for the account a session's credentials belong to.
+
+    Args:
+        session: boto3 Session.
+
+    Returns:
+        The profile name and a hash of the access key ID, so the key ID itself is
+        not written to the cache.
+    """
+    credentials = session.get_credentials()
+    access_key = credentials.access_key if credentials is not None else ""
+    digest = hashlib.sha256(access_key.encode("utf-8")).hexdigest()[:16]
+    return f"{session.profile_name}:{digest}"
+
+
+def build_service_regions(services: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """
+    Build the regions each service is offered in from botocore's endpoint data.
+
+    Args:
+        services: Services to look up. Defaults to every service botocore knows.
+
+    Returns:
+        Mapping of service name to the sorted regions of all partitions. Global
+        services map to an empty list.
+    """
+    session = botocore.session.get_session()
+    partitions = session.get_available_partitions()
+    service_regions = {}
+    for service in services or session.get_available_services():
+        regions = set()
+        for partition in partitions:
+            regions.update(session.get_available_regions(service, partition_name=partition))
+        service_regions[service] = sorted(regions)
+    return service_regions
+
+
+def _load_json(path: str) -> Optional[Any]:
+    """
+    Read a cache file, ignoring missing or corrupt files.
+    """
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_json(path: str, data: Any) -> None:
+    """
+    Atomically write a cache file.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write cache file {path}: {e}")
@@ -0,0 +1,622 @@
+"""
+Compiled jq-style queries over AWS API responses for AWS Auto Inventory.
+
+Sheets select data from responses with jq expressions such as
+'.Reservations[].Instances[] | select(.State.Name == "running") | {InstanceId, Type: .InstanceType}'.
+Expressions are parsed once into a tree of Python closures and evaluated
+directly on boto3 response objects, datetimes included, without serializing
+the response to JSON first.
+
+The supported subset covers paths ('.a.b', '."key"', '.[]', '.[0]', '.a[]?'),
+pipes, commas, parentheses, literals, array and object construction,
+comparisons, 'and', 'or', '//', and the builtins select, map, not, length,
+keys, has, contains, startswith, endswith, tostring, ascii_downcase,
+ascii_upcase, type, to_entries, empty and values.
+"""
+import re
+import json
+import functools
+from datetime import date, datetime
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+# A compiled filter maps an input value to the stream of its outputs
+Filter = Callable[[Any], Iterator[Any]]
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>==|!=|<=|>=|//|[.|,()\[\]{}:?<>-])
+""", re.VERBOSE)
+
+_KEYWORDS = {"and", "or", "true", "false", "null"}
+
+_COMPARISONS = {
+    "==": lambda a, b: _equal(a, b),
+    "!=": lambda a, b: not _equal(a, b),
+    "<": lambda a, b: _order(a) < _order(b),
+    "<=": lambda a, b: _order(a) <= _order(b),
+    ">": lambda a, b: _order(a) > _order(b),
+    ">=": lambda a, b: _order(a) >= _order(b),
+}
+
+
+class QuerySyntaxError(ValueError):
+    """
+    Exception raised when an expression cannot be compiled.
+    """
+    pass
+
+
+class QueryError(ValueError):
+    """
+    Exception raised when an expression cannot be applied to a value.
+    """
+    pass
+
+
+class Query:
+    """
+    A compiled jq expression.
+    """
+
+    def __init__(self, expression: str, compiled: Filter):
+        """
+        Initialize query.
+
+        Args:
+            expression: Source expression.
+            compiled: Compiled filter.
+        """
+        self.expression = expression
+        self._compiled = compiled
+
+    def all(self, value: Any) -> List[Any]:
+        """
+        Apply the query and collect every output, like pyjq.all.
+
+        Args:
+            value: Input value, typically a boto3 response page.
+
+        Returns:
+            List of outputs.
+        """
+        return list(self._compiled(value))
+
+    def first(self, value: Any) -> Any:
+        """
+        Apply the query and return its first output, like pyjq.first.
+
+        Args:
+            value: Input value.
+
+        Returns:
+            First output, or None if there is none.
+        """
+        return next(self._compiled(value), None)
+
+    def __repr__(self) -> str:
+        return f"Query({self.expression!r})"
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_query(expression: str) -> Query:
+    """
+    Compile a jq expression.
+
+    Compiled queries are cached, so each distinct expression is parsed once.
+
+    Args:
+        expression: jq expression.
+
+    Returns:
+        Compiled query.
+
+    Raises:
+        QuerySyntaxError: If the expression is not valid or uses unsupported syntax.
+    """
+    parser = _Parser(_tokenize(expression))
+    compiled = parser.parse_pipe()
+    if parser.peek() is not None:
+        raise QuerySyntaxError(f"Unexpected {parser.peek()[1]!r} in {expression!r}")
+    return Query(expression, compiled)
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    """
+    Split an expression into (kind, text) tokens.
+    """
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = _TOKEN_PATTERN.match(expression, position)
+        if match is None:
+            raise QuerySyntaxError(f"Unexpected {expression[position]!r} in {expression!r}")
+        position = match.end()
+        kind = match.lastgroup
+        if kind == "space":
+            continue
+        text = match.group(kind)
+        if kind == "ident" and text in _KEYWORDS:
+            kind = "op"
+        tokens.append((kind, text))
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent parser compiling tokens into filters.
+
+    Precedence from lowest to highest: '|', ',', '//', 'or', 'and', comparisons,
+    then terms with their suffixes.
+    """
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Optional[Tuple[str, str]]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def accept(self, text: str) -> bool:
+        token = self.peek()
+        if token is not None and token[0] == "op" and token[1] == text:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, text: str) -> None:
+        if not self.accept(text):
+            found = self.peek()
+            raise QuerySyntaxError(f"Expected {text!r}, found {found[1] if found else 'end of expression'!r}")
+
+    def parse_pipe(self) -> Filter:
+        left = self.parse_comma()
+        while self.accept("|"):
+            left = _pipe(left, self.parse_comma())
+        return left
+
+    def parse_comma(self) -> Filter:
+        left = self.parse_alternative()
+        while self.accept(","):
+            left = _comma(left, self.parse_alternative())
+        return left
+
+    def parse_alternative(self) -> Filter:
+        left = self.parse_or()
+        while self.accept("//"):
+            left = _alternative(left, self.parse_or())
+        return left
+
+    def parse_or(self) -> Filter:
+        left = self.parse_and()
+        while self.accept("or"):
+            left = _boolean(left, self.parse_and(), any)
+        return left
+
+    def parse_and(self) -> Filter:
+        left = self.parse_comparison()
+        while self.accept("and"):
+            left = _boolean(left, self.parse_comparison(), all)
+        return left
+
+    def parse_comparison(self) -> Filter:
+        left = self.parse_postfix()
+        token = self.peek()
+        if token is not None and token[0] == "op" and token[1] in _COMPARISONS:
+            self.position += 1
+            left = _binary(left, self.parse_postfix(), _COMPARISONS[token[1]])
+        return left
+
+    def parse_postfix(self) -> Filter:
+        term = self.parse_term()
+        while True:
+            token = self.peek()
+            if token == ("op", "."):
+                next_token = self.peek(1)
+                if next_token is None or next_token[0] not in ("ident", "string") and next_token != ("op", "["):
+                    break
+                self.position += 1
+                if next_token[0] == "ident" or next_token[0] == "string":
+                    term = _pipe(term, self.parse_field())
+                # '.a.[0]' is handled by the bracket branch below
+            elif token == ("op", "["):
+                term = _pipe(term, self.parse_bracket())
+            elif token == ("op", "?"):
+                self.position += 1
+                term = _optional(term)
+            else:
+                break
+        return term
+
+    def parse_field(self) -> Filter:
+        kind, text = self.tokens[self.position]
+        self.position += 1
+        name = json.loads(text) if kind == "string" else text
+        return _field(name)
+
+    def parse_bracket(self) -> Filter:
+        self.expect("[")
+        if self.accept("]"):
+            return _iterate
+        index = self.parse_pipe()
+        self.expect("]")
+        return _index(index)
+
+    def parse_term(self) -> Filter:
+        token = self.peek()
+        if token is None:
+            raise QuerySyntaxError("Unexpected end of expression")
+        kind, text = token
+
+        if token == ("op", "."):
+            self.position += 1
+            following = self.peek()
+            if following is not None and following[0] in ("ident", "string"):
+                return self.parse_field()
+            if following == ("op", "["):
+                return self.parse_bracket()
+            return _identity
+
+        self.position += 1
+
+        if kind == "string":
+            return _literal(json.loads(text))
+        if kind == "number":
+            return _literal(float(text) if "." in text else int(text))
+        if token == ("op", "-"):
+            operand = self.parse_postfix()
+            return lambda value: (-result for result in operand(value))
+        if text in ("true", "false", "null") and kind == "op":
+            return _literal({"true": True, "false": False, "null": None}[text])
+        if token == ("op", "("):
+            inner = self.parse_pipe()
+            self.expect(")")
+            return inner
+        if token == ("op", "["):
+            if self.accept("]"):
+                return _literal_factory(list)
+            inner = self.parse_pipe()
+            self.expect("]")
+            return lambda value: iter([list(inner(value))])
+        if token == ("op", "{"):
+            return self.parse_object()
+        if kind == "ident":
+            return self.parse_function(text)
+
+        raise QuerySyntaxError(f"Unexpected {text!r}")
+
+    def parse_object(self) -> Filter:
+        entries: List[Tuple[Filter, Filter]] = []
+        while not self.accept("}"):
+            if entries:
+                self.expect(",")
+            kind, text = self.peek() or (None, None)
+            if kind in ("ident", "string") or (kind == "op" and text in _KEYWORDS):
+                self.position += 1
+                name = json.loads(text) if kind == "string" else text
+                key = _literal(name)
+                value = self.parse_alternative() if self.accept(":") else _field(name)
+            elif self.accept("("):
+                key = self.parse_pipe()
+                self.expect(")")
+                self.expect(":")
+                value = self.parse_alternative()
+            else:
+                raise QuerySyntaxError(f"Unexpected {text!r} in object construction")
+            entries.append((key, value))
+        return _object(entries)
+
+    def parse_function(self, name: str) -> Filter:
+        if name in _FUNCTIONS_WITH_ARGUMENT:
+            self.expect("(")
+            argument = self.parse_pipe()
+            self.expect(")")
+            return _FUNCTIONS_WITH_ARGUMENT[name](argument)
+        if name in _FUNCTIONS:
+            return _FUNCTIONS[name]
+        raise QuerySyntaxError(f"Unsupported function {name!r}")
+
+
+def _identity(value: Any) -> Iterator[Any]:
+    yield value
+
+
+def _literal(constant: Any) -> Filter:
+    return lambda value: iter([constant])
+
+
+def _literal_factory(factory: Callable[[], Any]) -> Filter:
+    return lambda value: iter([factory()])
+
+
+def _pipe(left: Filter, right: Filter) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        for intermediate in left(value):
+            yield from right(intermediate)
+    return apply
+
+
+def _comma(left: Filter, right: Filter) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        yield from left(value)
+        yield from right(value)
+    return apply
+
+
+def _alternative(left: Filter, right: Filter) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        found = False
+        try:
+            for result in left(value):
+                if _truthy(result):
+                    found = True
+                    yield result
+        except QueryError:
+            pass
+        if not found:
+            yield from right(value)
+    return apply
+
+
+def _boolean(left: Filter, right: Filter, combine: Callable[[Any], bool]) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        for left_result in left(value):
+            # Short-circuit like jq: 'false and x' and 'true or x' skip x
+            if combine is all and not _truthy(left_result):
+                yield False
+            elif combine is any and _truthy(left_result):
+                yield True
+            else:
+                for right_result in right(value):
+                    yield _truthy(right_result)
+    return apply
+
+
+def _binary(left: Filter, right: Filter, operator: Callable[[Any, Any], Any]) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        for right_result in right(value):
+            for left_result in left(value):
+                yield operator(left_result, right_result)
+    return apply
+
+
+def _optional(inner: Filter) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        try:
+            yield from inner(value)
+        except QueryError:
+            return
+    return apply
+
+
+def _field(name: str) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        if value is None:
+            yield None
+        elif isinstance(value, dict):
+            yield value.get(name)
+        else:
+            raise QueryError(f"Cannot index {_type(value)} with {name!r}")
+    return apply
+
+
+def _index(index: Filter) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        for key in index(value):
+            if value is None:
+                yield None
+            elif isinstance(value, dict) and isinstance(key, str):
+                yield value.get(key)
+            elif isinstance(value, list) and isinstance(key, int) and not isinstance(key, bool):
+                yield value[key] if -len(value) <= key < len(value) else None
+            else:
+                raise QueryError(f"Cannot index {_type(value)} with {_type(key)}")
+    return apply
+
+
+def _iterate(value: Any) -> Iterator[Any]:
+    if isinstance(value, list):
+        yield from value
+    elif isinstance(value, dict):
+        yield from value.values()
+    else:
+        raise QueryError(f"Cannot iterate over {_type(value)}")
+
+
+def _object(entries: List[Tuple[Filter, Filter]]) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        objects = [{}]
+        for key_filter, value_filter in entries:
+            expanded = []
+            for key in key_filter(value):
+                if not isinstance(key, str):
+                    raise QueryError(f"Object keys must be strings, not {_type(key)}")
+                for entry_value in value_filter(value):
+                    for partial in objects:
+                        expanded.append(dict(partial, **{key: entry_value}))
+            objects = expanded
+        yield from objects
+    return apply
+
+
+def _select(condition: Filter) -> Filter:
+    def apply(value: Any) -> Iterator[Any]:
+        for result in condition(value):
+            if _truthy(result):
+                yield value
+    return apply
+
+
+def _map(inner: Filter) -> Filter:
+    return lambda value: iter([[result for item in _iterate(value) for result in inner(item)]])
+
+
+def _unary(function: Callable[[Any], Any]) -> Filter:
+    return lambda value: iter([function(value)])
+
+
+def _with_argument(function: Callable[[Any, Any], Any]) -> Callable[[Filter], Filter]:
+    def build(argument: Filter) -> Filter:
+        return lambda value: (function(value, result) for result in argument(value))
+    return build
+
+
+def _length(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return abs(value)
+    if isinstance(value, (str, list, dict)):
+        return len(value)
+    raise QueryError(f"{_type(value)} has no length")
+
+
+def _keys(value: Any) -> List[Any]:
+    if isinstance(value, dict):
+        return sorted(value.keys())
+    if isinstance(value, list):
+        return list(range(len(value)))
+    raise QueryError(f"{_type(value)} has no keys")
+
+
+def _has(value: Any, key: Any) -> bool:
+    if isinstance(value, dict):
+        return key in value
+    if isinstance(value, list) and isinstance(key, int):
+        return 0 <= key < len(value)
+    raise QueryError(f"Cannot check whether {_type(value)} has a key")
+
+
+def _contains(value: Any, other: Any) -> bool:
+    if isinstance(value, str) and isinstance(other, str):
+        return other in value
+    if isinstance(value, dict) and isinstance(other, dict):
+        return all(key in value and _contains(value[key], item) for key, item in other.items())
+    if isinstance(value, list) and isinstance(other, list):
+        return all(any(_contains(item, wanted) for item in value) for wanted in other)
+    return _equal(value, other)
+
+
+def _string_function(function: Callable[[str, str], bool]) -> Callable[[Any, Any], bool]:
+    def apply(value: Any, argument: Any) -> bool:
+        if not isinstance(value, str) or not isinstance(argument, str):
+            raise QueryError("startswith/endswith require string inputs")
+        return function(value, argument)
+    return apply
+
+
+def _tostring(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (datetime, date)):
+        return str(value)
+    return json.dumps(value, default=str)
+
+
+def _to_entries(value: Any) -> List[dict]:
+    if not isinstance(value, dict):
+        raise QueryError(f"{_type(value)} has no keys")
+    return [{"key": key, "value": item} for key, item in value.items()]
+
+
+def _string_case(method: str) -> Callable[[Any], str]:
+    def apply(value: Any) -> str:
+        if not isinstance(value, str):
+            raise QueryError(f"{_type(value)} cannot be case-converted")
+        return getattr(value, method)()
+    return apply
+
+
+def _empty(value: Any) -> Iterator[Any]:
+    return iter(())
+
+
+def _values(value: Any) -> Iterator[Any]:
+    if value is not None:
+        yield value
+
+
+_FUNCTIONS = {
+    "not": _unary(lambda value: not _truthy(value)),
+    "length": _unary(_length),
+    "keys": _unary(_keys),
+    "tostring": _unary(_tostring),
+    "ascii_downcase": _unary(_string_case("lower")),
+    "ascii_upcase": _unary(_string_case("upper")),
+    "type": _unary(lambda value: _type(value)),
+    "to_entries": _unary(_to_entries),
+    "empty": _empty,
+    "values": _values,
+}
+
+_FUNCTIONS_WITH_ARGUMENT = {
+    "select": _select,
+    "map": _map,
+    "has": _with_argument(_has),
+    "contains": _with_argument(_contains),
+    "startswith": _with_argument(_string_function(str.startswith)),
+    "endswith": _with_argument(_string_function(str.endswith)),
+}
+
+
+def _truthy(value: Any) -> bool:
+    """
+    jq truthiness: only null and false are false.
+    """
+    return value is not None and value is not False
+
+
+def _type(value: Any) -> str:
+    """
+    Name of the jq type of a value.
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, (str, datetime, date, bytes)):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return "string"
+
+
+def _normalize(value: Any) -> Any:
+    """
+    Convert boto3 values without a JSON equivalent the way the JSON output does.
+    """
+    if isinstance(value, (datetime, date)):
+        return str(value)
+    return value
+
+
+def _equal(left: Any, right: Any) -> bool:
+    return _order(left) == _order(right)
+
+
+_TYPE_RANK = {"null": 0, "boolean": 1, "number": 3, "string": 4, "array": 5, "object": 6}
+
+
+def _order(value: Any) -> Tuple[Any, ...]:
+    """
+    Sort key implementing jq's ordering across types:
+    null < false < true < numbers < strings < arrays < objects.
+    """
+    value = _normalize(value)
+    value_type = _type(value)
+    if value_type == "boolean":
+        return (1 + int(value),)
+    if value_type == "array":
+        return (5, [_order(item) for item in value])
+    if value_type == "object":
+        return (6, sorted((key, _order(item)) for key, item in value.items()))
+    if value_type == "string" and not isinstance(value, str):
+        value = str(value)
+    return (_TYPE_RANK[value_type], value) if value is not None else (0,)
@@ -0,0 +1,228 @@
+"""
+Adaptive rate limiting for AWS API calls in AWS Auto Inventory.
+"""
+import time
+import random
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Error codes AWS services use to signal throttling
+THROTTLING_ERROR_CODES = frozenset([
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottledException",
+    "RequestThrottled",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "TransactionInProgressException",
+    "RequestLimitExceeded",
+    "BandwidthLimitExceeded",
+    "LimitExceededException",
+    "SlowDown",
+    "PriorRequestNotComplete",
+    "EC2ThrottledException",
+])
+
+
+def jittered_backoff(attempt: int, base_delay: float, max_delay: float = 60.0) -> float:
+    """
+    Compute a retry delay using exponential backoff with equal jitter.
+
+    Half of the exponential window is always waited, so a retry never fires
+    immediately, and the other half is random so concurrent threads spread out.
+
+    Args:
+        attempt: Zero-based retry attempt.
+        base_delay: Delay (in seconds) of the first retry window.
+        max_delay: Upper bound (in seconds) of the retry window.
+
+    Returns:
+        Delay in seconds, drawn uniformly from [window / 2, window] where
+        window = min(max_delay, base_delay * 2^attempt).
+    """
+    window = min(max_delay, base_delay * (2 ** attempt))
+    return window / 2 + random.uniform(0, window / 2)
+
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts to throttling.
+
+    The rate is halved whenever a throttling error is reported and grows back
+    linearly over time until it reaches max_rate again.
+    """
+
+    def __init__(self, max_rate: float, min_rate: float, recovery_rate: float):
+        """
+        Initialize token bucket.
+
+        Args:
+            max_rate: Maximum (and initial) number of requests per second.
+            min_rate: Lower bound for the rate after repeated throttling.
+            recovery_rate: Requests per second regained for every second without throttling.
+        """
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.recovery_rate = recovery_rate
+        self.rate = max_rate
+        self.tokens = max_rate
+        self.throttle_count = 0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take a token, blocking until it is available.
+
+        The token is reserved immediately, so concurrent callers queue up behind
+        each other instead of waking at the same time.
+
+        Returns:
+            Time (in seconds) spent waiting for the token.
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait_time:
+            time.sleep(wait_time)
+        return wait_time
+
+    def on_throttle(self) -> None:
+        """
+        Shrink the rate after a throttling error and drop any saved burst.
+        """
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            self.throttle_count += 1
+
+    def before_send(self, **kwargs: Any) -> None:
+        """
+        botocore "before-send" handler taking a token for every HTTP request.
+        """
+        waited = self.acquire()
+        if waited:
+            logger.debug(f"Waited {waited:.2f}s for rate limit, rate is {self.rate:.2f} requests/s")
+
+    def needs_retry(self, response: Optional[Any] = None, **kwargs: Any) -> None:
+        """
+        botocore "needs-retry" handler shrinking the rate on throttling errors.
+
+        Args:
+            response: (http_response, parsed_response) tuple, or None when the
+                      request failed before a response was received.
+        """
+        if response is None:
+            return
+        error_code = response[1].get("Error", {}).get("Code")
+        if error_code in THROTTLING_ERROR_CODES:
+            self.on_throttle()
+            logger.debug(f"Throttled ({error_code}), rate reduced to {self.rate:.2f} requests/s")
+
+    def _refill(self) -> None:
+        """
+        Recover the rate and add the tokens earned since the last refill.
+        """
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        self.rate = min(self.max_rate, self.rate + self.recovery_rate * elapsed)
+        self.tokens = min(max(1.0, self.rate), self.tokens + self.rate * elapsed)
+
+
+class RateLimiter:
+    """
+    Shared rate limiter holding one adaptive token bucket per key.
+
+    Keys identify an (account, region, service) triple, so threads calling the same
+    API in the same account and region share a budget instead of retrying in lockstep.
+    """
+
+    def __init__(
+        self,
+        max_rate: float = 20.0,
+        min_rate: float = 0.5,
+        recovery_rate: float = 1.0,
+        max_buckets: int = 1024
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            max_rate: Maximum number of requests per second for each key.
+            min_rate: Lower bound for the rate of a key after repeated throttling.
+            recovery_rate: Requests per second regained for every second without throttling.
+            max_buckets: Maximum number of buckets to keep. The least recently used
+                         bucket is dropped when the limit is reached.
+        """
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.recovery_rate = recovery_rate
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_bucket(self, key: Hashable) -> TokenBucket:
+        """
+        Get the token bucket for a key, creating it on first use.
+
+        Args:
+            key: Rate limiting key, usually (account, region, service).
+
+        Returns:
+            Token bucket for the key.
+        """
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._buckets.move_to_end(key)
+                return bucket
+
+            bucket = TokenBucket(self.max_rate, self.min_rate, self.recovery_rate)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            return bucket
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Drop the token bucket for a key, if any.
+
+        Args:
+            key: Rate limiting key.
+        """
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+    def register(self, client: Any, key: Hashable) -> None:
+        """
+        Rate limit every HTTP request made by a boto3 client.
+
+        Handlers are attached to the client's own event emitter, so they also cover
+        each page of a paginated call and botocore's internal retries.
+
+        Args:
+            client: boto3 client.
+            key: Rate limiting key for the client.
+        """
+        bucket = self.get_bucket(key)
+        client.meta.events.register(
+            "before-send", bucket.before_send, unique_id="aws-auto-inventory-rate-limit"
+        )
+        client.meta.events.register(
+            "needs-retry", bucket.needs_retry, unique_id="aws-auto-inventory-throttle"
+        )
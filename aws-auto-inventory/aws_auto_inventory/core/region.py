@@ -1,15 +1,29 @@
 """
 Region scanner for AWS Auto Inventory.
 """
+import time
 import logging
 import concurrent.futures
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import boto3
 
 from ..config.models import Inventory, Sheet
+from .client_cache import ClientCache
+from .dependencies import SheetDependencies
+from .global_services import GLOBAL_REGION, get_home_region, is_global
+from .scheduler import get_task_keys
 from .service import ServiceScanner, ServiceResult
 
+if TYPE_CHECKING:
+    from ..output.jsonl import JsonlSink
+    from ..output.parquet import ParquetSink
+    from .checkpoint import CheckpointJournal
+    from .incremental import DeltaTracker
+    from .metrics import MetricsCollector
+    from .planner import ScanPlanner
+    from .scheduler import PriorityScheduler
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
@@ -19,16 +33,18 @@ class RegionResult:
     Result of a region scan.
     """
     
-    def __init__(self, region: str, services: List[ServiceResult]):
+    def __init__(self, region: str, services: List[ServiceResult], error: Optional[str] = None):
         """
         Initialize region result.
         
         Args:
             region: AWS region.
             services: List of service scan results.
+            error: Error message if the region could not be scanned.
         """
         self.region = region
         self.services = services
+        self.error = error
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -37,10 +53,22 @@ class RegionResult:
         Returns:
             Dictionary representation of the region result.
         """
-        return {
+        result = {
             "region": self.region,
             "services": [service.to_dict() for service in self.services]
         }
+        if self.error is not None:
+            result["error"] = self.error
+        return result
+    
+    def has_failures(self) -> bool:
+        """
+        Check whether the region or any of its services failed.
+        
+        Returns:
+            True if the region has an error or a failed service result.
+        """
+        return self.error is not None or any(not service.success for service in self.services)
 
 
 class RegionScanner:
@@ -52,7 +80,15 @@ class RegionScanner:
         self, 
         max_retries: int = 3, 
         retry_delay: int = 2, 
-        max_workers: Optional[int] = None
+        max_workers: Optional[int] = None,
+        client_cache: Optional[ClientCache] = None,
+        sink: Optional[Union["JsonlSink", "ParquetSink"]] = None,
+        retain_results: bool = True,
+        delta_tracker: Optional["DeltaTracker"] = None,
+        planner: Optional["ScanPlanner"] = None,
+        checkpoint: Optional["CheckpointJournal"] = None,
+        scheduler: Optional["PriorityScheduler"] = None,
+        metrics: Optional["MetricsCollector"] = None
     ):
         """
         Initialize region scanner.
@@ -61,17 +97,38 @@ class RegionScanner:
             max_retries: Maximum number of retries for API calls.
             retry_delay: Base delay (in seconds) between retries.
             max_workers: Maximum number of worker threads for concurrent service scanning.
+            client_cache: Cache of boto3 clients shared by all scans.
+            sink: Sink receiving each service result as soon as it completes.
+            retain_results: Whether to keep API responses in the returned results once
+                            they have been written to the sink.
+            delta_tracker: Tracker replacing results by their delta against the
+                           previous scan, for incremental scans.
+            planner: Planner dropping sheets whose service is not offered in a region.
+            checkpoint: Journal recording completed sheets, so a resumed run only
+                        scans the sheets missing from it.
+            scheduler: Executor shared by all regions and accounts, running the sheets
+                       expected to take longest first. Replaces the per-region pool
+                       of max_workers threads, and runs the calls of dependent sheets.
+            metrics: Collector receiving the time each sheet waits for a worker.
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.max_workers = max_workers
-        self.service_scanner = ServiceScanner(max_retries, retry_delay)
+        self.sink = sink
+        self.retain_results = retain_results
+        self.delta_tracker = delta_tracker
+        self.planner = planner
+        self.checkpoint = checkpoint
+        self.scheduler = scheduler
+        self.metrics = metrics
+        self.service_scanner = ServiceScanner(max_retries, retry_delay, client_cache, executor=scheduler)
     
     def scan_region(
         self, 
         inventory: Inventory, 
         session: boto3.Session, 
-        region: str
+        region: str,
+        account: Optional[Dict[str, str]] = None
     ) -> RegionResult:
         """
         Scan all services in a region.
@@ -80,32 +137,158 @@ class RegionScanner:
             inventory: Inventory configuration.
             session: boto3 Session.
             region: AWS region.
+            account: Account information (id, name) for organization scans.
             
         Returns:
             Region scan result.
         """
         logger.info(f"Scanning region {region}")
         
-        services_results = []
+        services_results = self._scan_sheets(
+            inventory,
+            session,
+            [(sheet, region) for sheet in self.get_sheets(inventory, region)],
+            account
+        )
+        
+        logger.info(f"Completed scanning region {region}")
+        
+        return RegionResult(region=region, services=services_results)
+    
+    def scan_global(
+        self,
+        inventory: Inventory,
+        session: boto3.Session,
+        regions: List[str],
+        account: Optional[Dict[str, str]] = None
+    ) -> Optional[RegionResult]:
+        """
+        Scan the sheets of global services once for an account.
+        
+        Global APIs return the same data in every region, so each such sheet is
+        called in its home region only and reported under the "global" region.
+        
+        Args:
+            inventory: Inventory configuration.
+            session: boto3 Session.
+            regions: Regions scanned in the account.
+            account: Account information (id, name) for organization scans.
+            
+        Returns:
+            Result for the "global" region, or None if the inventory has no global sheets.
+        """
+        sheets = self.get_global_sheets(inventory)
+        if not sheets:
+            return None
+        
+        logger.info(f"Scanning {len(sheets)} global services")
+        
+        services_results = self._scan_sheets(
+            inventory,
+            session,
+            [(sheet, get_home_region(sheet, regions)) for sheet in sheets],
+            account
+        )
+        
+        logger.info("Completed scanning global services")
+        
+        return RegionResult(region=GLOBAL_REGION, services=services_results)
+    
+    def _scan_sheets(
+        self,
+        inventory: Inventory,
+        session: boto3.Session,
+        sheet_regions: List[Tuple[Sheet, str]],
+        account: Optional[Dict[str, str]] = None
+    ) -> List[ServiceResult]:
+        """
+        Scan (sheet, region) pairs concurrently.
+        
+        Args:
+            inventory: Inventory configuration.
+            session: boto3 Session.
+            sheet_regions: Sheets and the region to scan each one in.
+            account: Account information (id, name) for organization scans.
+            
+        Returns:
+            List of service scan results.
+        """
+        dependencies = SheetDependencies([sheet for sheet, _ in sheet_regions])
+        
+        if self.scheduler is not None:
+            # Sheets of every account and region share the scheduler's workers,
+            # which run the slowest sheets first
+            def submit(sheet: Sheet, region: str) -> concurrent.futures.Future:
+                return self.scheduler.submit(
+                    self.scan_sheet,
+                    inventory,
+                    sheet,
+                    session,
+                    region,
+                    account,
+                    time.monotonic(),
+                    dependencies,
+                    keys=get_task_keys(inventory, sheet, region, account)
+                )
+            
+            return self._run_sheets(inventory, sheet_regions, submit, dependencies, account)
         
         # Use ThreadPoolExecutor for concurrent service scanning
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Create a future for each service
-            future_to_sheet = {
-                executor.submit(
-                    self.service_scanner.scan_service,
+            def submit(sheet: Sheet, region: str) -> concurrent.futures.Future:
+                return executor.submit(
+                    self.scan_sheet,
+                    inventory,
                     sheet,
                     session,
-                    region
-                ): sheet
-                for sheet in inventory.sheets
-            }
+                    region,
+                    account,
+                    time.monotonic(),
+                    dependencies
+                )
             
-            # Process completed futures
-            for future in concurrent.futures.as_completed(future_to_sheet):
-                sheet = future_to_sheet[future]
+            return self._run_sheets(inventory, sheet_regions, submit, dependencies, account)
+    
+    def _run_sheets(
+        self,
+        inventory: Inventory,
+        sheet_regions: List[Tuple[Sheet, str]],
+        submit: Callable[[Sheet, str], concurrent.futures.Future],
+        dependencies: SheetDependencies,
+        account: Optional[Dict[str, str]] = None
+    ) -> List[ServiceResult]:
+        """
+        Submit sheet scans and record each result as it completes.
+        
+        Sheets that depend on another sheet are submitted once it has completed.
+        
+        Args:
+            inventory: Inventory configuration.
+            sheet_regions: Sheets and the region to scan each one in.
+            submit: Function submitting the scan of a sheet in a region.
+            dependencies: Dependencies between the sheets.
+            account: Account information (id, name) for organization scans.
+            
+        Returns:
+            List of service scan results.
+        """
+        regions = {sheet.name: region for sheet, region in sheet_regions}
+        future_to_sheet: Dict[concurrent.futures.Future, Tuple[Sheet, str]] = {
+            submit(sheet, region): (sheet, region)
+            for sheet, region in sheet_regions
+            if dependencies.get_source(sheet) is None
+        }
+        
+        services_results = []
+        
+        # Process completed futures
+        while future_to_sheet:
+            done, _ = concurrent.futures.wait(future_to_sheet, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                sheet, region = future_to_sheet.pop(future)
                 try:
                     service_result = future.result()
+                    self.record_result(inventory, service_result, account)
                     services_results.append(service_result)
                     
                     if service_result.success:
@@ -122,17 +305,187 @@ class RegionScanner:
                         f"Error processing service {sheet.service} with function {sheet.function} in region {region}: {str(e)}"
                     )
                     
-                    services_results.append(
-                        ServiceResult(
-                            service=sheet.service,
-                            function=sheet.function,
-                            region=region,
-                            result=None,
-                            success=False,
-                            error=f"Error processing service: {str(e)}"
-                        )
+                    service_result = ServiceResult(
+                        service=sheet.service,
+                        function=sheet.function,
+                        region=region,
+                        result=None,
+                        success=False,
+                        error=f"Error processing service: {str(e)}",
+                        sheet=sheet.name
                     )
+                    # The sink may be what failed, so its errors must not abandon
+                    # the region's remaining sheets
+                    try:
+                        self.record_result(inventory, service_result, account)
+                    except Exception as sink_error:
+                        logger.error(
+                            f"Error writing result of service {sheet.service} with function {sheet.function} in region {region}: {str(sink_error)}"
+                        )
+                    services_results.append(service_result)
+                
+                for dependent in dependencies.get_dependents(sheet):
+                    dependent_region = regions[dependent.name]
+                    future_to_sheet[submit(dependent, dependent_region)] = (dependent, dependent_region)
         
-        logger.info(f"Completed scanning region {region}")
+        return services_results
+    
+    def get_sheets(self, inventory: Inventory, region: str) -> List[Sheet]:
+        """
+        Get the sheets to scan in a region.
+        
+        Args:
+            inventory: Inventory configuration.
+            region: AWS region.
+            
+        Returns:
+            The inventory's regional sheets, without those the planner knows cannot
+            run in the region. Global sheets are scanned by scan_global instead.
+        """
+        sheets = [sheet for sheet in inventory.sheets if not is_global(sheet)]
+        if self.planner is None:
+            return sheets
+        
+        return self.planner.get_sheets(sheets, region)
+    
+    def get_global_sheets(self, inventory: Inventory) -> List[Sheet]:
+        """
+        Get the sheets of global services.
+        
+        Args:
+            inventory: Inventory configuration.
+            
+        Returns:
+            Sheets to scan once per account.
+        """
+        return [sheet for sheet in inventory.sheets if is_global(sheet)]
+    
+    def scan_sheet(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        session: boto3.Session,
+        region: str,
+        account: Optional[Dict[str, str]] = None,
+        submitted_at: Optional[float] = None,
+        dependencies: Optional[SheetDependencies] = None
+    ) -> ServiceResult:
+        """
+        Scan one sheet in a region.
+        
+        In incremental scans, sheets whose TTL has not expired are skipped and the
+        result of the others is replaced by its delta against the previous scan.
+        In resumed runs, sheets already in the checkpoint journal are replayed from it.
+        Sheets with depends_on are called with the values published by their
+        source, and sheets with dependents publish theirs.
+        
+        Args:
+            inventory: Inventory configuration.
+            sheet: Sheet configuration.
+            session: boto3 Session.
+            region: AWS region.
+            account: Account information (id, name) for organization scans.
+            submitted_at: time.monotonic() when the scan was queued, to measure
+                          the time it waited for a worker.
+            dependencies: Dependencies between the sheets scanned with this one.
+            
+        Returns:
+            Service scan result.
+        """
+        if self.metrics is not None and submitted_at is not None:
+            self.metrics.observe_queue_wait(
+                sheet.service, sheet.function, region, time.monotonic() - submitted_at
+            )
+        
+        if self.checkpoint is None:
+            return self._scan_sheet(inventory, sheet, session, region, account, dependencies)
+        
+        service_result = self.checkpoint.get(inventory, sheet, region, account)
+        # Incremental results are journaled without data, which dependents need
+        if service_result is not None and (
+            service_result.result is not None or dependencies is None or not dependencies.get_dependents(sheet)
+        ):
+            logger.info(
+                f"Skipping service {sheet.service} with function {sheet.function} in region {region}, completed before resume"
+            )
+            service_result.sheet = sheet.name
+            if dependencies is not None:
+                dependencies.publish(sheet, service_result.result, service_result.success)
+            # The interrupted run never saved the fingerprints of its completed units
+            if self.delta_tracker is not None:
+                fingerprints = self.checkpoint.get_fingerprints(inventory, sheet, region, account)
+                if fingerprints is not None:
+                    self.delta_tracker.restore(inventory, sheet, region, fingerprints, account)
+            return service_result
+        
+        service_result = self._scan_sheet(inventory, sheet, session, region, account, dependencies)
+        fingerprints = None
+        if self.delta_tracker is not None:
+            fingerprints = self.delta_tracker.get_fingerprints(inventory, sheet, region, account)
+        self.checkpoint.record(inventory, sheet, service_result, account, fingerprints)
+        return service_result
+    
+    def _scan_sheet(
+        self,
+        inventory: Inventory,
+        sheet: Sheet,
+        session: boto3.Session,
+        region: str,
+        account: Optional[Dict[str, str]] = None,
+        dependencies: Optional[SheetDependencies] = None
+    ) -> ServiceResult:
+        """
+        Scan one sheet in a region, publishing its values to its dependents and
+        applying the delta tracker if any.
+        """
+        has_dependents = dependencies is not None and bool(dependencies.get_dependents(sheet))
+        
+        # Sheets feeding dependents are scanned even within their TTL, as the
+        # skipped result has no data to take values from
+        if self.delta_tracker is not None and not has_dependents and self.delta_tracker.is_fresh(
+            inventory, sheet, region, account
+        ):
+            logger.info(
+                f"Skipping service {sheet.service} with function {sheet.function} in region {region}, TTL not expired"
+            )
+            service_result = self.delta_tracker.skipped_result(sheet, region)
+            service_result.sheet = sheet.name
+            return service_result
+        
+        if sheet.depends_on is None:
+            service_result = self.service_scanner.scan_service(sheet, session, region)
+        else:
+            parameter_values = dependencies.get_values(sheet) if dependencies is not None else None
+            service_result = self.service_scanner.scan_service(
+                sheet, session, region, parameter_values=parameter_values
+            )
+        
+        # Publish before the delta tracker replaces the data
+        if has_dependents:
+            dependencies.publish(sheet, service_result.result, service_result.success)
+        
+        if self.delta_tracker is not None:
+            service_result = self.delta_tracker.apply(inventory, sheet, service_result, account)
+        service_result.sheet = sheet.name
+        return service_result
+    
+    def record_result(
+        self,
+        inventory: Inventory,
+        service_result: ServiceResult,
+        account: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Write a completed service result to the sink, if any.
+        
+        Args:
+            inventory: Inventory configuration.
+            service_result: Service scan result.
+            account: Account information (id, name) for organization scans.
+        """
+        if self.sink is None:
+            return
         
-        return RegionResult(region=region, services=services_results)
\ No newline at end of file
+        self.sink.write(inventory.name, service_result, account)
+        if not self.retain_results:
+            service_result.result = None
@@ -3,14 +3,27 @@ Main scanning engine for AWS Auto Inventory.
 """
 import logging
 import concurrent.futures
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, TYPE_CHECKING
 
 import boto3
 
 from ..config.models import Config, Inventory
+from .client_cache import ClientCache
+from .credentials import CredentialBroker
+from .global_services import GLOBAL_REGION
 from .organization import OrganizationScanner, AccountResult
+from .rate_limiter import RateLimiter
 from .region import RegionScanner, RegionResult
 
+if TYPE_CHECKING:
+    from ..output.jsonl import JsonlSink
+    from ..output.parquet import ParquetSink
+    from .checkpoint import CheckpointJournal
+    from .incremental import DeltaTracker
+    from .metrics import MetricsCollector
+    from .planner import ScanPlanner
+    from .scheduler import PriorityScheduler
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
@@ -60,6 +73,20 @@ class ScanResult:
             ]
         
         return result
+    
+    def has_failures(self) -> bool:
+        """
+        Check whether any account, region or service of the scan failed.
+        
+        Returns:
+            True if some unit failed and the run is worth resuming.
+        """
+        if any(not account.success for account in self.account_results):
+            return True
+        regions = list(self.region_results)
+        for account in self.account_results:
+            regions.extend(account.regions)
+        return any(region.has_failures() for region in regions)
 
 
 class ScanEngine:
@@ -72,7 +99,18 @@ class ScanEngine:
         max_retries: int = 3, 
         retry_delay: int = 2,
         max_workers_regions: Optional[int] = None,
-        max_workers_services: Optional[int] = None
+        max_workers_services: Optional[int] = None,
+        max_workers_accounts: Optional[int] = None,
+        max_workers_total: Optional[int] = None,
+        max_rate: float = 20.0,
+        sink: Optional[Union["JsonlSink", "ParquetSink"]] = None,
+        retain_results: bool = True,
+        delta_tracker: Optional["DeltaTracker"] = None,
+        planner: Optional["ScanPlanner"] = None,
+        credential_broker: Optional[CredentialBroker] = None,
+        checkpoint: Optional["CheckpointJournal"] = None,
+        scheduler: Optional["PriorityScheduler"] = None,
+        metrics: Optional["MetricsCollector"] = None
     ):
         """
         Initialize scan engine.
@@ -82,17 +120,66 @@ class ScanEngine:
             retry_delay: Base delay (in seconds) between retries.
             max_workers_regions: Maximum number of worker threads for concurrent region scanning.
             max_workers_services: Maximum number of worker threads for concurrent service scanning.
+            max_workers_accounts: Maximum number of worker threads for concurrent account scanning
+                                  in organization scans.
+            max_workers_total: Maximum number of region scans in flight across all
+                               accounts in organization scans.
+            max_rate: Maximum number of API requests per second for each account,
+                      region and service. Lowered automatically while throttled.
+            sink: Sink receiving each service result as soon as it completes.
+            retain_results: Whether to keep API responses in the returned results once
+                            they have been written to the sink. Disable to keep memory
+                            flat when the sink is the only output.
+            delta_tracker: Tracker replacing results by their delta against the
+                           previous scan, for incremental scans. Its state is saved
+                           at the end of every scan.
+            planner: Planner resolving "all" regions to the regions enabled in each
+                     account and dropping sheets whose service is not offered in a region.
+            credential_broker: Broker assuming roles in member accounts of organization
+                               scans and caching their credentials. Its cache is saved
+                               at the end of every scan.
+            checkpoint: Journal recording every completed (account, region, sheet)
+                        unit. When resuming a run, units already in it are not
+                        scanned again.
+            scheduler: Executor running the sheets of every account and region from
+                       one queue, longest-expected-first, instead of a pool of
+                       max_workers_services threads per region. Its duration history
+                       is saved at the end of every scan.
+            metrics: Collector receiving the duration, pages, bytes, retries and
+                     throttles of every API call and the queue wait of every sheet.
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.max_workers_regions = max_workers_regions
         self.max_workers_services = max_workers_services
+        self.max_workers_accounts = max_workers_accounts
+        self.max_workers_total = max_workers_total
+        self.delta_tracker = delta_tracker
+        self.planner = planner
+        self.scheduler = scheduler
+        self.metrics = metrics
+        self.rate_limiter = RateLimiter(max_rate=max_rate)
+        self.client_cache = ClientCache(rate_limiter=self.rate_limiter, metrics=metrics)
         
-        self.organization_scanner = OrganizationScanner()
+        self.organization_scanner = OrganizationScanner(
+            max_workers_accounts=max_workers_accounts,
+            max_workers_regions=max_workers_regions,
+            max_workers_total=max_workers_total,
+            planner=planner,
+            credential_broker=credential_broker
+        )
         self.region_scanner = RegionScanner(
             max_retries=max_retries,
             retry_delay=retry_delay,
-            max_workers=max_workers_services
+            max_workers=max_workers_services,
+            client_cache=self.client_cache,
+            sink=sink,
+            retain_results=retain_results,
+            delta_tracker=delta_tracker,
+            planner=planner,
+            checkpoint=checkpoint,
+            scheduler=scheduler,
+            metrics=metrics
         )
     
     def scan(self, config: Config) -> List[ScanResult]:
@@ -120,6 +207,12 @@ class ScanEngine:
             results.append(result)
             logger.info(f"Completed scan for inventory: {inventory.name}")
         
+        if self.delta_tracker is not None:
+            self.delta_tracker.save()
+        self.organization_scanner.credential_broker.save()
+        if self.scheduler is not None:
+            self.scheduler.history.save()
+        
         return results
     
     def _scan_organization(self, inventory: Inventory) -> ScanResult:
@@ -161,6 +254,10 @@ class ScanEngine:
         # Create session
         session = boto3.Session(profile_name=inventory.aws.profile)
         
+        regions = inventory.aws.region
+        if self.planner is not None:
+            regions = self.planner.get_regions(inventory, session)
+        
         # Scan regions concurrently
         region_results = []
         
@@ -175,18 +272,28 @@ class ScanEngine:
                     session,
                     region
                 ): region
-                for region in inventory.aws.region
+                for region in regions
             }
             
+            # Global services are scanned once for the account
+            future_to_region[executor.submit(
+                self.region_scanner.scan_global,
+                inventory,
+                session,
+                regions
+            )] = GLOBAL_REGION
+            
             # Process completed futures
             for future in concurrent.futures.as_completed(future_to_region):
                 region = future_to_region[future]
                 try:
                     region_result = future.result()
-                    region_results.append(region_result)
+                    if region_result is not None:
+                        region_results.append(region_result)
                     logger.info(f"Successfully scanned region {region}")
                 except Exception as e:
                     logger.error(f"Error scanning region {region}: {str(e)}")
+                    region_results.append(RegionResult(region=region, services=[], error=str(e)))
         
         logger.info(f"Completed account scan for inventory: {inventory.name}")
         
@@ -0,0 +1,246 @@
+"""
+Priority scheduler for AWS Auto Inventory.
+"""
+import os
+import json
+import heapq
+import itertools
+import logging
+import threading
+import time
+import concurrent.futures
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..config.models import Inventory, Sheet
+from .incremental import sheet_key
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class DurationHistory:
+    """
+    Exponentially weighted moving average of the duration of past tasks.
+
+    Durations are recorded under several keys per task, from the most specific
+    (one sheet in one account and region) to the most general (one API function),
+    so tasks never seen before can still be estimated from similar tasks.
+    """
+
+    def __init__(self, path: Optional[str] = None, alpha: float = 0.3):
+        """
+        Initialize duration history.
+
+        Args:
+            path: JSON file persisting the durations between runs. Durations are only
+                  kept in memory if not set.
+            alpha: Weight of the latest duration in the moving average.
+        """
+        self.path = path
+        self.alpha = alpha
+        self._durations: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._durations = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable duration history {path}: {e}")
+
+    def expected(self, keys: Sequence[str]) -> Optional[float]:
+        """
+        Get the expected duration of a task.
+
+        Args:
+            keys: Keys of the task, most specific first.
+
+        Returns:
+            The average duration under the first known key, or None if no key is known.
+        """
+        with self._lock:
+            for key in keys:
+                if key in self._durations:
+                    return self._durations[key]
+        return None
+
+    def record(self, keys: Sequence[str], duration: float) -> None:
+        """
+        Record the duration of a completed task under all its keys.
+
+        Args:
+            keys: Keys of the task.
+            duration: Duration in seconds.
+        """
+        with self._lock:
+            for key in keys:
+                previous = self._durations.get(key)
+                if previous is None:
+                    self._durations[key] = duration
+                else:
+                    self._durations[key] = self.alpha * duration + (1 - self.alpha) * previous
+
+    def save(self) -> None:
+        """
+        Write the durations to the history file, if any.
+        """
+        if self.path is None:
+            return
+
+        with self._lock:
+            data = dict(self._durations)
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write duration history {self.path}: {e}")
+
+
+class PriorityScheduler(concurrent.futures.Executor):
+    """
+    Executor running tasks from all accounts and regions longest-expected-first.
+
+    Per-region pools leave their threads idle while another region works through
+    its slow tail. This executor keeps every (account, region, sheet) task of a scan
+    in one priority queue served by one set of workers: a worker that finishes picks
+    the task expected to take longest from whichever region it comes from, so the
+    slowest calls start first and the scan's wall-clock time approaches its
+    longest task. Tasks never seen before are expected to be the slowest.
+    """
+
+    def __init__(self, max_workers: int = 32, history: Optional[DurationHistory] = None):
+        """
+        Initialize priority scheduler.
+
+        Args:
+            max_workers: Number of worker threads.
+            history: Durations of past tasks, used to order the queue. Updated with
+                     the duration of every task run.
+        """
+        self.max_workers = max_workers
+        self.history = history or DurationHistory()
+        self._queue: List[Tuple[float, int, concurrent.futures.Future, Callable, tuple, dict, Sequence[str]]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._shutdown = False
+
+    def submit(self, fn: Callable, *args: Any, keys: Sequence[str] = (), **kwargs: Any) -> concurrent.futures.Future:
+        """
+        Queue a task.
+
+        Args:
+            fn: Function to run.
+            *args: Positional arguments of the function.
+            keys: Keys under which the task's duration is estimated and recorded,
+                  most specific first.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            Future of the function's result.
+        """
+        expected = self.history.expected(keys) if keys else None
+        priority = -(expected if expected is not None else float("inf"))
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit tasks after shutdown")
+            heapq.heappush(self._queue, (priority, next(self._counter), future, fn, args, kwargs, keys))
+            if len(self._workers) < self.max_workers:
+                self._start_worker()
+            self._condition.notify()
+
+        return future
+
+    def shutdown(self, wait: bool = True, **kwargs: Any) -> None:
+        """
+        Stop the workers once the queue is empty and save the duration history.
+
+        Args:
+            wait: Whether to wait for the queued tasks to complete.
+        """
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+            workers = list(self._workers)
+
+        if wait:
+            for worker in workers:
+                worker.join()
+        self.history.save()
+
+    @property
+    def queued(self) -> int:
+        """
+        Number of tasks waiting for a worker.
+        """
+        with self._condition:
+            return len(self._queue)
+
+    def _start_worker(self) -> None:
+        """
+        Start a worker thread. Called with the condition held.
+        """
+        worker = threading.Thread(
+            target=self._work,
+            name=f"aws-auto-inventory-scheduler-{len(self._workers)}",
+            daemon=True
+        )
+        self._workers.append(worker)
+        worker.start()
+
+    def _work(self) -> None:
+        """
+        Run queued tasks until shutdown.
+        """
+        while True:
+            with self._condition:
+                while not self._queue and not self._shutdown:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                _, _, future, fn, args, kwargs, keys = heapq.heappop(self._queue)
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            start = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                if keys:
+                    self.history.record(keys, time.monotonic() - start)
+
+
+def get_task_keys(
+    inventory: Inventory,
+    sheet: Sheet,
+    region: str,
+    account: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """
+    Build the keys under which the duration of a sheet scan is tracked.
+
+    Args:
+        inventory: Inventory configuration.
+        sheet: Sheet configuration.
+        region: AWS region.
+        account: Account information (id, name) for organization scans.
+
+    Returns:
+        The sheet in its account and region, the API function in the region, and
+        the API function alone, most specific first.
+    """
+    function = f"{sheet.service}.{sheet.function}"
+    return [sheet_key(inventory, sheet, region, account), f"{region}/{function}", function]
@@ -2,16 +2,27 @@
 Service scanner for AWS Auto Inventory.
 """
 import logging
-from typing import Dict, Any, List, Optional
+import collections
+import concurrent.futures
+from typing import Callable, Dict, Any, List, Optional
 
 import boto3
 
 from ..config.models import Sheet
+from ..utils.service_models import get_operation_model
 from .aws_client import AWSClient, AWSClientError
+from .client_cache import ClientCache
+from .rate_limiter import RateLimiter
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Values per call for list parameters whose model sets no maximum
+DEFAULT_BATCH_SIZE = 100
+
+# Concurrent calls of a sheet that takes one value per call
+FAN_OUT_WORKERS = 8
+
 
 class ServiceResult:
     """
@@ -25,7 +36,9 @@ class ServiceResult:
         region: str, 
         result: Any, 
         success: bool = True, 
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        delta: Optional[Dict[str, Any]] = None,
+        sheet: Optional[str] = None
     ):
         """
         Initialize service result.
@@ -37,6 +50,10 @@ class ServiceResult:
             result: API response.
             success: Whether the scan was successful.
             error: Error message if scan failed.
+            delta: Resources added, changed and removed since the previous scan,
+                   for incremental scans.
+            sheet: Name of the sheet the result was scanned for, as sheets may
+                   share a service and function.
         """
         self.service = service
         self.function = function
@@ -44,6 +61,8 @@ class ServiceResult:
         self.result = result
         self.success = success
         self.error = error
+        self.delta = delta
+        self.sheet = sheet
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -52,7 +71,7 @@ class ServiceResult:
         Returns:
             Dictionary representation of the service result.
         """
-        return {
+        result = {
             "service": self.service,
             "function": self.function,
             "region": self.region,
@@ -60,6 +79,11 @@ class ServiceResult:
             "success": self.success,
             "error": self.error
         }
+        
+        if self.delta is not None:
+            result["delta"] = self.delta
+        
+        return result
 
 
 class ServiceScanner:
@@ -67,22 +91,39 @@ class ServiceScanner:
     Scanner for AWS services.
     """
     
-    def __init__(self, max_retries: int = 3, retry_delay: int = 2):
+    def __init__(
+        self, 
+        max_retries: int = 3, 
+        retry_delay: int = 2,
+        client_cache: Optional[ClientCache] = None,
+        executor: Optional[concurrent.futures.Executor] = None
+    ):
         """
         Initialize service scanner.
         
         Args:
             max_retries: Maximum number of retries for API calls.
             retry_delay: Base delay (in seconds) between retries.
+            client_cache: Cache of boto3 clients shared by all scans. A new cache with
+                          a default rate limiter is created if not provided.
+            executor: Executor of the scan engine, running the calls of dependent
+                      sheets so they count against the engine's workers. Each
+                      dependent sheet opens a pool of its own if not provided.
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.executor = executor
+        # An empty cache is falsy (it defines __len__), so compare against None
+        self.client_cache = (
+            client_cache if client_cache is not None else ClientCache(rate_limiter=RateLimiter())
+        )
     
     def scan_service(
         self, 
         sheet: Sheet, 
         session: boto3.Session, 
-        region: str
+        region: str,
+        parameter_values: Optional[List[Any]] = None
     ) -> ServiceResult:
         """
         Scan a service in a region.
@@ -91,6 +132,9 @@ class ServiceScanner:
             sheet: Sheet configuration.
             session: boto3 Session.
             region: AWS region.
+            parameter_values: Values of the depends_on parameter, taken from the
+                              results of its source sheet. Required if the sheet
+                              has depends_on.
             
         Returns:
             Service scan result.
@@ -99,7 +143,16 @@ class ServiceScanner:
             f"Scanning service {sheet.service} with function {sheet.function} in region {region}"
         )
         
-        aws_client = AWSClient(session, self.max_retries, self.retry_delay)
+        aws_client = AWSClient(
+            session,
+            self.max_retries,
+            self.retry_delay,
+            self.client_cache,
+            self.client_cache.metrics
+        )
+        
+        if sheet.depends_on is not None:
+            return self._scan_dependent(sheet, aws_client, region, parameter_values)
         
         try:
             result = aws_client.call_api(
@@ -107,7 +160,9 @@ class ServiceScanner:
                 sheet.function,
                 region,
                 sheet.parameters,
-                sheet.result_key
+                sheet.result_key,
+                page_size=sheet.page_size,
+                max_items=sheet.max_items
             )
             
             logger.info(
@@ -148,6 +203,187 @@ class ServiceScanner:
                 success=False,
                 error=f"Unexpected error: {str(e)}"
             )
+    
+    def _scan_dependent(
+        self,
+        sheet: Sheet,
+        aws_client: AWSClient,
+        region: str,
+        parameter_values: Optional[List[Any]]
+    ) -> ServiceResult:
+        """
+        Scan a sheet over the values of its depends_on parameter.
+        
+        List parameters are passed in batches. Other parameters take one value per
+        call, and the calls run concurrently. The resources of each call are tagged
+        with the value they were called with, and a call that fails is recorded as
+        an entry with the value and its error, so one deleted resource does not fail
+        the whole sheet.
+        
+        Args:
+            sheet: Sheet configuration.
+            aws_client: AWS client.
+            region: AWS region.
+            parameter_values: Values of the depends_on parameter.
+            
+        Returns:
+            Service scan result. It fails only if the source sheet gave no values or
+            every call failed.
+        """
+        depends_on = sheet.depends_on
+        
+        if parameter_values is None:
+            error = f"No parameter values from sheet {depends_on.sheet}"
+            logger.error(f"Error scanning service {sheet.service} with function {sheet.function} in region {region}: {error}")
+            return ServiceResult(
+                service=sheet.service,
+                function=sheet.function,
+                region=region,
+                result=None,
+                success=False,
+                error=error
+            )
+        
+        batch_size = self._get_batch_size(sheet)
+        if batch_size is not None:
+            calls = [
+                (None, parameter_values[index:index + batch_size])
+                for index in range(0, len(parameter_values), batch_size)
+            ]
+        else:
+            calls = [(value, value) for value in parameter_values]
+        
+        def call(argument: Any) -> Any:
+            parameters = dict(sheet.parameters or {})
+            parameters[depends_on.parameter] = argument
+            return aws_client.call_api(
+                sheet.service,
+                sheet.function,
+                region,
+                parameters,
+                sheet.result_key,
+                page_size=sheet.page_size,
+                max_items=sheet.max_items
+            )
+        
+        result: List[Any] = []
+        errors: List[str] = []
+        workers = min(FAN_OUT_WORKERS, len(calls)) or 1
+        if self.executor is not None:
+            futures = self._fan_out(self.executor, call, [argument for _, argument in calls], workers)
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = self._fan_out(executor, call, [argument for _, argument in calls], workers)
+        
+        for (value, _), future in zip(calls, futures):
+            try:
+                response = future.result()
+            except Exception as e:
+                errors.append(str(e))
+                logger.error(
+                    f"Error scanning service {sheet.service} with function {sheet.function} in region {region} "
+                    f"for {depends_on.parameter}={value if value is not None else 'batch'}: {str(e)}"
+                )
+                if value is not None:
+                    result.append({depends_on.parameter: value, "Error": str(e)})
+                continue
+            
+            items = response if isinstance(response, list) else [response]
+            if value is not None:
+                items = [
+                    {depends_on.parameter: value, **item} if isinstance(item, dict)
+                    else {depends_on.parameter: value, "Value": item}
+                    for item in items if item is not None
+                ]
+            result.extend(items)
+        
+        if calls and len(errors) == len(calls):
+            return ServiceResult(
+                service=sheet.service,
+                function=sheet.function,
+                region=region,
+                result=None,
+                success=False,
+                error=errors[0]
+            )
+        
+        logger.info(
+            f"Successfully scanned service {sheet.service} with function {sheet.function} in region {region} "
+            f"over {len(parameter_values)} values of {depends_on.parameter} in {len(calls)} calls"
+        )
+        
+        return ServiceResult(
+            service=sheet.service,
+            function=sheet.function,
+            region=region,
+            result=result
+        )
+    
+    def _fan_out(
+        self,
+        executor: concurrent.futures.Executor,
+        call: Callable[[Any], Any],
+        arguments: List[Any],
+        workers: int
+    ) -> List[concurrent.futures.Future]:
+        """
+        Run a call over arguments on an executor, with at most workers calls in flight.
+        
+        The calling thread takes calls too, alongside workers - 1 helpers queued on
+        the executor. Calls never wait for a worker, so a sheet running on the
+        executor cannot deadlock it, even when all its workers are fanning out.
+        
+        Args:
+            executor: Executor running the helpers.
+            call: Function called with each argument.
+            arguments: Arguments of the calls.
+            workers: Maximum number of calls in flight.
+            
+        Returns:
+            Future of each call, completed, in the order of the arguments.
+        """
+        futures = [concurrent.futures.Future() for _ in arguments]
+        pending = collections.deque(zip(arguments, futures))
+        
+        def work() -> None:
+            while True:
+                try:
+                    argument, future = pending.popleft()
+                except IndexError:
+                    return
+                future.set_running_or_notify_cancel()
+                try:
+                    future.set_result(call(argument))
+                except Exception as e:
+                    future.set_exception(e)
+        
+        for _ in range(workers - 1):
+            executor.submit(work)
+        work()
+        
+        # Helpers may still be running the last calls they took
+        concurrent.futures.wait(futures)
+        return futures
+    
+    def _get_batch_size(self, sheet: Sheet) -> Optional[int]:
+        """
+        Get the number of values per call of a dependent sheet.
+        
+        Args:
+            sheet: Sheet configuration with depends_on.
+            
+        Returns:
+            Values per call if the parameter takes a list, otherwise None.
+        """
+        operation_model = get_operation_model(sheet.service, sheet.function)
+        input_shape = operation_model.input_shape if operation_model is not None else None
+        member = input_shape.members.get(sheet.depends_on.parameter) if input_shape is not None else None
+        
+        if member is None or member.type_name != "list":
+            return None
+        if sheet.depends_on.batch_size:
+            return sheet.depends_on.batch_size
+        return member.metadata.get("max") or DEFAULT_BATCH_SIZE
 
 
 class ResourceFilter:
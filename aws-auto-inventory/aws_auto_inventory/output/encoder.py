@@ -0,0 +1,28 @@
+"""
+JSON encoding of AWS API responses for AWS Auto Inventory.
+"""
+import json
+import base64
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+
+class InventoryJSONEncoder(json.JSONEncoder):
+    """
+    JSONEncoder for boto3 responses.
+
+    Datetimes are written in ISO format and bytes as {"__bytes_b64__": "<base64>"},
+    so binary data survives a round trip through the output files.
+    """
+
+    def default(self, o: Any) -> Any:
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        if isinstance(o, (bytes, bytearray)):
+            return {"__bytes_b64__": base64.b64encode(o).decode("ascii")}
+        if isinstance(o, Decimal):
+            return int(o) if o == o.to_integral_value() else float(o)
+        if isinstance(o, set):
+            return list(o)
+        return super().default(o)
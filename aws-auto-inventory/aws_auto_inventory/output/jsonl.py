@@ -0,0 +1,218 @@
+"""
+Streaming JSONL output for AWS Auto Inventory.
+"""
+import io
+import os
+import gzip
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    # zstd compression is optional
+    zstandard = None
+
+from ..core.service import ServiceResult
+from .encoder import InventoryJSONEncoder
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# File name suffix of each supported compression
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+class JsonlSink:
+    """
+    Thread-safe sink appending each service result to a JSONL file.
+
+    Every record is written as soon as its service scan completes, tagged with
+    the inventory, account, region, service and function it belongs to, so no
+    nested result tree has to be held in memory before output starts.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        """
+        Initialize JSONL sink.
+
+        Args:
+            path: Path of the output file. The compression suffix is appended if missing.
+            compression: None, "gzip" or "zstd".
+
+        Raises:
+            ValueError: If the compression is unknown or its module is not installed.
+        """
+        if compression and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+        suffix = COMPRESSION_SUFFIXES.get(compression, "")
+        if suffix and not path.endswith(suffix):
+            path += suffix
+
+        self.path = path
+        self.compression = compression
+        self.records_written = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = _open_text(path, "w", compression)
+
+        logger.info(f"Writing scan results to {path}")
+
+    def write(
+        self,
+        inventory_name: str,
+        service_result: ServiceResult,
+        account: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Append a service result.
+
+        Args:
+            inventory_name: Name of the inventory the result belongs to.
+            service_result: Service scan result.
+            account: Account information (id, name) for organization scans.
+        """
+        record = {
+            "inventory": inventory_name,
+            "account_id": account["id"] if account else None,
+            "account_name": account["name"] if account else None,
+        }
+        record.update(service_result.to_dict())
+        line = json.dumps(record, cls=InventoryJSONEncoder) + "\n"
+
+        with self._lock:
+            self._file.write(line)
+            self.records_written += 1
+
+    def close(self) -> None:
+        """
+        Flush and close the output file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info(f"Wrote {self.records_written} records to {self.path}")
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of a JSONL file one at a time.
+
+    The compression is detected from the file name suffix.
+
+    Args:
+        path: Path of a file written by JsonlSink.
+
+    Yields:
+        One dictionary per service result.
+    """
+    compression = None
+    for name, suffix in COMPRESSION_SUFFIXES.items():
+        if path.endswith(suffix):
+            compression = name
+
+    with _open_text(path, "r", compression) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_scan_results(path: str) -> List[Dict[str, Any]]:
+    """
+    Rebuild the nested ScanResult.to_dict format from a JSONL file.
+
+    Args:
+        path: Path of a file written by JsonlSink.
+
+    Returns:
+        List of scan result dictionaries, one for each inventory, in the order
+        they first appear in the file.
+    """
+    inventories: Dict[str, Dict[str, Any]] = {}
+
+    for record in iter_records(path):
+        inventory_name = record.pop("inventory")
+        account_id = record.pop("account_id")
+        account_name = record.pop("account_name")
+
+        inventory = inventories.setdefault(inventory_name, {"accounts": {}, "regions": {}})
+        if account_id is not None:
+            account = inventory["accounts"].setdefault(account_id, {
+                "account_id": account_id,
+                "account_name": account_name,
+                "regions": {},
+                "success": True,
+                "error": None
+            })
+            regions = account["regions"]
+        else:
+            regions = inventory["regions"]
+
+        regions.setdefault(record["region"], []).append(record)
+
+    results = []
+    for inventory_name, inventory in inventories.items():
+        result: Dict[str, Any] = {"inventory_name": inventory_name}
+        if inventory["accounts"]:
+            result["organization_results"] = [
+                dict(account, regions=_region_list(account["regions"]))
+                for account in inventory["accounts"].values()
+            ]
+        else:
+            result["account_results"] = _region_list(inventory["regions"])
+        results.append(result)
+
+    return results
+
+
+def _region_list(regions: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Convert a region -> service records mapping to RegionResult.to_dict entries.
+    """
+    return [
+        {"region": region, "services": services}
+        for region, services in regions.items()
+    ]
+
+
+def _open_text(path: str, mode: str, compression: Optional[str]) -> io.TextIOBase:
+    """
+    Open a text file, optionally through a compressor.
+
+    Args:
+        path: File path.
+        mode: "r" or "w".
+        compression: None, "gzip" or "zstd".
+
+    Returns:
+        Text file object.
+    """
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        raw = open(path, mode + "b")
+        if mode == "w":
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+
+    return open(path, mode, encoding="utf-8")
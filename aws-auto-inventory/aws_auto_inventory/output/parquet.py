@@ -0,0 +1,323 @@
+"""
+Columnar Parquet output for AWS Auto Inventory.
+"""
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.parquet
+except ImportError:
+    # Parquet output is optional
+    pyarrow = None
+
+from ..core.service import ServiceResult
+from .encoder import InventoryJSONEncoder
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Columns added to every row, ahead of the resource's own columns
+METADATA_COLUMNS = ["inventory", "account_id", "account_name", "region", "scan_time"]
+
+
+class ParquetSink:
+    """
+    Thread-safe sink writing each sheet's resources to a partitioned Parquet dataset.
+
+    Every resource becomes one row of its sheet's table, tagged with the inventory,
+    account, region and scan time. Nested dictionaries are flattened into dotted
+    columns (State.Name) and lists are stored as JSON strings, so every column
+    holds scalars and can be filtered vectorized across all accounts. Rows are
+    buffered per table and written as a new part file of the table's dataset
+    whenever the buffer is full, so memory stays bounded by the buffer size.
+
+    Each table is a directory named after the sheet's service and function,
+    partitioned Hive-style (account_id=.../) by the partition columns.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        partition_by: Sequence[str] = ("account_id",),
+        max_buffered_rows: int = 100000,
+        compression: str = "snappy"
+    ):
+        """
+        Initialize Parquet sink.
+
+        Args:
+            directory: Directory holding one dataset per table.
+            partition_by: Metadata columns partitioning each dataset.
+            max_buffered_rows: Rows buffered per table before a part file is written.
+            compression: Parquet compression codec.
+
+        Raises:
+            ValueError: If pyarrow is not installed or a partition column is unknown.
+        """
+        if pyarrow is None:
+            raise ValueError("Parquet output requires the pyarrow package")
+
+        unknown = [column for column in partition_by if column not in METADATA_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unsupported partition columns: {', '.join(unknown)}")
+
+        self.directory = directory
+        self.partition_by = list(partition_by)
+        self.max_buffered_rows = max_buffered_rows
+        self.compression = compression
+        self.scan_time = datetime.now(timezone.utc)
+        self.rows_written = 0
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._types: Dict[str, Dict[str, "pyarrow.DataType"]] = {}
+        self._parts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        logger.info(f"Writing scan results to {directory}")
+
+    def write(
+        self,
+        inventory_name: str,
+        service_result: ServiceResult,
+        account: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Add the resources of a service result to its table.
+
+        Failed results have no resources and are skipped.
+
+        Args:
+            inventory_name: Name of the inventory the result belongs to.
+            service_result: Service scan result.
+            account: Account information (id, name) for organization scans.
+        """
+        if not service_result.success:
+            return
+
+        metadata = {
+            "inventory": inventory_name,
+            "account_id": account["id"] if account else None,
+            "account_name": account["name"] if account else None,
+            "region": service_result.region,
+            "scan_time": self.scan_time,
+        }
+        rows = []
+        for resource in _resources(service_result.result):
+            row = dict(metadata)
+            row.update(flatten_resource(resource))
+            rows.append(row)
+
+        if not rows:
+            return
+
+        name = table_name(service_result.service, service_result.function)
+        with self._lock:
+            buffer = self._buffers.setdefault(name, [])
+            buffer.extend(rows)
+            if len(buffer) >= self.max_buffered_rows:
+                self._flush(name)
+
+    def close(self) -> None:
+        """
+        Write the buffered rows of every table.
+        """
+        with self._lock:
+            for name in list(self._buffers):
+                self._flush(name)
+            logger.info(f"Wrote {self.rows_written} rows to {self.directory}")
+
+    def _flush(self, name: str) -> None:
+        """
+        Write the buffered rows of a table as a new part file. Called with the lock held.
+        """
+        rows = self._buffers.pop(name, [])
+        if not rows:
+            return
+
+        # Resources of one function rarely have the same keys, so the columns are
+        # the union of all rows' keys, in order of first appearance
+        columns = dict.fromkeys(column for row in rows for column in row)
+
+        # Keep each column's type stable across part files, so the parts form one
+        # dataset. Columns that were entirely null so far take the new type, and
+        # columns whose values change type are stored as strings from then on.
+        types = self._types.setdefault(name, {})
+        arrays = {}
+        for column in columns:
+            values = [row.get(column) for row in rows]
+            array = _array(values)
+            known = types.get(column)
+            if known is None or pyarrow.types.is_null(known):
+                types[column] = array.type
+            elif array.type != known and not pyarrow.types.is_null(array.type):
+                if not pyarrow.types.is_string(array.type):
+                    array = _text_array(values)
+                if not pyarrow.types.is_string(known):
+                    logger.warning(f"Column {column} of {name} changed type, storing it as strings")
+                    types[column] = pyarrow.string()
+            arrays[column] = array.cast(types[column])
+        table = pyarrow.table(arrays)
+
+        part = self._parts.get(name, 0)
+        self._parts[name] = part + 1
+        pyarrow.parquet.write_to_dataset(
+            table,
+            root_path=os.path.join(self.directory, name),
+            partition_cols=self.partition_by,
+            basename_template=f"part-{part}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            compression=self.compression
+        )
+        self.rows_written += len(rows)
+
+    def __enter__(self) -> "ParquetSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def table_name(service: str, function: str) -> str:
+    """
+    Get the name of the table holding the resources of an API function.
+
+    Args:
+        service: AWS service name.
+        function: API function name.
+
+    Returns:
+        Table name, for example ec2.describe_security_groups.
+    """
+    return f"{service}.{function}"
+
+
+def flatten_resource(resource: Any, prefix: str = "") -> Dict[str, Any]:
+    """
+    Flatten a resource into a row of scalar columns.
+
+    Args:
+        resource: Resource returned by an API call. Scalars become a "value" column.
+        prefix: Prefix of the column names.
+
+    Returns:
+        Dictionary of column names to values. Nested dictionaries become dotted
+        columns, lists become JSON strings and datetimes are converted to UTC.
+    """
+    if not isinstance(resource, dict):
+        return {prefix or "value": _scalar(resource)}
+
+    row: Dict[str, Any] = {}
+    for key, value in resource.items():
+        column = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict) and value:
+            row.update(flatten_resource(value, column))
+        else:
+            row[column] = _scalar(value)
+    return row
+
+
+def load_dataset(directory: str, service: str, function: str) -> "pyarrow.dataset.Dataset":
+    """
+    Open the dataset of one table written by ParquetSink.
+
+    Args:
+        directory: Directory the sink wrote to.
+        service: AWS service name.
+        function: API function name.
+
+    Returns:
+        Dataset with the partition columns restored as strings and the columns of
+        all part files, ready for filtered scans.
+
+    Raises:
+        ValueError: If pyarrow is not installed.
+    """
+    if pyarrow is None:
+        raise ValueError("Parquet output requires the pyarrow package")
+
+    path = os.path.join(directory, table_name(service, function))
+    discovered = pyarrow.dataset.dataset(path, format="parquet", partitioning="hive")
+
+    # Account IDs would otherwise be read back as integers, and columns first seen
+    # in later part files would be missing from the first file's schema
+    partition_schema = pyarrow.schema([
+        pyarrow.field(name, pyarrow.string()) for name in discovered.partitioning.schema.names
+    ])
+    schema = _unify_schemas(
+        [fragment.physical_schema for fragment in discovered.get_fragments()] + [partition_schema]
+    )
+    return pyarrow.dataset.dataset(
+        path,
+        schema=schema,
+        format="parquet",
+        partitioning=pyarrow.dataset.partitioning(partition_schema, flavor="hive")
+    )
+
+
+def _unify_schemas(schemas: List["pyarrow.Schema"]) -> "pyarrow.Schema":
+    """
+    Merge the schemas of a table's part files. Null columns take the type of the
+    other parts, and columns written with different types are read as strings.
+    """
+    types: Dict[str, "pyarrow.DataType"] = {}
+    for schema in schemas:
+        for field in schema:
+            known = types.get(field.name)
+            if known is None or pyarrow.types.is_null(known):
+                types[field.name] = field.type
+            elif field.type != known and not pyarrow.types.is_null(field.type):
+                types[field.name] = pyarrow.string()
+    return pyarrow.schema([pyarrow.field(column, column_type) for column, column_type in types.items()])
+
+
+def _array(values: List[Any]) -> "pyarrow.Array":
+    """
+    Convert the values of a column to an array, as strings if their types are mixed.
+    """
+    try:
+        return pyarrow.array(values)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        return _text_array(values)
+
+
+def _text_array(values: List[Any]) -> "pyarrow.Array":
+    """
+    Convert the values of a column to a string array. Strings are kept as is and
+    other values are stored as JSON.
+    """
+    return pyarrow.array(
+        [value if value is None or isinstance(value, str) else json.dumps(value, cls=InventoryJSONEncoder)
+         for value in values],
+        type=pyarrow.string()
+    )
+
+
+def _resources(result: Any) -> List[Any]:
+    """
+    Get the resources of an API result: a list is used as is, anything else is
+    a single resource.
+    """
+    if result is None:
+        return []
+    if isinstance(result, list):
+        return result
+    return [result]
+
+
+def _scalar(value: Any) -> Any:
+    """
+    Convert a value to a type Parquet stores as a scalar column.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, cls=InventoryJSONEncoder)
+    return value
@@ -0,0 +1,557 @@
+"""
+JSON and Excel output for AWS Auto Inventory.
+"""
+import os
+import re
+import json
+import base64
+import logging
+import threading
+import concurrent.futures
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import xlsxwriter
+except ImportError:
+    # Excel output is optional
+    xlsxwriter = None
+
+from ..config.models import Config, Inventory, Sheet
+from ..core.service import ServiceResult
+from ..utils.service_models import get_operation_model
+from .encoder import InventoryJSONEncoder
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Limits of an Excel worksheet
+MAX_ROWS = 1048576
+MAX_COLUMNS = 16384
+MAX_CELL_LENGTH = 32767
+MAX_SHEET_NAME_LENGTH = 31
+
+# Column holding, as JSON, the keys of a resource missing from its worksheet's header
+OTHER_COLUMN = "Other"
+
+
+class JsonWriter:
+    """
+    Writer of one JSON file per service result.
+
+    Files are laid out as <directory>/<inventory>/[<account>/]<region>/<sheet>.json
+    and hold the result of the API call. Sheets may share a service and function,
+    so files are named after the sheet; results without a sheet name are written
+    to <service>-<function>.json, like the legacy scanner's output.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize JSON writer.
+
+        Args:
+            directory: Root directory of the JSON files.
+        """
+        self.directory = directory
+        self.files_written = 0
+        self._lock = threading.Lock()
+
+    def write(
+        self,
+        inventory_name: str,
+        service_result: ServiceResult,
+        account: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Write the result of a service scan.
+
+        Args:
+            inventory_name: Name of the inventory the result belongs to.
+            service_result: Service scan result.
+            account: Account information (id, name) for organization scans.
+        """
+        parts = [self.directory, inventory_name]
+        if account:
+            parts.append(account["id"])
+        parts.append(service_result.region)
+        directory = os.path.join(*parts)
+        os.makedirs(directory, exist_ok=True)
+
+        name = service_result.sheet or f"{service_result.service}-{service_result.function}"
+        path = os.path.join(directory, f"{_file_name(name)}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(service_result.result, f, cls=InventoryJSONEncoder)
+
+        with self._lock:
+            self.files_written += 1
+
+    def close(self) -> None:
+        """
+        Log the number of files written.
+        """
+        logger.info(f"Wrote {self.files_written} JSON files to {self.directory}")
+
+
+class ExcelWriter:
+    """
+    Writer of an inventory's Excel workbook, with one worksheet per sheet.
+
+    Results are written to the worksheet of the sheet they were scanned for.
+    Results without a sheet name go to the first sheet calling their API
+    function, or to a worksheet of their own if no sheet does.
+
+    The workbook is written in xlsxwriter's constant memory mode: each row is
+    flushed to disk as soon as the next one starts, so memory does not grow with
+    the number of resources. As the header row must be written first, columns
+    are taken from the botocore output shape of the sheet's result key and from
+    the keys of the first resources written. Keys of later resources missing
+    from the header are kept as JSON in a trailing "Other" column.
+
+    Transposed worksheets, with one column per resource, can only be written
+    once all their resources are known, so they are buffered until close.
+    """
+
+    def __init__(self, path: str, inventory: Inventory):
+        """
+        Initialize Excel writer.
+
+        Args:
+            path: Path of the workbook.
+            inventory: Inventory configuration, for its sheets and Excel settings.
+
+        Raises:
+            ValueError: If xlsxwriter is not installed.
+        """
+        if xlsxwriter is None:
+            raise ValueError("Excel output requires the xlsxwriter package")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.inventory = inventory
+        self.transpose = inventory.excel.transpose
+        self.rows_written = 0
+        self._workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self._header_format = self._workbook.add_format(
+            inventory.excel.formatting.get("header_style", {"bold": True})
+        )
+        self._datetime_format = self._workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+        self._worksheets: Dict[str, "_Worksheet"] = {}
+        self._function_worksheets: Dict[Tuple[str, str], "_Worksheet"] = {}
+        self._sheet_names: set = set()
+
+        # Create the worksheets in the order of the configuration
+        for sheet in inventory.sheets:
+            if sheet.name not in self._worksheets:
+                worksheet = _Worksheet(self._add_worksheet(sheet.name), sheet)
+                self._worksheets[sheet.name] = worksheet
+                self._function_worksheets.setdefault((sheet.service, sheet.function), worksheet)
+
+    def write(
+        self,
+        inventory_name: str,
+        service_result: ServiceResult,
+        account: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Append the resources of a service result to its worksheet.
+
+        Args:
+            inventory_name: Name of the inventory the result belongs to.
+            service_result: Service scan result.
+            account: Account information (id, name) for organization scans.
+        """
+        key = (service_result.service, service_result.function)
+        if service_result.sheet is not None:
+            worksheet = self._worksheets.get(service_result.sheet)
+        else:
+            worksheet = self._function_worksheets.get(key)
+        if worksheet is None:
+            sheet = Sheet(
+                name=service_result.sheet or f"{service_result.service}-{service_result.function}",
+                service=service_result.service,
+                function=service_result.function
+            )
+            worksheet = _Worksheet(self._add_worksheet(sheet.name), sheet)
+            self._worksheets[sheet.name] = worksheet
+            self._function_worksheets.setdefault(key, worksheet)
+
+        rows = []
+        for resource in _resources(service_result.result):
+            row = {}
+            if self.inventory.aws.organization:
+                row["Account ID"] = account["id"] if account else None
+                row["Account Name"] = account["name"] if account else None
+            row["Region"] = service_result.region
+            if isinstance(resource, dict):
+                row.update(resource)
+            else:
+                row["Value"] = resource
+            rows.append(row)
+
+        if not rows:
+            return
+
+        if self.transpose:
+            worksheet.buffer.extend(rows)
+        else:
+            if worksheet.columns is None:
+                self._write_header(worksheet, rows)
+            for row in rows:
+                self._write_row(worksheet, row)
+
+    def close(self) -> None:
+        """
+        Write the transposed worksheets and close the workbook.
+        """
+        for worksheet in self._worksheets.values():
+            if self.transpose:
+                self._write_transposed(worksheet)
+            elif worksheet.columns is not None:
+                worksheet.worksheet.autofilter(0, 0, worksheet.row - 1, len(worksheet.columns) - 1)
+
+        self._workbook.close()
+        logger.info(f"Wrote {self.rows_written} rows to {self.path}")
+
+    def _add_worksheet(self, name: str) -> Any:
+        """
+        Add a worksheet, making its name valid and unique in the workbook.
+        """
+        base = re.sub(r"[\[\]:*?/\\]", "_", name)[:MAX_SHEET_NAME_LENGTH] or "Sheet"
+        sheet_name = base
+        suffix = 1
+        while sheet_name.lower() in self._sheet_names:
+            suffix += 1
+            sheet_name = f"{base[:MAX_SHEET_NAME_LENGTH - len(str(suffix)) - 1]}~{suffix}"
+        self._sheet_names.add(sheet_name.lower())
+        return self._workbook.add_worksheet(sheet_name)
+
+    def _write_header(self, worksheet: "_Worksheet", rows: List[Dict[str, Any]]) -> None:
+        """
+        Choose the columns of a worksheet and write its header row.
+        """
+        sheet = worksheet.sheet
+        columns = list(dict.fromkeys(
+            [column for column in rows[0] if column in ("Account ID", "Account Name", "Region")]
+            + list(get_shape_columns(sheet.service, sheet.function, sheet.result_key))
+            + [column for row in rows for column in row]
+        ))
+        columns = columns[:MAX_COLUMNS - 1] + [OTHER_COLUMN]
+
+        worksheet.columns = {column: index for index, column in enumerate(columns)}
+        for index, column in enumerate(columns):
+            worksheet.worksheet.write_string(0, index, column, self._header_format)
+        worksheet.worksheet.freeze_panes(1, 0)
+        worksheet.row = 1
+
+    def _write_row(self, worksheet: "_Worksheet", row: Dict[str, Any]) -> None:
+        """
+        Append a row to a worksheet.
+        """
+        if worksheet.row >= MAX_ROWS:
+            if not worksheet.truncated:
+                logger.warning(f"Worksheet {worksheet.worksheet.name} is full, dropping further rows")
+                worksheet.truncated = True
+            return
+
+        other = {}
+        for column, value in row.items():
+            index = worksheet.columns.get(column)
+            if index is None or column == OTHER_COLUMN:
+                other[column] = value
+            else:
+                self._write_cell(worksheet.worksheet, worksheet.row, index, value)
+        if other:
+            self._write_cell(worksheet.worksheet, worksheet.row, worksheet.columns[OTHER_COLUMN], other)
+
+        worksheet.row += 1
+        self.rows_written += 1
+
+    def _write_transposed(self, worksheet: "_Worksheet") -> None:
+        """
+        Write a buffered worksheet with one row per key and one column per resource.
+        """
+        rows = worksheet.buffer[:MAX_COLUMNS - 1]
+        if len(worksheet.buffer) > len(rows):
+            logger.warning(f"Worksheet {worksheet.worksheet.name} is full, dropping further resources")
+
+        keys = list(dict.fromkeys(key for row in rows for key in row))
+        for row_index, key in enumerate(keys[:MAX_ROWS]):
+            worksheet.worksheet.write_string(row_index, 0, str(key), self._header_format)
+            for column_index, row in enumerate(rows, start=1):
+                if key in row:
+                    self._write_cell(worksheet.worksheet, row_index, column_index, row[key])
+        worksheet.worksheet.freeze_panes(0, 1)
+
+        self.rows_written += len(rows)
+        worksheet.buffer = []
+
+    def _write_cell(self, worksheet: Any, row: int, column: int, value: Any) -> None:
+        """
+        Write a value with the cell type matching its Python type.
+        """
+        if value is None:
+            return
+        if isinstance(value, bool):
+            worksheet.write_boolean(row, column, value)
+        elif isinstance(value, (int, float)) and abs(value) < 1e15:
+            worksheet.write_number(row, column, value)
+        elif isinstance(value, datetime):
+            # Excel has no time zones, datetimes are written in UTC
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            worksheet.write_datetime(row, column, value, self._datetime_format)
+        elif isinstance(value, date):
+            worksheet.write_datetime(row, column, datetime(value.year, value.month, value.day), self._datetime_format)
+        elif isinstance(value, (bytes, bytearray)):
+            worksheet.write_string(row, column, f"[BYTES: {base64.b64encode(value).decode('ascii')}]"[:MAX_CELL_LENGTH])
+        elif isinstance(value, str):
+            worksheet.write_string(row, column, value[:MAX_CELL_LENGTH])
+        else:
+            text = json.dumps(value, cls=InventoryJSONEncoder)
+            worksheet.write_string(row, column, text[:MAX_CELL_LENGTH])
+
+
+class _Worksheet:
+    """
+    State of a worksheet being written.
+    """
+
+    def __init__(self, worksheet: Any, sheet: Sheet):
+        self.worksheet = worksheet
+        self.sheet = sheet
+        self.columns: Optional[Dict[str, int]] = None
+        self.row = 0
+        self.truncated = False
+        self.buffer: List[Dict[str, Any]] = []
+
+
+class OutputProcessor:
+    """
+    Sink writing JSON files and Excel workbooks while the scan runs.
+
+    Each format is written by its own worker threads, so JSON and Excel are
+    written in parallel with each other and with the scan, and little is left
+    to write once the scan ends. Workbooks are written by a single thread each,
+    as rows of a constant memory workbook must be appended in order. Scanning
+    threads block once max_pending results wait to be written, so a slow
+    writer cannot make pending results pile up in memory.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        formats: Sequence[str],
+        config: Optional[Config] = None,
+        json_workers: int = 4,
+        max_pending: int = 1000
+    ):
+        """
+        Initialize output processor.
+
+        Args:
+            output_dir: Directory of the output files.
+            formats: Formats to write: "json" and/or "excel".
+            config: Configuration of the scan, for the sheets and Excel settings of
+                    each inventory. Inventories missing from it get one worksheet per
+                    API function, with default settings.
+            json_workers: Threads writing JSON files.
+            max_pending: Results waiting to be written before scanning threads block.
+
+        Raises:
+            ValueError: If a format is unknown or its module is not installed.
+        """
+        unknown = [output_format for output_format in formats if output_format not in ("json", "excel")]
+        if unknown:
+            raise ValueError(f"Unsupported output formats: {', '.join(unknown)}")
+        if "excel" in formats and xlsxwriter is None:
+            raise ValueError("Excel output requires the xlsxwriter package")
+
+        self.output_dir = output_dir
+        self.formats = list(formats)
+        self.inventories = {inventory.name: inventory for inventory in (config.inventories if config else [])}
+        self.errors = 0
+        self.json_writer = JsonWriter(os.path.join(output_dir, "json")) if "json" in formats else None
+        self.excel_writers: Dict[str, ExcelWriter] = {}
+        self._json_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=json_workers, thread_name_prefix="aws-auto-inventory-json"
+        ) if self.json_writer is not None else None
+        self._excel_executors: Dict[str, concurrent.futures.ThreadPoolExecutor] = {}
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(
+        self,
+        inventory_name: str,
+        service_result: ServiceResult,
+        account: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Queue a completed service result for every output format.
+
+        Failed results have no resources and are skipped.
+
+        Args:
+            inventory_name: Name of the inventory the result belongs to.
+            service_result: Service scan result.
+            account: Account information (id, name) for organization scans.
+        """
+        if not service_result.success:
+            return
+
+        # The scanner may drop the result from the service result once written, so
+        # the writers get a copy holding the result itself
+        result = ServiceResult(
+            service=service_result.service,
+            function=service_result.function,
+            region=service_result.region,
+            result=service_result.result,
+            sheet=service_result.sheet
+        )
+
+        if self.json_writer is not None:
+            self._submit(self._json_executor, self.json_writer, inventory_name, result, account)
+
+        if "excel" in self.formats:
+            executor, writer = self._get_excel_writer(inventory_name)
+            self._submit(executor, writer, inventory_name, result, account)
+
+    def close(self) -> None:
+        """
+        Wait for the queued results to be written and close the output files.
+        """
+        if self._json_executor is not None:
+            self._json_executor.shutdown(wait=True)
+            self.json_writer.close()
+
+        with self._lock:
+            writers = list(self.excel_writers.items())
+        for inventory_name, writer in writers:
+            executor = self._excel_executors[inventory_name]
+            executor.submit(writer.close).result()
+            executor.shutdown(wait=True)
+
+        if self.errors:
+            logger.error(f"{self.errors} results could not be written")
+
+    def process(self, results: List[Any]) -> None:
+        """
+        Write the results of a completed scan and close the output files.
+
+        Args:
+            results: Scan results, as returned by ScanEngine.scan.
+        """
+        for scan_result in results:
+            if scan_result.is_organization_scan:
+                for account_result in scan_result.account_results:
+                    account = {"id": account_result.account_id, "name": account_result.account_name}
+                    for region_result in account_result.regions:
+                        for service_result in region_result.services:
+                            self.write(scan_result.inventory_name, service_result, account)
+            else:
+                for region_result in scan_result.region_results:
+                    for service_result in region_result.services:
+                        self.write(scan_result.inventory_name, service_result)
+
+        self.close()
+
+    def _get_excel_writer(self, inventory_name: str) -> Tuple[concurrent.futures.ThreadPoolExecutor, ExcelWriter]:
+        """
+        Get the workbook of an inventory and the thread writing it, creating them if needed.
+        """
+        with self._lock:
+            writer = self.excel_writers.get(inventory_name)
+            if writer is None:
+                inventory = self.inventories.get(inventory_name) or Inventory(name=inventory_name, sheets=[])
+                writer = ExcelWriter(os.path.join(self.output_dir, f"{_file_name(inventory_name)}.xlsx"), inventory)
+                self.excel_writers[inventory_name] = writer
+                self._excel_executors[inventory_name] = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="aws-auto-inventory-excel"
+                )
+            return self._excel_executors[inventory_name], writer
+
+    def _submit(
+        self,
+        executor: concurrent.futures.ThreadPoolExecutor,
+        writer: Any,
+        inventory_name: str,
+        service_result: ServiceResult,
+        account: Optional[Dict[str, str]]
+    ) -> None:
+        """
+        Queue a write, waiting while too many writes are pending.
+        """
+        self._pending.acquire()
+        future = executor.submit(writer.write, inventory_name, service_result, account)
+        future.add_done_callback(self._on_written)
+
+    def _on_written(self, future: concurrent.futures.Future) -> None:
+        """
+        Release the pending slot of a completed write and log its error, if any.
+        """
+        self._pending.release()
+        error = future.exception()
+        if error is not None:
+            with self._lock:
+                self.errors += 1
+            logger.error(f"Error writing output: {error}")
+
+    def __enter__(self) -> "OutputProcessor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+@lru_cache(maxsize=None)
+def get_shape_columns(service: str, function: str, result_key: Optional[str]) -> Tuple[str, ...]:
+    """
+    Get the keys of the resources an API function returns under a result key.
+
+    Args:
+        service: AWS service name.
+        function: API function name.
+        result_key: Key of the resource list in the response.
+
+    Returns:
+        Member names of the resource structure in the botocore output shape, in
+        model order, or an empty tuple if they cannot be determined.
+    """
+    if not result_key:
+        return ()
+
+    try:
+        shape = get_operation_model(service, function).output_shape
+        shape = shape.members[result_key]
+        if shape.type_name == "list":
+            shape = shape.member
+        if shape.type_name != "structure":
+            return ()
+        return tuple(shape.members)
+    except Exception as e:
+        logger.debug(f"No output shape for {service}.{function} {result_key}: {e}")
+        return ()
+
+
+def _resources(result: Any) -> List[Any]:
+    """
+    Get the resources of an API result: a list is used as is, anything else is
+    a single resource.
+    """
+    if result is None:
+        return []
+    if isinstance(result, list):
+        return result
+    return [result]
+
+
+def _file_name(name: str) -> str:
+    """
+    Make a name safe to use as a file name.
+    """
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name)
@@ -0,0 +1,228 @@
+"""
+Catalog of AWS API operations for AWS Auto Inventory.
+"""
+import os
+import re
+import json
+import logging
+import tempfile
+import concurrent.futures
+from typing import Any, Dict, Iterable, List, Optional
+
+import botocore
+import botocore.session
+from botocore import xform_name
+from botocore.exceptions import DataNotFoundError
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Default directory of the cached catalogs
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "aws-auto-inventory")
+
+# Operations starting with these verbs only read data
+READ_ONLY_VERBS = ("Describe", "Get", "List", "Lookup", "Search", "BatchGet", "BatchDescribe")
+
+# Protocols where the HTTP method tells whether an operation changes data
+REST_PROTOCOLS = ("rest-json", "rest-xml")
+
+
+def load_catalog(
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Load the operation catalog of the installed botocore, building it if needed.
+
+    The catalog is cached in one file per botocore version, so it is only built
+    again when botocore is upgraded.
+
+    Args:
+        cache_dir: Directory of the cached catalogs. The catalog is built every
+                   time if None.
+        max_workers: Processes building the catalog. Defaults to the number of CPUs.
+
+    Returns:
+        Catalog dictionary, see build_catalog.
+    """
+    path = get_catalog_path(cache_dir) if cache_dir else None
+
+    if path is not None and os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Rebuilding unreadable operation catalog {path}: {e}")
+
+    catalog = build_catalog(max_workers=max_workers)
+
+    if path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write atomically, so concurrent runs never read a partial catalog
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(catalog, f)
+            os.replace(temp_path, path)
+            logger.info(f"Wrote operation catalog to {path}")
+        except OSError as e:
+            logger.warning(f"Could not write operation catalog {path}: {e}")
+
+    return catalog
+
+
+def build_catalog(
+    services: Optional[Iterable[str]] = None,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build the operation catalog from botocore's service models.
+
+    No client is created: the models are read directly, one process per batch
+    of services, as parsing them is CPU bound.
+
+    Args:
+        services: Services to include. Defaults to all services botocore knows.
+        max_workers: Processes building the catalog. Defaults to the number of CPUs.
+
+    Returns:
+        Dictionary with the botocore version and, under "services", the operations
+        of each service by client method name. Each operation has:
+        operation: API operation name.
+        read_only: Whether the operation only reads data.
+        paginated: Whether botocore can paginate the operation.
+        result_key: Key of the operation's resource list, if any.
+        required_parameters: Parameters the operation requires.
+    """
+    if services is None:
+        services = botocore.session.get_session().get_available_services()
+    services = sorted(services)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers > 1 and len(services) > 1:
+        # A few large batches per process keep the process start-up cost low
+        batches = [services[index::max_workers * 4] for index in range(max_workers * 4)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results: Dict[str, Dict[str, Any]] = {}
+            for batch_result in executor.map(_build_services, [batch for batch in batches if batch]):
+                results.update(batch_result)
+    else:
+        results = _build_services(services)
+
+    return {
+        "botocore_version": botocore.__version__,
+        "services": {service: results[service] for service in sorted(results)},
+    }
+
+
+def get_catalog_path(cache_dir: str) -> str:
+    """
+    Get the path of the catalog of the installed botocore.
+
+    Args:
+        cache_dir: Directory of the cached catalogs.
+
+    Returns:
+        Path of the catalog file.
+    """
+    return os.path.join(cache_dir, f"operation_catalog-{botocore.__version__}.json")
+
+
+def get_scannable_operations(
+    catalog: Dict[str, Any],
+    services: Optional[Iterable[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    List the operations that can be scanned without parameters.
+
+    Args:
+        catalog: Catalog dictionary, see build_catalog.
+        services: Services to include. Defaults to all services of the catalog.
+
+    Returns:
+        Read-only operations with no required parameters, as sheet-like dictionaries
+        with a service, function and, if known, result_key.
+    """
+    selected = catalog["services"] if services is None else {
+        service: catalog["services"].get(service, {}) for service in services
+    }
+
+    scannable = []
+    for service, operations in selected.items():
+        for function, operation in operations.items():
+            if operation["read_only"] and not operation["required_parameters"]:
+                entry = {"service": service, "function": function}
+                if operation["result_key"]:
+                    entry["result_key"] = operation["result_key"]
+                scannable.append(entry)
+    return scannable
+
+
+def _build_services(services: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the catalog entries of a batch of services. Runs in a worker process.
+    """
+    session = botocore.session.get_session()
+    return {service: _build_service(session, service) for service in services}
+
+
+def _build_service(session: botocore.session.Session, service: str) -> Dict[str, Any]:
+    """
+    Build the catalog entries of a service's operations.
+    """
+    service_model = session.get_service_model(service)
+    try:
+        paginator_model = session.get_paginator_model(service)
+    except DataNotFoundError:
+        paginator_model = None
+
+    operations = {}
+    for operation_name in service_model.operation_names:
+        operation_model = service_model.operation_model(operation_name)
+        paginator = _get_paginator(paginator_model, operation_name)
+
+        result_key = None
+        if paginator is not None:
+            result_key = paginator.get("result_key")
+            if isinstance(result_key, list):
+                result_key = result_key[0]
+        elif operation_model.output_shape is not None:
+            result_key = next(
+                (name for name, shape in operation_model.output_shape.members.items() if shape.type_name == "list"),
+                None
+            )
+
+        input_shape = operation_model.input_shape
+        operations[xform_name(operation_name)] = {
+            "operation": operation_name,
+            "read_only": _is_read_only(service_model.protocol, operation_model),
+            "paginated": paginator is not None,
+            # Expressions such as "Reservations[].Instances" are not plain keys
+            "result_key": result_key if result_key and re.fullmatch(r"[\w.]+", result_key) else None,
+            "required_parameters": list(input_shape.required_members) if input_shape is not None else [],
+        }
+
+    return operations
+
+
+def _get_paginator(paginator_model: Any, operation_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the paginator configuration of an operation, or None if it is not paginated.
+    """
+    if paginator_model is None:
+        return None
+    try:
+        return paginator_model.get_paginator(operation_name)
+    except ValueError:
+        return None
+
+
+def _is_read_only(protocol: str, operation_model: Any) -> bool:
+    """
+    Classify an operation as read-only from its verb or, for REST APIs, its HTTP method.
+    """
+    if operation_model.name.startswith(READ_ONLY_VERBS):
+        return True
+    if protocol in REST_PROTOCOLS:
+        return operation_model.http.get("method") in ("GET", "HEAD")
+    return False
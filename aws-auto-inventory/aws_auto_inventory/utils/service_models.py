@@ -0,0 +1,109 @@
+"""
+Cached access to botocore service models for AWS Auto Inventory.
+"""
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import botocore.session
+from botocore import xform_name
+from botocore.exceptions import UnknownServiceError
+from botocore.model import OperationModel, ServiceModel
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+_session_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_loader_session() -> botocore.session.Session:
+    """
+    Get the botocore session used to load service models.
+
+    Loading models needs no credentials and makes no network calls. botocore
+    caches every model file it loads, so each is parsed once per process.
+
+    Returns:
+        Shared botocore session.
+    """
+    return botocore.session.get_session()
+
+
+@lru_cache(maxsize=1)
+def get_available_services() -> frozenset:
+    """
+    Get the names of all services botocore has a model for.
+
+    Returns:
+        Set of service names, as passed to boto3.client.
+    """
+    return frozenset(get_loader_session().get_available_services())
+
+
+@lru_cache(maxsize=None)
+def get_service_model(service: str) -> Optional[ServiceModel]:
+    """
+    Get the model of a service.
+
+    Args:
+        service: AWS service name.
+
+    Returns:
+        Service model, or None if botocore does not know the service.
+    """
+    if service not in get_available_services():
+        return None
+    try:
+        # Sessions are not thread-safe while loading their component registry
+        with _session_lock:
+            return get_loader_session().get_service_model(service)
+    except UnknownServiceError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_operation_names(service: str) -> Dict[str, str]:
+    """
+    Get the operations of a service by client method name.
+
+    Args:
+        service: AWS service name.
+
+    Returns:
+        Dictionary of client method names (describe_instances) to operation names
+        (DescribeInstances). Empty if botocore does not know the service.
+    """
+    service_model = get_service_model(service)
+    if service_model is None:
+        return {}
+    return {xform_name(name): name for name in service_model.operation_names}
+
+
+def get_operation_model(service: str, function: str) -> Optional[OperationModel]:
+    """
+    Get the model of an operation from its client method name.
+
+    Args:
+        service: AWS service name.
+        function: Client method name, for example describe_instances.
+
+    Returns:
+        Operation model, or None if botocore does not know the operation.
+    """
+    operation_name = get_operation_names(service).get(function)
+    if operation_name is None:
+        return None
+    return get_service_model(service).operation_model(operation_name)
+
+
+def get_available_profiles() -> List[str]:
+    """
+    Get the profiles of the shared AWS config and credentials files.
+
+    Returns:
+        Profile names.
+    """
+    with _session_lock:
+        return get_loader_session().available_profiles
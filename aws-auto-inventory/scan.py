@@ -12,16 +12,22 @@ import time
 import traceback
 from datetime import datetime
 import requests
-try:
-    import pyjq
-except ImportError:
-    # Fallback for Python 3.13 compatibility
-    import pyjq_mock as pyjq
+from aws_auto_inventory.core.aws_client import extract_result
+from aws_auto_inventory.core.client_cache import get_session_key
+from aws_auto_inventory.core.planner import ScanPlanner, get_account_key
+from aws_auto_inventory.core.rate_limiter import (
+    RateLimiter,
+    THROTTLING_ERROR_CODES,
+    jittered_backoff,
+)
 
 # accomodate windows and unix path
 # Define the timestamp as a string, which will be the same throughout the execution of the script.
 timestamp = datetime.now().isoformat(timespec="minutes").replace(":", "-")
 
+# Adaptive request budget shared by every thread, keyed by (account, region, service).
+rate_limiter = RateLimiter()
+
 
 def get_json_from_url(url):
     """Fetch JSON from a URL."""
@@ -72,8 +78,9 @@ def api_call_with_retry(client, function_name, parameters, max_retries, retry_de
     """
     Make an API call with exponential backoff.
 
-    This function will make an API call with retries. It will exponentially back off
-    with a delay of `retry_delay * 2^attempt` for transient errors.
+    This function will make an API call with retries. It will back off for a random
+    delay between half and all of `retry_delay * 2^attempt` (equal jitter) for
+    transient errors, so concurrent threads do not retry in lockstep.
     """
 
     def api_call():
@@ -86,18 +93,51 @@ def api_call_with_retry(client, function_name, parameters, max_retries, retry_de
                     return function_to_call()
             except botocore.exceptions.ClientError as error:
                 error_code = error.response["Error"]["Code"]
-                if error_code == "Throttling":
+                if error_code in THROTTLING_ERROR_CODES:
                     if attempt < (max_retries - 1):  # no delay on last attempt
-                        time.sleep(retry_delay**attempt)
+                        time.sleep(jittered_backoff(attempt, retry_delay))
                     continue
-                elif error_code == "RequestLimitExceeded":
-                    time.sleep(retry_delay**attempt)
+                else:
+                    raise
+            except botocore.exceptions.BotoCoreError:
+                if attempt < (max_retries - 1):  # no delay on last attempt
+                    time.sleep(jittered_backoff(attempt, retry_delay))
+                continue
+        return None
+
+    return api_call
+
+
+def paginated_call_with_retry(
+    client, function_name, parameters, result_key, max_retries, retry_delay, pagination_config=None
+):
+    """
+    Make a paginated API call with exponential backoff.
+
+    Pages are requested lazily through the botocore paginator and result_key is
+    applied to each page as it arrives. A throttling or transient error on any page
+    restarts the pagination after the same backoff as `api_call_with_retry`.
+    """
+
+    def api_call():
+        paginator = client.get_paginator(function_name)
+        for attempt in range(max_retries):
+            try:
+                pages = paginator.paginate(
+                    PaginationConfig=pagination_config or {}, **(parameters or {})
+                )
+                return extract_result(pages, result_key)
+            except botocore.exceptions.ClientError as error:
+                error_code = error.response["Error"]["Code"]
+                if error_code in THROTTLING_ERROR_CODES:
+                    if attempt < (max_retries - 1):  # no delay on last attempt
+                        time.sleep(jittered_backoff(attempt, retry_delay))
                     continue
                 else:
                     raise
             except botocore.exceptions.BotoCoreError:
                 if attempt < (max_retries - 1):  # no delay on last attempt
-                    time.sleep(retry_delay**attempt)
+                    time.sleep(jittered_backoff(attempt, retry_delay))
                 continue
         return None
 
@@ -123,6 +163,11 @@ def _get_service_data(session, region_name, service, log, max_retries, retry_del
     function = service["function"]
     result_key = service.get("result_key", None)
     parameters = service.get("parameters", None)
+    pagination_config = {}
+    if service.get("page_size"):
+        pagination_config["PageSize"] = service["page_size"]
+    if service.get("max_items"):
+        pagination_config["MaxItems"] = service["max_items"]
 
     log.info(
         "Getting data on service %s with function %s in region %s",
@@ -133,6 +178,9 @@ def _get_service_data(session, region_name, service, log, max_retries, retry_del
 
     try:
         client = session.client(service["service"], region_name=region_name)
+        rate_limiter.register(
+            client, (get_session_key(session), region_name, service["service"])
+        )
         if not hasattr(client, function):
             log.error(
                 "Function %s does not exist for service %s in region %s",
@@ -141,18 +189,15 @@ def _get_service_data(session, region_name, service, log, max_retries, retry_del
                 region_name,
             )
             return None
-        api_call = api_call_with_retry(
-            client, function, parameters, max_retries, retry_delay
-        )
-        
-        if result_key and result_key.startswith('.'):
-            response = pyjq.all(result_key, json.loads(json.dumps(api_call(), default=str)))
-        elif result_key and not result_key.startswith('.'):
-            response = api_call().get(result_key)
+        if client.can_paginate(function):
+            response = paginated_call_with_retry(
+                client, function, parameters, result_key, max_retries, retry_delay, pagination_config
+            )()
         else:
-            response = api_call()
-            if isinstance(response, dict):
-                response.pop("ResponseMetadata", None)
+            api_call = api_call_with_retry(
+                client, function, parameters, max_retries, retry_delay
+            )
+            response = extract_result([api_call()], result_key)
     except Exception as exception:
         log.error(
             "Error while processing %s, %s.\n%s: %s",
@@ -263,6 +308,7 @@ def main(
     concurrent_regions,
     concurrent_services,
     session=None,
+    cache_dir=None,
 ):
     """
     Main function to perform the AWS services scan.
@@ -277,6 +323,8 @@ def main(
     concurrent_regions -- The number of regions to process concurrently.
     concurrent_services -- The number of services to process concurrently for each region.
     session -- Optional boto3 Session to use. If not provided, a new session will be created.
+    cache_dir -- Directory caching enabled regions and service availability. Defaults to
+                 a cache directory in output_dir.
     """
 
     if session is None:
@@ -296,14 +344,9 @@ def main(
     else:
         with open(scan, "r") as f:
             services = json.load(f)
+    planner = ScanPlanner(cache_dir or os.path.join(output_dir, "cache"))
     if not regions:
-        ec2_client = session.client("ec2")
-        regions = [
-            region["RegionName"]
-            for region in ec2_client.describe_regions()["Regions"]
-            if region["OptInStatus"] == "opt-in-not-required"
-            or region["OptInStatus"] == "opted-in"
-        ]
+        regions = planner.get_enabled_regions(session, get_account_key(session))
 
     start_time = time.time()
 
@@ -315,7 +358,7 @@ def main(
             executor.submit(
                 process_region,
                 region,
-                services,
+                [service for service in services if planner.is_available(service["service"], region)],
                 session,
                 log,
                 max_retries,
@@ -1,32 +1,66 @@
 # -*- coding: utf-8 -*-
-import boto3
-import json
+"""
+Build scan files for scan.py from the operation catalog.
+
+The catalog is read from botocore's service models without creating clients,
+in parallel, and cached per botocore version. Only read-only operations that
+need no parameters are written, so every entry of the scan file can be called
+as is.
+"""
 import os
+import sys
+import json
+import argparse
+
+from aws_auto_inventory.utils.catalog import (
+    DEFAULT_CACHE_DIR,
+    get_catalog_path,
+    get_scannable_operations,
+    load_catalog,
+)
+
+
+def build_service_sheet(output, services=None, cache_dir=DEFAULT_CACHE_DIR, max_workers=None):
+    """
+    Write a scan file listing the scannable operations of the given services.
 
+    Arguments:
+    output -- Path of the scan file.
+    services -- Services to include. Defaults to all services.
+    cache_dir -- Directory of the cached operation catalog.
+    max_workers -- Processes building the catalog if it is not cached.
 
-def build_service_sheet():
-    session = boto3.Session()
+    Returns the number of operations written.
+    """
+    catalog = load_catalog(cache_dir, max_workers=max_workers)
+    operations = get_scannable_operations(catalog, services)
 
-    for service_name in session.get_available_services():
-        client = session.client(service_name)
-        methods = [
-            method
-            for method in dir(client)
-            if callable(getattr(client, method))
-            and method.startswith(("get", "describe", "list"))
-        ]
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(operations, f, indent=2)
 
-        service_sheet = []
+    return len(operations)
 
-        for method in methods:
-            service_sheet.append({"service": service_name, "function": method})
 
-        scan_dir = os.path.join("scan", "sample", "services")
-        # Ensure the directory exists
-        os.makedirs(scan_dir, exist_ok=True)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a scan file from the AWS operation catalog")
+    parser.add_argument(
+        "-o", "--output", default=os.path.join("scan", "sample", "all_services.json"),
+        help="Path of the scan file (default: scan/sample/all_services.json)"
+    )
+    parser.add_argument("-s", "--services", nargs="+", default=None, help="Services to include (default: all)")
+    parser.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR,
+        help=f"Directory of the cached operation catalog (default: {DEFAULT_CACHE_DIR})"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Processes building the catalog (default: CPUs)")
+    args = parser.parse_args(argv)
 
-        with open(os.path.join(scan_dir, f"{service_name}.json"), "w") as f:
-            json.dump(service_sheet, f)
+    count = build_service_sheet(args.output, args.services, args.cache_dir, args.workers)
+    print(f"Wrote {count} operations to {args.output} (catalog: {get_catalog_path(args.cache_dir)})")
 
 
-build_service_sheet()
+if __name__ == "__main__":
+    sys.exit(main())
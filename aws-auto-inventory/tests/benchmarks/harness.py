@@ -0,0 +1,435 @@
+"""
+Offline benchmark harness for AWS Auto Inventory.
+
+SyntheticAWS answers every boto3 call locally with generated resources, so the
+scanners can be driven against accounts with thousands of resources, injected
+latency and injected throttling on a laptop without network access.
+"""
+import os
+import json
+import time
+import random
+import resource
+import threading
+import contextlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+import botocore.session
+from botocore.awsrequest import AWSResponse
+
+# Account ID of the management account answering sts.get_caller_identity
+MANAGEMENT_ACCOUNT_ID = "000000000000"
+
+
+class SyntheticAWS:
+    """
+    Local stand-in for AWS answering every call from botocore's "before-call" event.
+
+    Like botocore's Stubber, responses are returned before a request is signed or
+    sent, so botocore's own retries are bypassed: injected throttling errors reach
+    the scanner's retry logic directly. Paginated operations are answered page by
+    page using botocore's paginator models, and any other operation fills the first
+    list in its output shape. Latency is simulated with a sleep, which releases the
+    GIL like a real network wait.
+    """
+
+    def __init__(
+        self,
+        resources_per_call: int = 100,
+        page_size: int = 100,
+        accounts: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Initialize the synthetic backend.
+
+        Args:
+            resources_per_call: Resources returned by each operation, across all pages.
+            page_size: Page size of paginated operations when the caller sets none.
+            accounts: Member accounts returned by organizations.list_accounts.
+            latency: Seconds each request takes.
+            jitter: Maximum extra seconds added at random to each request.
+            throttle_rate: Fraction of requests rejected with a ThrottlingException.
+            seed: Seed of the latency and throttling random generator.
+        """
+        self.resources_per_call = resources_per_call
+        self.page_size = page_size
+        self.accounts = accounts
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.calls = 0
+        self.throttles = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._paginators: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        self._loader_session = botocore.session.Session()
+        self._overrides: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            ("sts", "GetCallerIdentity"): self._get_caller_identity,
+            ("sts", "AssumeRole"): self._assume_role,
+            ("organizations", "ListAccounts"): self._list_accounts,
+            ("ec2", "DescribeRegions"): self._describe_regions,
+        }
+
+    def attach(self, session: botocore.session.Session) -> botocore.session.Session:
+        """
+        Answer the calls of every client created from a botocore session.
+
+        Args:
+            session: botocore Session.
+
+        Returns:
+            The same session.
+        """
+        session.register("before-parameter-build", self._before_parameter_build)
+        session.register("before-call", self._before_call)
+        return session
+
+    @contextlib.contextmanager
+    def patch(self) -> Iterator["SyntheticAWS"]:
+        """
+        Answer the calls of every boto3 and botocore session created in the block.
+
+        boto3.Session and the credential broker both create their botocore session
+        with botocore.session.get_session, which is patched to attach this backend.
+        """
+        get_session = botocore.session.get_session
+        environment = {
+            "AWS_ACCESS_KEY_ID": "benchmark",
+            "AWS_SECRET_ACCESS_KEY": "benchmark",
+            "AWS_DEFAULT_REGION": "us-east-1",
+        }
+        with mock.patch.dict(os.environ, environment), mock.patch(
+            "botocore.session.get_session",
+            side_effect=lambda *args, **kwargs: self.attach(get_session(*args, **kwargs))
+        ):
+            yield self
+
+    def _before_parameter_build(self, params: Dict[str, Any], context: Dict[str, Any], **kwargs: Any) -> None:
+        """
+        Keep the call's parameters, which "before-call" only sees serialized.
+        """
+        context["synthetic_params"] = dict(params)
+
+    def _before_call(self, model: Any, context: Dict[str, Any], **kwargs: Any) -> Tuple[AWSResponse, Dict[str, Any]]:
+        """
+        Answer a call with a generated response or a throttling error.
+        """
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            throttled = self._random.random() < self.throttle_rate
+            if throttled:
+                self.throttles += 1
+
+        if delay:
+            time.sleep(delay)
+
+        if throttled:
+            parsed = {
+                "Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"},
+                "ResponseMetadata": {"HTTPStatusCode": 400, "RetryAttempts": 0},
+            }
+            return self._response(400, parsed), parsed
+
+        service = model.service_model.service_name
+        params = context.get("synthetic_params", {})
+        override = self._overrides.get((service, model.name))
+        if override is not None:
+            parsed = override(params)
+        else:
+            parsed = self._generate(service, model, params)
+
+        parsed["ResponseMetadata"] = {"HTTPStatusCode": 200, "RetryAttempts": 0}
+        return self._response(200, parsed), parsed
+
+    def _generate(self, service: str, model: Any, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate a page of resources for an operation.
+        """
+        paginator = self._get_paginator(service, model.name)
+        if paginator is None:
+            list_member = next(
+                (name for name, shape in model.output_shape.members.items() if shape.type_name == "list"),
+                None
+            ) if model.output_shape is not None else None
+            if list_member is None:
+                return {}
+            return {list_member: self._resources(service, model.name, 0, self.resources_per_call)}
+
+        input_token = paginator["input_token"]
+        start = int(params.get(input_token) or 0)
+        limit = int(params.get(paginator["limit_key"]) or self.page_size) if paginator["limit_key"] else self.page_size
+        end = min(start + limit, self.resources_per_call)
+
+        parsed: Dict[str, Any] = {}
+        _set_path(parsed, paginator["result_key"], self._resources(service, model.name, start, end))
+        if end < self.resources_per_call and paginator["output_token"]:
+            _set_path(parsed, paginator["output_token"], str(end))
+            if paginator["more_results"]:
+                _set_path(parsed, paginator["more_results"], True)
+        return parsed
+
+    def _get_paginator(self, service: str, operation: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the input token, output token, limit key and result key of a paginated
+        operation, or None if it is not paginated or its tokens are expressions.
+        """
+        key = (service, operation)
+        with self._lock:
+            if key in self._paginators:
+                return self._paginators[key]
+
+        try:
+            config = self._loader_session.get_paginator_model(service).get_paginator(operation)
+        except Exception:
+            config = None
+
+        paginator = None
+        if config is not None:
+            first = lambda value: value[0] if isinstance(value, list) else value
+            tokens = [first(config.get("input_token")), first(config.get("output_token")), first(config.get("result_key"))]
+            if all(token and token.replace(".", "").isalnum() for token in tokens):
+                paginator = {
+                    "input_token": tokens[0],
+                    "output_token": tokens[1],
+                    "result_key": tokens[2],
+                    "limit_key": config.get("limit_key"),
+                    "more_results": config.get("more_results"),
+                }
+
+        with self._lock:
+            self._paginators[key] = paginator
+        return paginator
+
+    def _resources(self, service: str, operation: str, start: int, end: int) -> List[Dict[str, Any]]:
+        """
+        Generate resources with an ID, ARN, name, tags and creation date.
+        """
+        return [
+            {
+                "Id": f"{service}-{index:06d}",
+                "Arn": f"arn:aws:{service}:us-east-1:{MANAGEMENT_ACCOUNT_ID}:{operation.lower()}/{index}",
+                "Name": f"{operation}-{index}",
+                "Tags": [{"Key": "Environment", "Value": "benchmark"}],
+                "CreatedAt": "2024-01-01T00:00:00Z",
+            }
+            for index in range(start, end)
+        ]
+
+    def _get_caller_identity(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "Account": MANAGEMENT_ACCOUNT_ID,
+            "Arn": f"arn:aws:iam::{MANAGEMENT_ACCOUNT_ID}:user/benchmark",
+            "UserId": "AIDABENCHMARK",
+        }
+
+    def _assume_role(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "Credentials": {
+                "AccessKeyId": f"ASIA{params['RoleArn'].split(':')[4]}",
+                "SecretAccessKey": "benchmark",
+                "SessionToken": "benchmark",
+                "Expiration": datetime.now(timezone.utc) + timedelta(hours=1),
+            }
+        }
+
+    def _list_accounts(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "Accounts": [
+                {
+                    "Id": f"{index + 1:012d}",
+                    "Name": f"Account{index + 1}",
+                    "Email": f"account{index + 1}@example.com",
+                    "Status": "ACTIVE",
+                }
+                for index in range(self.accounts)
+            ]
+        }
+
+    def _describe_regions(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        regions = botocore.session.Session().get_available_regions("ec2")
+        return {"Regions": [{"RegionName": region, "OptInStatus": "opt-in-not-required"} for region in regions]}
+
+    def _response(self, status_code: int, parsed: Dict[str, Any]) -> AWSResponse:
+        """
+        Build the HTTP response of a call, sized like its JSON body.
+        """
+        length = len(json.dumps(parsed, default=str))
+        return AWSResponse("https://synthetic.amazonaws.com/", status_code, {"content-length": str(length)}, None)
+
+
+class ResourceSampler:
+    """
+    Background sampler of the process's resident memory and thread count.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Initialize resource sampler.
+
+        Args:
+            interval: Seconds between samples.
+        """
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_threads = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "ResourceSampler":
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="benchmark-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        # The sampler thread itself is not counted
+        self.peak_threads = max(self.peak_threads, threading.active_count() - 1)
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+
+class BenchmarkResult:
+    """
+    Measurements of one benchmark run.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        wall_time: float,
+        calls: int,
+        throttles: int,
+        peak_rss: int,
+        peak_threads: int
+    ):
+        """
+        Initialize benchmark result.
+
+        Args:
+            name: Benchmark name.
+            wall_time: Seconds the run took.
+            calls: API calls answered by the backend, including throttled ones.
+            throttles: Calls rejected with a throttling error.
+            peak_rss: Peak resident memory of the process during the run, in bytes.
+            peak_threads: Peak number of threads during the run.
+        """
+        self.name = name
+        self.wall_time = wall_time
+        self.calls = calls
+        self.throttles = throttles
+        self.peak_rss = peak_rss
+        self.peak_threads = peak_threads
+
+    @property
+    def calls_per_second(self) -> float:
+        """
+        Throughput of the run.
+        """
+        return self.calls / self.wall_time if self.wall_time else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to dictionary.
+
+        Returns:
+            Dictionary representation of the benchmark result.
+        """
+        return {
+            "name": self.name,
+            "wall_time": self.wall_time,
+            "calls": self.calls,
+            "throttles": self.throttles,
+            "calls_per_second": self.calls_per_second,
+            "peak_rss_mb": self.peak_rss / 2 ** 20,
+            "peak_threads": self.peak_threads,
+        }
+
+
+def run_benchmark(name: str, backend: SyntheticAWS, target: Callable[[], Any]) -> Tuple[BenchmarkResult, Any]:
+    """
+    Run a scan against a synthetic backend and measure it.
+
+    Args:
+        name: Benchmark name.
+        backend: Synthetic backend answering the scan's calls.
+        target: Function running the scan.
+
+    Returns:
+        The measurements and the value returned by target.
+    """
+    calls, throttles = backend.calls, backend.throttles
+
+    with backend.patch(), ResourceSampler() as sampler:
+        start = time.perf_counter()
+        value = target()
+        wall_time = time.perf_counter() - start
+
+    result = BenchmarkResult(
+        name=name,
+        wall_time=wall_time,
+        calls=backend.calls - calls,
+        throttles=backend.throttles - throttles,
+        peak_rss=sampler.peak_rss,
+        peak_threads=sampler.peak_threads
+    )
+    return result, value
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """
+    Format benchmark results as a text table.
+
+    Args:
+        results: Benchmark results.
+
+    Returns:
+        Table with one line per benchmark.
+    """
+    columns = ["name", "wall_time", "calls", "throttles", "calls_per_second", "peak_rss_mb", "peak_threads"]
+    table = [columns] + [
+        [f"{value:.2f}" if isinstance(value, float) else str(value) for value in (row[column] for column in columns)]
+        for row in (result.to_dict() for result in results)
+    ]
+    widths = [max(len(line[index]) for line in table) for index in range(len(columns))]
+    return "\n".join("  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip() for line in table)
+
+
+def current_rss() -> int:
+    """
+    Get the resident memory of the process in bytes.
+
+    Reads /proc where available. Elsewhere, falls back to the process's peak
+    resident memory, which never decreases.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def _set_path(target: Dict[str, Any], path: str, value: Any) -> None:
+    """
+    Set a value at a dotted path, creating the intermediate dictionaries.
+    """
+    *parents, key = path.split(".")
+    for parent in parents:
+        target = target.setdefault(parent, {})
+    target[key] = value
@@ -0,0 +1,190 @@
+"""
+Benchmarks of the inventory scanners against a synthetic AWS backend.
+
+Run from the aws-auto-inventory directory, for example:
+
+    python -m tests.benchmarks.run_benchmarks --accounts 20 --resources 5000 \\
+        --latency 0.02 --throttle-rate 0.05
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import tempfile
+from typing import Any, Callable, Dict, List
+
+from aws_auto_inventory.config.models import AWSConfig, Config, Inventory, Sheet
+from aws_auto_inventory.core.async_engine import AsyncScanEngine
+from aws_auto_inventory.core.region import RegionScanner
+from aws_auto_inventory.core.scan_engine import ScanEngine
+from aws_auto_inventory.core.scheduler import PriorityScheduler
+
+from .harness import BenchmarkResult, SyntheticAWS, format_results, run_benchmark
+
+# Operations scanned by every benchmark: a mix of paginated and single-call APIs
+DEFAULT_SHEETS = [
+    {"service": "ec2", "function": "describe_instances", "result_key": "Reservations"},
+    {"service": "ec2", "function": "describe_volumes", "result_key": "Volumes"},
+    {"service": "ec2", "function": "describe_security_groups", "result_key": "SecurityGroups"},
+    {"service": "s3", "function": "list_buckets", "result_key": "Buckets"},
+    {"service": "lambda", "function": "list_functions", "result_key": "Functions"},
+    {"service": "rds", "function": "describe_db_instances", "result_key": "DBInstances"},
+    {"service": "cloudtrail", "function": "lookup_events", "result_key": "Events"},
+    {"service": "config", "function": "describe_config_rules", "result_key": "ConfigRules"},
+    {"service": "iam", "function": "list_users", "result_key": "Users"},
+]
+
+# Scan targets, each taking the parsed arguments and returning a function running the scan
+TARGETS: Dict[str, Callable[[argparse.Namespace], Callable[[], Any]]] = {}
+
+
+def target(name: str) -> Callable:
+    """
+    Register a scan target.
+    """
+    def register(function: Callable) -> Callable:
+        TARGETS[name] = function
+        return function
+    return register
+
+
+def build_config(args: argparse.Namespace, organization: bool = False) -> Config:
+    """
+    Build an inventory scanning the default sheets in the benchmark's regions.
+    """
+    return Config(inventories=[
+        Inventory(
+            name="benchmark",
+            aws=AWSConfig(region=args.regions, organization=organization),
+            sheets=[Sheet(name=f"{sheet['service']}-{sheet['function']}", **sheet) for sheet in DEFAULT_SHEETS]
+        )
+    ])
+
+
+def engine_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Options shared by the scan engines.
+    """
+    return dict(
+        max_retries=args.max_retries,
+        retry_delay=args.retry_delay,
+        max_workers_accounts=args.max_accounts,
+        max_rate=1e9
+    )
+
+
+@target("threads")
+def threads_target(args: argparse.Namespace) -> Callable[[], Any]:
+    engine = ScanEngine(**engine_options(args))
+    return lambda: engine.scan(build_config(args, organization=args.accounts > 0))
+
+
+@target("async")
+def async_target(args: argparse.Namespace) -> Callable[[], Any]:
+    engine = AsyncScanEngine(max_concurrency=args.max_concurrency, **engine_options(args))
+    return lambda: engine.scan(build_config(args, organization=args.accounts > 0))
+
+
+@target("priority")
+def priority_target(args: argparse.Namespace) -> Callable[[], Any]:
+    def scan() -> Any:
+        scheduler = PriorityScheduler(max_workers=args.max_concurrency)
+        try:
+            engine = ScanEngine(scheduler=scheduler, **engine_options(args))
+            return engine.scan(build_config(args, organization=args.accounts > 0))
+        finally:
+            scheduler.shutdown()
+    return scan
+
+
+@target("region")
+def region_target(args: argparse.Namespace) -> Callable[[], Any]:
+    import boto3
+
+    inventory = build_config(args).inventories[0]
+    scanner = RegionScanner(max_retries=args.max_retries, retry_delay=args.retry_delay)
+    return lambda: scanner.scan_region(inventory, boto3.Session(), args.regions[0])
+
+
+@target("legacy")
+def legacy_target(args: argparse.Namespace) -> Callable[[], Any]:
+    import boto3
+    import scan
+
+    def run() -> None:
+        with tempfile.TemporaryDirectory() as output_dir:
+            scan_path = os.path.join(output_dir, "scan.json")
+            with open(scan_path, "w") as f:
+                json.dump(DEFAULT_SHEETS, f)
+            scan.main(
+                scan_path,
+                args.regions,
+                output_dir,
+                "WARNING",
+                args.max_retries,
+                args.retry_delay,
+                None,
+                None,
+                session=boto3.Session()
+            )
+    return run
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """
+    Parse command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the inventory scanners offline")
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument("--regions", nargs="+", default=["us-east-1", "us-west-2", "eu-west-1", "ap-southeast-2"])
+    parser.add_argument("--accounts", type=int, default=0,
+                        help="Member accounts for organization scans (default: 0, single account)")
+    parser.add_argument("--resources", type=int, default=1000, help="Resources returned by each operation")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.005, help="Maximum extra seconds per request")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests throttled")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--retry-delay", type=float, default=0.01)
+    parser.add_argument("--max-accounts", type=int, default=None)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> List[BenchmarkResult]:
+    """
+    Run the selected benchmarks and print their results.
+    """
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.ERROR)
+
+    results = []
+    for name in args.targets:
+        if name == "legacy" and args.accounts:
+            continue
+        backend = SyntheticAWS(
+            resources_per_call=args.resources,
+            page_size=args.page_size,
+            accounts=args.accounts,
+            latency=args.latency,
+            jitter=args.jitter,
+            throttle_rate=args.throttle_rate,
+            seed=args.seed
+        )
+        with backend.patch():
+            run = TARGETS[name](args)
+        result, _ = run_benchmark(name, backend, run)
+        results.append(result)
+
+    if args.json:
+        print(json.dumps([result.to_dict() for result in results], indent=2))
+    else:
+        print(format_results(results))
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
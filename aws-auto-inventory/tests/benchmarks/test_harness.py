@@ -0,0 +1,65 @@
+"""
+Tests for the offline benchmark harness.
+"""
+import boto3
+import pytest
+
+from aws_auto_inventory.config.models import AWSConfig, Config, Inventory, Sheet
+from aws_auto_inventory.core.region import RegionScanner
+from aws_auto_inventory.core.scan_engine import ScanEngine
+
+from .harness import SyntheticAWS, format_results, run_benchmark
+
+
+@pytest.fixture
+def inventory():
+    return Inventory(
+        name="benchmark",
+        aws=AWSConfig(region=["us-east-1"]),
+        sheets=[
+            Sheet(name="Volumes", service="ec2", function="describe_volumes", result_key="Volumes"),
+            Sheet(name="Zones", service="ec2", function="describe_availability_zones", result_key="AvailabilityZones"),
+        ]
+    )
+
+
+def test_synthetic_backend_paginates_resources(inventory):
+    backend = SyntheticAWS(resources_per_call=250, page_size=100)
+    scanner = RegionScanner(max_retries=1, retry_delay=0)
+
+    result, region_result = run_benchmark(
+        "region", backend, lambda: scanner.scan_region(inventory, boto3.Session(), "us-east-1")
+    )
+
+    results = {r.function: r for r in region_result.services}
+    assert len(results["describe_volumes"].result) == 250
+    assert len(results["describe_availability_zones"].result) == 250
+    # Three pages of volumes and a single call for the unpaginated zones
+    assert result.calls == 4
+    assert result.wall_time > 0
+    assert result.peak_rss > 0
+    assert result.peak_threads >= 1
+
+
+def test_throttled_calls_are_retried(inventory):
+    backend = SyntheticAWS(resources_per_call=10, throttle_rate=0.5, seed=1)
+    engine = ScanEngine(max_retries=10, retry_delay=0, max_rate=1e9)
+
+    result, scan_results = run_benchmark("threads", backend, lambda: engine.scan(Config(inventories=[inventory])))
+
+    service_results = [r for region in scan_results[0].region_results for r in region.services]
+    assert all(r.success for r in service_results)
+    assert result.throttles > 0
+    assert result.calls == 2 + result.throttles
+
+
+def test_format_results(inventory):
+    backend = SyntheticAWS(resources_per_call=1)
+    result, _ = run_benchmark("noop", backend, lambda: None)
+
+    table = format_results([result])
+
+    assert table.splitlines()[0].split() == [
+        "name", "wall_time", "calls", "throttles", "calls_per_second", "peak_rss_mb", "peak_threads"
+    ]
+    assert table.splitlines()[1].startswith("noop")
@@ -1,6 +1,6 @@
 import pytest
 import botocore
-from scan import api_call_with_retry
+from scan import api_call_with_retry, paginated_call_with_retry
 
 def test_api_call_success(mocker):
     """Test successful API call."""
@@ -72,4 +72,29 @@ def test_api_call_non_throttling_error(mocker):
     mock_function.side_effect = error
     
     with pytest.raises(botocore.exceptions.ClientError):
-        api_call_with_retry(mock_client, "some_function", None, 3, 1)()
\ No newline at end of file
+        api_call_with_retry(mock_client, "some_function", None, 3, 1)()
+
+def test_paginated_call_throttling_retry(mocker):
+    """Test that a throttled page restarts the pagination."""
+    mock_client = mocker.MagicMock()
+    mock_paginator = mocker.MagicMock()
+    mock_client.get_paginator.return_value = mock_paginator
+    mocker.patch('scan.time.sleep')
+    
+    throttling_error = botocore.exceptions.ClientError(
+        {"Error": {"Code": "Throttling"}}, "operation_name"
+    )
+    
+    def throttled_pages():
+        yield {"Items": [1, 2]}
+        raise throttling_error
+    
+    mock_paginator.paginate.side_effect = [
+        throttled_pages(),
+        [{"Items": [1, 2]}, {"Items": [3]}]
+    ]
+    
+    result = paginated_call_with_retry(mock_client, "list_items", None, "Items", 3, 1)()
+    
+    assert mock_paginator.paginate.call_count == 2
+    assert result == [1, 2, 3]
@@ -0,0 +1,106 @@
+"""
+Tests for the configuration validator.
+"""
+import boto3
+import pytest
+
+from aws_auto_inventory.config.models import AWSConfig, Config, DependsOn, Inventory, Sheet
+from aws_auto_inventory.config.validator import ConfigValidator
+
+
+def validate(*sheets, profile=None):
+    config = Config(inventories=[Inventory(name="inv", aws=AWSConfig(profile=profile), sheets=list(sheets))])
+    return ConfigValidator().validate(config)
+
+
+def test_valid_sheets():
+    """Test that valid sheets pass, with and without parameters."""
+    assert validate(
+        Sheet(name="Instances", service="ec2", function="describe_instances"),
+        Sheet(name="Images", service="ec2", function="describe_images", parameters={"Owners": ["self"]}),
+        Sheet(name="Buckets", service="s3", function="list_buckets"),
+    ) == []
+
+
+def test_invalid_service_and_function():
+    """Test unknown services and functions, and write operations."""
+    assert validate(
+        Sheet(name="A", service="nosuchservice", function="list_things"),
+        Sheet(name="B", service="ec2", function="describe_nothing"),
+        Sheet(name="C", service="ec2", function="get_paginator"),
+        Sheet(name="D", service="ec2", function="run_instances"),
+    )[:4] == [
+        "Inventory 'inv': Sheet 'A': Invalid AWS service: nosuchservice",
+        "Inventory 'inv': Sheet 'B': Function 'describe_nothing' does not exist for service 'ec2'",
+        "Inventory 'inv': Sheet 'C': Function 'get_paginator' does not exist for service 'ec2'",
+        "Inventory 'inv': Sheet 'D': Function 'run_instances' is not a read-only operation",
+    ]
+
+
+def test_invalid_parameters():
+    """Test parameters checked against the operation's input shape."""
+    errors = validate(
+        Sheet(name="A", service="support", function="describe_trusted_advisor_checks",
+              parameters={"Language": "en"}),
+        Sheet(name="B", service="ec2", function="describe_instance_attribute"),
+        Sheet(name="C", service="ec2", function="describe_images", parameters={"Owners": "self"}),
+    )
+
+    assert errors[:2] == [
+        "Inventory 'inv': Sheet 'A': Invalid parameters: Missing required parameter in input: \"language\"",
+        "Inventory 'inv': Sheet 'A': Invalid parameters: Unknown parameter in input: \"Language\", "
+        "must be one of: language",
+    ]
+    assert errors[2:4] == [
+        "Inventory 'inv': Sheet 'B': Invalid parameters: Missing required parameter in input: \"InstanceId\"",
+        "Inventory 'inv': Sheet 'B': Invalid parameters: Missing required parameter in input: \"Attribute\"",
+    ]
+    assert errors[4].startswith("Inventory 'inv': Sheet 'C': Invalid parameters: Invalid type for parameter Owners")
+
+
+def test_depends_on():
+    """Test that the depends_on parameter is not required and dependencies are checked."""
+    buckets = Sheet(name="Buckets", service="s3", function="list_buckets", result_key="Buckets")
+    assert validate(
+        buckets,
+        Sheet(name="Encryption", service="s3", function="get_bucket_encryption",
+              depends_on=DependsOn(sheet="Buckets", parameter="Bucket", value_key="Name")),
+    ) == []
+
+    assert validate(
+        buckets,
+        Sheet(name="A", service="s3", function="get_bucket_encryption",
+              depends_on=DependsOn(sheet="Missing", parameter="Bucket", value_key="Name")),
+        Sheet(name="B", service="s3", function="get_bucket_encryption",
+              depends_on=DependsOn(sheet="Buckets", parameter="Bucket", value_key="Name", batch_size=0)),
+        Sheet(name="C", service="s3", function="get_bucket_encryption",
+              depends_on=DependsOn(sheet="Buckets", parameter="BucketName", value_key="Name")),
+        Sheet(name="D", service="iam", function="get_user",
+              depends_on=DependsOn(sheet="Buckets", parameter="UserName", value_key="Name")),
+        Sheet(name="E", service="s3", function="list_objects_v2",
+              depends_on=DependsOn(sheet="F", parameter="Bucket", value_key="Name")),
+        Sheet(name="F", service="s3", function="list_objects_v2",
+              depends_on=DependsOn(sheet="E", parameter="Bucket", value_key="Name")),
+    ) == [
+        "Inventory 'inv': Sheet 'B': depends_on batch_size must be positive",
+        "Inventory 'inv': Sheet 'C': Function 'get_bucket_encryption' has no parameter 'BucketName'",
+        "Inventory 'inv': Sheet 'C': Invalid parameters: Missing required parameter in input: \"Bucket\"",
+        "Inventory 'inv': Sheet 'A': Depends on unknown sheet 'Missing'",
+        "Inventory 'inv': Sheet 'D': Depends on sheet 'Buckets', which is not scanned in the same scope",
+        "Inventory 'inv': Sheet 'E': Dependency cycle through sheet 'F'",
+        "Inventory 'inv': Sheet 'F': Dependency cycle through sheet 'E'",
+    ]
+
+
+def test_validation_needs_no_clients_or_credentials(monkeypatch):
+    """Test that validation creates no client and does not check credentials."""
+    def no_client(*args, **kwargs):
+        raise AssertionError("client created")
+
+    monkeypatch.setattr(boto3.Session, "client", no_client)
+    monkeypatch.setattr("botocore.session.Session.create_client", no_client)
+
+    assert validate(Sheet(name="Users", service="iam", function="list_users")) == []
+    assert validate(Sheet(name="Users", service="iam", function="list_users"), profile="no-such-profile") == [
+        "Inventory 'inv': Invalid AWS profile 'no-such-profile': The config profile (no-such-profile) could not be found"
+    ]
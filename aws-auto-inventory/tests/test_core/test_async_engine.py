@@ -0,0 +1,103 @@
+"""
+Tests for the asyncio scan engine.
+"""
+import threading
+
+import pytest
+
+from aws_auto_inventory.config.models import Config, Inventory, Sheet, AWSConfig
+from aws_auto_inventory.core.async_engine import AsyncScanEngine
+from aws_auto_inventory.core.service import ServiceResult
+
+
+@pytest.fixture
+def sheets():
+    """Return three sheets."""
+    return [
+        Sheet(name="S3", service="s3", function="list_buckets"),
+        Sheet(name="EC2", service="ec2", function="describe_instances"),
+        Sheet(name="IAM", service="iam", function="list_users"),
+    ]
+
+
+def test_scan_account_returns_region_results(mocker, sheets):
+    """Test that a single account scan returns one RegionResult per region."""
+    mocker.patch('aws_auto_inventory.core.async_engine.boto3.Session')
+    config = Config(inventories=[
+        Inventory(name="inv", aws=AWSConfig(region=["us-east-1", "eu-west-1"]), sheets=sheets)
+    ])
+
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    def scan_service(sheet, session, region):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        threading.Event().wait(0.02)
+        with lock:
+            in_flight[0] -= 1
+        if sheet.service == "iam":
+            raise RuntimeError("boom")
+        return ServiceResult(sheet.service, sheet.function, region, result=[region])
+
+    engine = AsyncScanEngine(max_concurrency=2)
+    mocker.patch.object(engine.region_scanner.service_scanner, 'scan_service', side_effect=scan_service)
+
+    results = engine.scan(config)
+
+    assert len(results) == 1
+    assert not results[0].is_organization_scan
+    regions = results[0].region_results
+    assert [region.region for region in regions] == ["us-east-1", "eu-west-1", "global"]
+    for region in regions[:2]:
+        assert [service.service for service in region.services] == ["s3", "ec2"]
+        assert region.services[0].result == [region.region]
+
+    # IAM is global, so it is scanned once and its failure reported once
+    assert [service.service for service in regions[2].services] == ["iam"]
+    assert not regions[2].services[0].success
+    assert "boom" in regions[2].services[0].error
+    assert peak[0] <= 2
+
+
+def test_scan_organization_returns_account_results(mocker, sheets):
+    """Test that organization scans return one AccountResult per account."""
+    mocker.patch('aws_auto_inventory.core.async_engine.boto3.Session')
+    config = Config(inventories=[
+        Inventory(
+            name="org",
+            aws=AWSConfig(region=["us-east-1"], organization=True),
+            sheets=sheets[:1]
+        )
+    ])
+    accounts = [
+        {'id': '111111111111', 'name': 'Account1', 'email': 'a1@example.com'},
+        {'id': '222222222222', 'name': 'Account2', 'email': 'a2@example.com'}
+    ]
+
+    engine = AsyncScanEngine(max_concurrency=4)
+    mocker.patch.object(engine.organization_scanner, 'get_organization_accounts', return_value=accounts)
+    mocker.patch.object(
+        engine.organization_scanner,
+        'assume_role',
+        side_effect=lambda session, account_id, role_name, sts_client=None: (
+            None if account_id == '222222222222' else mocker.MagicMock()
+        )
+    )
+    mocker.patch.object(
+        engine.region_scanner.service_scanner,
+        'scan_service',
+        side_effect=lambda sheet, session, region: ServiceResult(sheet.service, sheet.function, region, [])
+    )
+
+    result = engine.scan(config)[0]
+
+    assert result.is_organization_scan
+    accounts_by_id = {account.account_id: account for account in result.account_results}
+    assert accounts_by_id['111111111111'].success
+    assert accounts_by_id['111111111111'].regions[0].region == "us-east-1"
+    assert not accounts_by_id['222222222222'].success
+    assert "Failed to assume role" in accounts_by_id['222222222222'].error
+    assert result.to_dict()["organization_results"]
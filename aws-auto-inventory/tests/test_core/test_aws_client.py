@@ -0,0 +1,71 @@
+"""
+Tests for the AWS client.
+"""
+import pytest
+
+from aws_auto_inventory.core.aws_client import AWSClient
+
+
+@pytest.fixture
+def bucket_with_objects(aws_credentials, mock_boto):
+    """Create an S3 bucket holding 25 objects."""
+    s3_client = mock_boto.client('s3', region_name='us-east-1')
+    s3_client.create_bucket(Bucket='test-bucket')
+    for i in range(25):
+        s3_client.put_object(Bucket='test-bucket', Key=f'object-{i:02d}', Body=b'data')
+    return mock_boto
+
+
+def test_call_api_follows_pagination(bucket_with_objects):
+    """Test that results from every page are returned."""
+    aws_client = AWSClient(bucket_with_objects.Session())
+
+    result = aws_client.call_api(
+        's3', 'list_objects_v2', 'us-east-1', {'Bucket': 'test-bucket'}, 'Contents', page_size=10
+    )
+
+    assert len(result) == 25
+
+
+def test_call_api_applies_jq_per_page(bucket_with_objects):
+    """Test that jq expressions are applied to every page."""
+    aws_client = AWSClient(bucket_with_objects.Session())
+
+    result = aws_client.call_api(
+        's3', 'list_objects_v2', 'us-east-1', {'Bucket': 'test-bucket'}, '.Contents[].Key', page_size=10
+    )
+
+    assert result == [f'object-{i:02d}' for i in range(25)]
+
+
+def test_call_api_max_items(bucket_with_objects):
+    """Test that max_items limits the number of items returned."""
+    aws_client = AWSClient(bucket_with_objects.Session())
+
+    result = aws_client.call_api(
+        's3', 'list_objects_v2', 'us-east-1', {'Bucket': 'test-bucket'}, 'Contents',
+        page_size=10, max_items=15
+    )
+
+    assert len(result) == 15
+
+
+def test_call_api_merges_pages_without_result_key(bucket_with_objects):
+    """Test that pages are merged into one response when no result_key is given."""
+    aws_client = AWSClient(bucket_with_objects.Session())
+
+    result = aws_client.call_api(
+        's3', 'list_objects_v2', 'us-east-1', {'Bucket': 'test-bucket'}, page_size=10
+    )
+
+    assert len(result['Contents']) == 25
+    assert 'ResponseMetadata' not in result
+
+
+def test_call_api_unpaginated_operation(aws_credentials, mock_boto):
+    """Test that operations without a paginator are called once."""
+    aws_client = AWSClient(mock_boto.Session())
+
+    result = aws_client.call_api('sts', 'get_caller_identity', 'us-east-1', result_key='Account')
+
+    assert result == '123456789012'
@@ -0,0 +1,132 @@
+"""
+Tests for the checkpoint journal.
+"""
+import pytest
+
+from aws_auto_inventory.config.models import Inventory, Sheet, AWSConfig
+from aws_auto_inventory.core.checkpoint import CheckpointJournal
+from aws_auto_inventory.core.incremental import DeltaTracker
+from aws_auto_inventory.core.organization import AccountResult
+from aws_auto_inventory.core.region import RegionResult, RegionScanner
+from aws_auto_inventory.core.scan_engine import ScanResult
+from aws_auto_inventory.core.service import ServiceResult
+
+
+@pytest.fixture
+def inventory():
+    """Return an inventory with three regional sheets."""
+    return Inventory(
+        name="inv",
+        aws=AWSConfig(region=["us-east-1"]),
+        sheets=[
+            Sheet(name="VPCs", service="ec2", function="describe_vpcs"),
+            Sheet(name="Volumes", service="ec2", function="describe_volumes"),
+            Sheet(name="Buckets", service="s3", function="list_buckets", scope="regional"),
+        ]
+    )
+
+
+def test_journal_round_trip(tmp_path, inventory):
+    """Test that completed units are replayed and failed units are not journaled."""
+    account = {"id": "111111111111", "name": "Account1"}
+    vpcs, volumes = inventory.sheets[:2]
+
+    journal = CheckpointJournal(str(tmp_path))
+    journal.record(inventory, vpcs, ServiceResult("ec2", "describe_vpcs", "us-east-1", [{"VpcId": "vpc-1"}]), account)
+    journal.record(
+        inventory, volumes,
+        ServiceResult("ec2", "describe_volumes", "us-east-1", None, success=False, error="throttled"),
+        account
+    )
+    journal.close()
+
+    # Simulate a crash in the middle of a write
+    with open(journal.path, "ab") as f:
+        f.write(b'{"key": "inv/1111')
+
+    resumed = CheckpointJournal(str(tmp_path), run_id=journal.run_id)
+    assert len(resumed) == 1
+    assert resumed.get(inventory, vpcs, "us-east-1", account).result == [{"VpcId": "vpc-1"}]
+    assert resumed.get(inventory, vpcs, "us-east-1") is None
+    assert resumed.get(inventory, volumes, "us-east-1", account) is None
+
+    # New entries start on a line of their own after the truncated one
+    resumed.record(inventory, volumes, ServiceResult("ec2", "describe_volumes", "us-east-1", []), account)
+    resumed.close()
+    assert len(CheckpointJournal(str(tmp_path), run_id=journal.run_id)) == 2
+
+
+def test_resume_unknown_run(tmp_path):
+    """Test that resuming a run without a journal fails."""
+    with pytest.raises(ValueError):
+        CheckpointJournal(str(tmp_path), run_id="missing")
+
+
+def test_resume_scans_only_missing_units(mocker, tmp_path, inventory):
+    """Test that a resumed run only scans the units the interrupted run did not complete."""
+    def interrupted(sheet, session, region):
+        if sheet.service == "s3":
+            raise RuntimeError("connection reset")
+        return ServiceResult(sheet.service, sheet.function, region, [sheet.function])
+
+    journal = CheckpointJournal(str(tmp_path))
+    scanner = RegionScanner(checkpoint=journal)
+    mocker.patch.object(scanner.service_scanner, 'scan_service', side_effect=interrupted)
+    scanner.scan_region(inventory, mocker.MagicMock(), "us-east-1")
+    journal.close()
+
+    resumed = CheckpointJournal(str(tmp_path), run_id=journal.run_id)
+    scanner = RegionScanner(checkpoint=resumed)
+    scan_service = mocker.patch.object(
+        scanner.service_scanner,
+        'scan_service',
+        side_effect=lambda sheet, session, region: ServiceResult(sheet.service, sheet.function, region, [])
+    )
+    result = scanner.scan_region(inventory, mocker.MagicMock(), "us-east-1")
+
+    assert [call.args[0].service for call in scan_service.call_args_list] == ["s3"]
+    results = {service.function: service.result for service in result.services}
+    assert results == {"describe_vpcs": ["describe_vpcs"], "describe_volumes": ["describe_volumes"], "list_buckets": []}
+    assert sorted(service.sheet for service in result.services) == ["Buckets", "VPCs", "Volumes"]
+
+
+def test_resume_restores_fingerprints(mocker, tmp_path, inventory):
+    """Test that replayed units keep the fingerprints the interrupted run never saved."""
+    inventory.sheets = inventory.sheets[:1]
+    state_path = str(tmp_path / "state.json")
+
+    journal = CheckpointJournal(str(tmp_path))
+    scanner = RegionScanner(checkpoint=journal, delta_tracker=DeltaTracker(state_path))
+    mocker.patch.object(
+        scanner.service_scanner,
+        'scan_service',
+        return_value=ServiceResult("ec2", "describe_vpcs", "us-east-1", [{"VpcId": "vpc-1"}])
+    )
+    scanner.scan_region(inventory, mocker.MagicMock(), "us-east-1")
+    journal.close()
+
+    # The run crashed before saving the tracker; the resumed run replays the unit
+    tracker = DeltaTracker(state_path)
+    scanner = RegionScanner(checkpoint=CheckpointJournal(str(tmp_path), run_id=journal.run_id), delta_tracker=tracker)
+    scanner.scan_region(inventory, mocker.MagicMock(), "us-east-1")
+    tracker.save()
+
+    # The next run sees the resource as unchanged
+    tracker = DeltaTracker(state_path)
+    result = tracker.apply(
+        inventory, inventory.sheets[0], ServiceResult("ec2", "describe_vpcs", "us-east-1", [{"VpcId": "vpc-1"}])
+    )
+    assert result.delta["added"] == []
+    assert result.delta["unchanged"] == 1
+
+
+def test_scan_result_failures(inventory):
+    """Test that failed services, regions and accounts make a run worth resuming."""
+    ok = RegionResult("us-east-1", [ServiceResult("ec2", "describe_vpcs", "us-east-1", [])])
+    failed = RegionResult("us-east-1", [ServiceResult("ec2", "describe_vpcs", "us-east-1", None, success=False)])
+
+    assert not ScanResult("inv", region_results=[ok]).has_failures()
+    assert ScanResult("inv", region_results=[ok, failed]).has_failures()
+    assert ScanResult("inv", region_results=[RegionResult("eu-west-1", [], error="denied")]).has_failures()
+    assert ScanResult("inv", account_results=[AccountResult("1", "a", [], success=False)]).has_failures()
+    assert ScanResult("inv", account_results=[AccountResult("1", "a", [failed])]).has_failures()
@@ -0,0 +1,82 @@
+"""
+Tests for the boto3 client cache.
+"""
+import concurrent.futures
+
+import boto3
+
+from aws_auto_inventory.core.client_cache import ClientCache
+
+
+def _session(access_key='testing'):
+    return boto3.Session(
+        aws_access_key_id=access_key,
+        aws_secret_access_key='testing',
+        region_name='us-east-1'
+    )
+
+
+def test_get_client_reuses_client():
+    """Test that the same client is returned for the same session, service and region."""
+    cache = ClientCache()
+    session = _session()
+
+    client = cache.get_client(session, 's3', 'us-east-1')
+
+    assert cache.get_client(session, 's3', 'us-east-1') is client
+    assert cache.get_client(session, 's3', 'eu-west-1') is not client
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_get_client_shared_between_sessions_with_same_credentials():
+    """Test that sessions with the same credentials share clients, others do not."""
+    cache = ClientCache()
+
+    client = cache.get_client(_session('key-a'), 'ec2', 'us-east-1')
+
+    assert cache.get_client(_session('key-a'), 'ec2', 'us-east-1') is client
+    assert cache.get_client(_session('key-b'), 'ec2', 'us-east-1') is not client
+
+
+def test_get_client_evicts_least_recently_used():
+    """Test that the cache never grows beyond its maximum size."""
+    cache = ClientCache(max_size=2)
+    session = _session()
+
+    first = cache.get_client(session, 's3', 'us-east-1')
+    cache.get_client(session, 's3', 'us-west-2')
+    cache.get_client(session, 's3', 'us-east-1')
+    cache.get_client(session, 's3', 'eu-west-1')
+
+    assert len(cache) == 2
+    assert cache.get_client(session, 's3', 'us-east-1') is first
+    assert cache.misses == 3
+
+
+def test_get_client_concurrent_access():
+    """Test that concurrent callers all receive a single shared client."""
+    cache = ClientCache()
+    session = _session()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: cache.get_client(session, 'sts', 'us-east-1'), range(32)))
+
+    assert all(client is clients[0] for client in clients)
+    assert cache.misses == 1
+
+
+def test_get_client_resolves_credentials_outside_lock(mocker):
+    """Test that a slow credential refresh does not hold up lookups of other sessions."""
+    cache = ClientCache()
+    session = _session()
+    cache.get_client(session, 's3', 'us-east-1')
+
+    def get_credentials():
+        assert not cache._lock.locked()
+        return session.__class__.get_credentials(session)
+
+    mocker.patch.object(session, 'get_credentials', side_effect=get_credentials)
+
+    cache.get_client(session, 's3', 'us-east-1')
+    assert cache.hits == 1
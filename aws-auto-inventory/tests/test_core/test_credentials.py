@@ -0,0 +1,106 @@
+"""
+Tests for the STS credential broker.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from aws_auto_inventory.core.credentials import CredentialBroker
+
+
+def make_sts_client(mocker, lifetime=3600):
+    """Return an STS client mock issuing numbered credentials."""
+    sts_client = mocker.MagicMock()
+    calls = []
+
+    def assume_role(RoleArn, RoleSessionName, DurationSeconds):
+        calls.append(RoleArn)
+        if "999999999999" in RoleArn:
+            raise RuntimeError("AccessDenied")
+        return {
+            "Credentials": {
+                "AccessKeyId": f"AKIA{len(calls)}",
+                "SecretAccessKey": "secret",
+                "SessionToken": "token",
+                "Expiration": datetime.now(timezone.utc) + timedelta(seconds=lifetime),
+            }
+        }
+
+    sts_client.assume_role.side_effect = assume_role
+    return sts_client
+
+
+def test_credentials_are_reused_until_expiry(mocker):
+    """Test that valid credentials are reused and expiring ones are replaced."""
+    sts_client = make_sts_client(mocker)
+    broker = CredentialBroker()
+
+    first = broker.get_session(sts_client, "111111111111", "Role")
+    second = broker.get_session(sts_client, "111111111111", "Role")
+
+    assert sts_client.assume_role.call_count == 1
+    assert first.get_credentials().access_key == second.get_credentials().access_key == "AKIA1"
+
+    # Credentials inside the refresh margin are not reused
+    expiring = make_sts_client(mocker, lifetime=600)
+    broker = CredentialBroker(refresh_margin=900)
+    broker.get_credentials(expiring, "arn:aws:iam::111111111111:role/Role")
+    broker.get_credentials(expiring, "arn:aws:iam::111111111111:role/Role")
+    assert expiring.assume_role.call_count == 2
+
+
+def test_sessions_refresh_mid_scan(mocker):
+    """Test that sessions assume the role again once their credentials expire."""
+    sts_client = make_sts_client(mocker, lifetime=60)
+    broker = CredentialBroker(refresh_margin=0)
+
+    credentials = broker.get_session(sts_client, "111111111111", "Role").get_credentials()
+    assert credentials.get_frozen_credentials().access_key == "AKIA2"
+    assert sts_client.assume_role.call_count == 2
+
+
+def test_prefetch_reports_failures_once(mocker):
+    """Test that roles are assumed concurrently and failures are not retried."""
+    sts_client = make_sts_client(mocker)
+    broker = CredentialBroker()
+
+    errors = broker.prefetch(sts_client, ["111111111111", "222222222222", "999999999999"], "Role", 3)
+
+    assert list(errors) == ["999999999999"]
+    broker.get_session(sts_client, "222222222222", "Role")
+    with pytest.raises(RuntimeError):
+        broker.get_session(sts_client, "999999999999", "Role")
+    assert sts_client.assume_role.call_count == 3
+
+
+def test_encrypted_cache_skips_sts(mocker, tmp_path):
+    """Test that credentials cached on disk are encrypted and reused by the next run."""
+    fernet = pytest.importorskip("cryptography.fernet")
+    key = fernet.Fernet.generate_key()
+    cache_path = str(tmp_path / "credentials.cache")
+
+    broker = CredentialBroker(cache_path=cache_path, cache_key=key)
+    broker.get_session(make_sts_client(mocker), "111111111111", "Role")
+    broker.save()
+
+    with open(cache_path, "rb") as f:
+        assert b"secret" not in f.read()
+
+    sts_client = make_sts_client(mocker)
+    session = CredentialBroker(cache_path=cache_path, cache_key=key).get_session(
+        sts_client, "111111111111", "Role"
+    )
+    assert session.get_credentials().access_key == "AKIA1"
+    sts_client.assume_role.assert_not_called()
+
+    # A different key cannot read the cache and falls back to STS
+    CredentialBroker(cache_path=cache_path, cache_key=fernet.Fernet.generate_key()).get_session(
+        sts_client, "111111111111", "Role"
+    )
+    assert sts_client.assume_role.call_count == 1
+
+
+def test_cache_requires_key(tmp_path):
+    """Test that credentials are never persisted without a key."""
+    with pytest.raises(ValueError):
+        CredentialBroker(cache_path=str(tmp_path / "credentials.cache"))
@@ -0,0 +1,201 @@
+"""
+Tests for sheets depending on the results of other sheets.
+"""
+import threading
+import time
+
+import pytest
+
+from aws_auto_inventory.config.models import Config, Inventory, Sheet, AWSConfig, DependsOn
+from aws_auto_inventory.core.async_engine import AsyncScanEngine
+from aws_auto_inventory.core.aws_client import AWSClient, AWSClientError
+from aws_auto_inventory.core.dependencies import SheetDependencies, extract_values
+from aws_auto_inventory.core.region import RegionScanner
+from aws_auto_inventory.core.service import ServiceScanner
+
+
+@pytest.fixture
+def sheets():
+    """Return a bucket listing, a per-bucket sheet and an Elasticsearch domain pair."""
+    return [
+        Sheet(
+            name="Encryption",
+            service="s3",
+            function="get_bucket_encryption",
+            result_key="ServerSideEncryptionConfiguration",
+            depends_on=DependsOn(sheet="Buckets", parameter="Bucket", value_key="Name")
+        ),
+        Sheet(name="Buckets", service="s3", function="list_buckets", result_key="Buckets"),
+        Sheet(name="Domains", service="es", function="list_domain_names", result_key="DomainNames"),
+        Sheet(
+            name="DomainDetails",
+            service="es",
+            function="describe_elasticsearch_domains",
+            result_key="DomainStatusList",
+            depends_on=DependsOn(sheet="Domains", parameter="DomainNames", value_key="DomainName", batch_size=2)
+        ),
+    ]
+
+
+def fake_call_api(calls):
+    """Return a call_api replacement recording its parameters."""
+    def call_api(self, service, function_name, region=None, parameters=None, result_key=None, **kwargs):
+        calls.append((function_name, dict(parameters or {})))
+        if function_name == "list_buckets":
+            return [{"Name": "a"}, {"Name": "b"}, {"Name": "a"}, {"Name": "broken"}]
+        if function_name == "get_bucket_encryption":
+            if parameters["Bucket"] == "broken":
+                raise AWSClientError("ServerSideEncryptionConfigurationNotFoundError")
+            return {"Rules": [{"Bucket": parameters["Bucket"]}]}
+        if function_name == "list_domain_names":
+            return [{"DomainName": f"domain-{index}"} for index in range(5)]
+        if function_name == "describe_elasticsearch_domains":
+            return [{"DomainName": name} for name in parameters["DomainNames"]]
+        raise AssertionError(function_name)
+    return call_api
+
+
+def test_extract_values():
+    """Test that values are selected by key or jq, flattened and deduplicated."""
+    resources = [{"Name": "a", "Tags": ["x", "y"]}, {"Name": "b", "Tags": ["y"]}, {"Name": None}, "bare"]
+
+    assert extract_values(resources, "Name") == ["a", "b"]
+    assert extract_values(resources[:3], ".Tags[]?") == ["x", "y"]
+    assert extract_values({"Name": "single"}, "Name") == ["single"]
+
+
+def test_dependencies_ignore_missing_sources_and_cycles():
+    """Test that sheets depending on unknown sheets or cycles are not waited for."""
+    sheets = [
+        Sheet(name="A", service="s3", function="list_buckets", depends_on=DependsOn(sheet="B", parameter="x", value_key="y")),
+        Sheet(name="B", service="s3", function="list_buckets", depends_on=DependsOn(sheet="A", parameter="x", value_key="y")),
+        Sheet(name="C", service="s3", function="list_buckets", depends_on=DependsOn(sheet="Z", parameter="x", value_key="y")),
+        Sheet(name="D", service="s3", function="list_buckets"),
+        Sheet(name="E", service="s3", function="list_buckets", depends_on=DependsOn(sheet="D", parameter="x", value_key="y")),
+    ]
+    dependencies = SheetDependencies(sheets)
+
+    assert [dependencies.get_source(sheet) for sheet in sheets[:4]] == [None] * 4
+    assert dependencies.get_source(sheets[4]) is sheets[3]
+    assert dependencies.get_dependents(sheets[3]) == [sheets[4]]
+
+    dependencies.publish(sheets[3], [{"y": 1}])
+    assert dependencies.get_values(sheets[4]) == [1]
+    dependencies.publish(sheets[3], None, success=False)
+    assert dependencies.get_values(sheets[4]) is None
+
+
+def test_region_scanner_fans_out_and_batches(mocker, sheets):
+    """Test that per-value calls are tagged and list parameters are batched."""
+    calls = []
+    mocker.patch.object(AWSClient, 'call_api', fake_call_api(calls))
+    inventory = Inventory(name="inv", aws=AWSConfig(region=["us-east-1"]), sheets=sheets)
+
+    result = RegionScanner(max_workers=4).scan_region(inventory, mocker.MagicMock(), "us-east-1")
+    services = {service.function: service for service in result.services}
+
+    encryption = services["get_bucket_encryption"]
+    assert encryption.success
+    assert sorted(encryption.result, key=lambda item: item["Bucket"]) == [
+        {"Bucket": "a", "Rules": [{"Bucket": "a"}]},
+        {"Bucket": "b", "Rules": [{"Bucket": "b"}]},
+        {"Bucket": "broken", "Error": "ServerSideEncryptionConfigurationNotFoundError"},
+    ]
+    assert sorted(p["Bucket"] for f, p in calls if f == "get_bucket_encryption") == ["a", "b", "broken"]
+
+    details = services["describe_elasticsearch_domains"]
+    assert [domain["DomainName"] for domain in details.result] == [f"domain-{index}" for index in range(5)]
+    assert [len(p["DomainNames"]) for f, p in calls if f == "describe_elasticsearch_domains"] == [2, 2, 1]
+
+
+def test_dependent_sheet_fails_without_source(mocker, sheets):
+    """Test that a dependent sheet fails when its source fails."""
+    def call_api(self, service, function_name, *args, **kwargs):
+        if function_name == "list_buckets":
+            raise AWSClientError("AccessDenied")
+        return {}
+
+    mocker.patch.object(AWSClient, 'call_api', call_api)
+    inventory = Inventory(name="inv", aws=AWSConfig(region=["us-east-1"]), sheets=sheets[:2])
+
+    result = RegionScanner().scan_region(inventory, mocker.MagicMock(), "us-east-1")
+    encryption = next(service for service in result.services if service.function == "get_bucket_encryption")
+
+    assert not encryption.success
+    assert encryption.error == "No parameter values from sheet Buckets"
+
+
+def test_dependent_sheet_fails_when_every_call_fails(mocker, sheets):
+    """Test that a dependent sheet fails only if none of its calls succeed."""
+    def call_api(self, *args, **kwargs):
+        raise AWSClientError("AccessDenied")
+
+    mocker.patch.object(AWSClient, 'call_api', call_api)
+    scanner = ServiceScanner()
+
+    result = scanner.scan_service(sheets[0], mocker.MagicMock(), "us-east-1", parameter_values=["a", "b"])
+    assert not result.success
+    assert result.error == "AccessDenied"
+
+    result = scanner.scan_service(sheets[0], mocker.MagicMock(), "us-east-1", parameter_values=[])
+    assert result.success
+    assert result.result == []
+
+
+def test_async_engine_waits_for_source(mocker, sheets):
+    """Test that the async engine scans dependent sheets after their source."""
+    mocker.patch('aws_auto_inventory.core.async_engine.boto3.Session')
+    calls = []
+    mocker.patch.object(AWSClient, 'call_api', fake_call_api(calls))
+    config = Config(inventories=[
+        Inventory(name="inv", aws=AWSConfig(region=["us-east-1"]), sheets=sheets)
+    ])
+
+    results = AsyncScanEngine(max_concurrency=2).scan(config)
+    services = results[0].region_results[0].services
+
+    assert [service.function for service in services] == [sheet.function for sheet in sheets]
+    assert all(service.success for service in services)
+    assert len(services[0].result) == 3
+    assert len(services[3].result) == 5
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_fan_out_counts_against_max_concurrency(mocker, max_concurrency):
+    """Test that the calls of a dependent sheet run on the async engine's workers."""
+    mocker.patch('aws_auto_inventory.core.async_engine.boto3.Session')
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def call_api(self, service, function_name, region=None, parameters=None, result_key=None, **kwargs):
+        with lock:
+            in_flight.append(function_name)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.remove(function_name)
+        if function_name == "list_buckets":
+            return [{"Name": f"bucket-{index}"} for index in range(20)]
+        return {"Rules": [{"Bucket": parameters["Bucket"]}]}
+
+    mocker.patch.object(AWSClient, 'call_api', call_api)
+    sheets = [
+        Sheet(name="Buckets", service="s3", function="list_buckets", result_key="Buckets"),
+        Sheet(
+            name="Encryption",
+            service="s3",
+            function="get_bucket_encryption",
+            depends_on=DependsOn(sheet="Buckets", parameter="Bucket", value_key="Name")
+        ),
+    ]
+    config = Config(inventories=[
+        Inventory(name="inv", aws=AWSConfig(region=["us-east-1"]), sheets=sheets)
+    ])
+
+    engine = AsyncScanEngine(max_concurrency=max_concurrency)
+    services = engine.scan(config)[0].region_results[0].services
+
+    assert len(services[1].result) == 20
+    assert max(peak) <= max_concurrency
+    assert engine.region_scanner.service_scanner.executor is None
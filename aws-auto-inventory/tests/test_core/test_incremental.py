@@ -0,0 +1,89 @@
+"""
+Tests for incremental scans.
+"""
+import pytest
+
+from aws_auto_inventory.config.models import Inventory, Sheet, AWSConfig
+from aws_auto_inventory.core.incremental import DeltaTracker, resource_id
+from aws_auto_inventory.core.region import RegionScanner
+from aws_auto_inventory.core.service import ServiceResult
+
+
+@pytest.fixture
+def inventory():
+    """Return an inventory with one sheet."""
+    return Inventory(
+        name="inv",
+        aws=AWSConfig(region=["us-east-1"]),
+        sheets=[Sheet(name="Users", service="iam", function="list_users", result_key="Users")]
+    )
+
+
+def scan(tracker, inventory, users):
+    """Apply the tracker to a list_users result."""
+    result = ServiceResult("iam", "list_users", "us-east-1", users)
+    return tracker.apply(inventory, inventory.sheets[0], result).delta
+
+
+def test_delta_between_runs(tmp_path, inventory):
+    """Test that the second run reports only added, changed and removed resources."""
+    state_path = str(tmp_path / "state.json")
+    tracker = DeltaTracker(state_path)
+
+    first = scan(tracker, inventory, [
+        {"UserName": "alice", "Arn": "arn:alice", "Path": "/"},
+        {"UserName": "bob", "Arn": "arn:bob", "Path": "/"},
+    ])
+    assert len(first["added"]) == 2
+    tracker.save()
+
+    # A new tracker reads the fingerprints saved by the previous run
+    tracker = DeltaTracker(state_path)
+    second = scan(tracker, inventory, [
+        {"UserName": "alice", "Arn": "arn:alice", "Path": "/admins/"},
+        {"UserName": "carol", "Arn": "arn:carol", "Path": "/"},
+    ])
+
+    assert [user["UserName"] for user in second["added"]] == ["carol"]
+    assert [user["UserName"] for user in second["changed"]] == ["alice"]
+    assert second["removed"] == ["arn:bob"]
+    assert second["unchanged"] == 0
+
+
+def test_failed_results_keep_previous_state(tmp_path, inventory):
+    """Test that a failed scan does not erase the previous fingerprints."""
+    tracker = DeltaTracker(str(tmp_path / "state.json"))
+    scan(tracker, inventory, [{"Arn": "arn:alice"}])
+
+    failed = ServiceResult("iam", "list_users", "us-east-1", None, success=False, error="denied")
+    assert tracker.apply(inventory, inventory.sheets[0], failed).delta is None
+
+    assert scan(tracker, inventory, [{"Arn": "arn:alice"}])["unchanged"] == 1
+
+
+def test_region_scanner_skips_sheets_within_ttl(mocker, tmp_path, inventory):
+    """Test that sheets scanned within their TTL are not scanned again."""
+    inventory.sheets[0].ttl = 3600
+    tracker = DeltaTracker(str(tmp_path / "state.json"))
+    scanner = RegionScanner(delta_tracker=tracker)
+    scan_service = mocker.patch.object(
+        scanner.service_scanner,
+        'scan_service',
+        return_value=ServiceResult("iam", "list_users", "us-east-1", [{"Arn": "arn:alice"}])
+    )
+
+    first = scanner.scan_global(inventory, mocker.MagicMock(), ["us-east-1"])
+    second = scanner.scan_global(inventory, mocker.MagicMock(), ["us-east-1"])
+
+    assert scan_service.call_count == 1
+    assert first.services[0].result is None
+    assert first.services[0].to_dict()["delta"]["added"] == [{"Arn": "arn:alice"}]
+    assert second.services[0].delta["skipped"]
+
+
+def test_resource_id():
+    """Test that resources are identified by ARN, then ID, then name."""
+    assert resource_id({"GroupName": "web", "GroupId": "sg-1"}) == "sg-1"
+    assert resource_id({"Name": "bucket", "BucketArn": "arn:bucket"}) == "arn:bucket"
+    assert resource_id({"Count": 1}) is None
+    assert resource_id("alias/key") == "alias/key"
@@ -0,0 +1,91 @@
+"""
+Tests for scan metrics.
+"""
+import urllib.request
+
+import pytest
+
+from aws_auto_inventory.core.aws_client import AWSClient, AWSClientError
+from aws_auto_inventory.core.client_cache import ClientCache
+from aws_auto_inventory.core.metrics import MetricsCollector, _on_needs_retry, percentile
+
+
+@pytest.fixture
+def metrics():
+    """Return an empty metrics collector."""
+    return MetricsCollector()
+
+
+def test_calls_are_measured(aws_credentials, mock_boto, metrics):
+    """Test that pages, bytes and errors of real client calls are recorded."""
+    session = mock_boto.Session(region_name="us-east-1")
+    iam = session.client("iam")
+    for name in ["alice", "bob", "carol"]:
+        iam.create_user(UserName=name)
+
+    client = AWSClient(session, max_retries=1, client_cache=ClientCache(metrics=metrics), metrics=metrics)
+    users = client.call_api("iam", "list_users", "us-east-1", result_key="Users")
+    assert len(users) == 3
+    with pytest.raises(AWSClientError):
+        client.call_api("iam", "get_user", "us-east-1", {"UserName": "dave"})
+
+    rows = {row["function"]: row for row in metrics.summary(by=("service", "function"))}
+    assert rows["list_users"]["calls"] == 1
+    assert rows["list_users"]["pages"] == 1
+    assert rows["list_users"]["bytes"] > 0
+    assert rows["get_user"]["errors"] == 1
+    assert rows["get_user"]["pages"] == 0
+
+
+def test_throttles_and_retries(metrics):
+    """Test that throttling errors and retries are attributed to the current call."""
+    call = metrics.start_call("ec2", "describe_instances", "us-east-1")
+    _on_needs_retry(response=(None, {"Error": {"Code": "RequestLimitExceeded"}}))
+    _on_needs_retry(response=(None, {"Error": {"Code": "AccessDenied"}}))
+    metrics.add_retry()
+    metrics.finish_call(call)
+
+    # Events outside a measured call are ignored
+    _on_needs_retry(response=(None, {"Error": {"Code": "Throttling"}}))
+
+    row = metrics.summary()[0]
+    assert (row["service"], row["throttles"], row["retries"]) == ("ec2", 1, 1)
+
+
+def test_percentiles_and_prometheus_export(metrics, tmp_path):
+    """Test the summary percentiles and the Prometheus text format."""
+    for duration in range(1, 101):
+        call = metrics.start_call("s3", "list_buckets", None)
+        call.started_at -= duration / 100
+        metrics.finish_call(call)
+    metrics.observe_queue_wait("s3", "list_buckets", "", 0.5)
+
+    row = metrics.summary()[0]
+    assert row["p50"] == pytest.approx(0.5, abs=0.01)
+    assert row["p99"] == pytest.approx(0.99, abs=0.01)
+    assert row["queue_wait_p95"] == 0.5
+    assert "p99" in metrics.format_summary().splitlines()[0]
+
+    path = str(tmp_path / "metrics.prom")
+    metrics.write_prometheus(path)
+    with open(path) as f:
+        text = f.read()
+    assert 'aws_inventory_call_duration_seconds_count{service="s3",function="list_buckets",region=""} 100' in text
+    assert 'aws_inventory_calls_total{service="s3",function="list_buckets",region=""} 100' in text
+    assert 'quantile="0.99"' in text
+
+    server = metrics.serve(0)
+    assert server.server_address[0] == "127.0.0.1"
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.read().decode("utf-8") == metrics.to_prometheus()
+    finally:
+        server.shutdown()
+
+
+def test_percentile():
+    """Test nearest-rank percentiles."""
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.99) == 4.0
@@ -0,0 +1,121 @@
+"""
+Tests for the organization scanner.
+"""
+import threading
+
+import pytest
+
+from aws_auto_inventory.config.models import Inventory, Sheet, AWSConfig
+from aws_auto_inventory.core.organization import OrganizationScanner
+from aws_auto_inventory.core.region import RegionResult
+
+
+@pytest.fixture
+def org_inventory():
+    """Return an organization inventory with two regions."""
+    return Inventory(
+        name="org-inventory",
+        aws=AWSConfig(region=["us-east-1", "eu-west-1"], organization=True),
+        sheets=[Sheet(name="S3", service="s3", function="list_buckets")]
+    )
+
+
+def test_scan_organization_scans_accounts_concurrently(mocker, org_inventory):
+    """Test that accounts and regions are scanned in parallel."""
+    accounts = [
+        {'id': f'11111111111{i}', 'name': f'Account{i}', 'email': f'a{i}@example.com'}
+        for i in range(4)
+    ]
+    mocker.patch('boto3.Session')
+
+    scanner = OrganizationScanner(max_workers_accounts=4, max_workers_regions=2, max_workers_total=8)
+    mocker.patch.object(scanner, 'get_organization_accounts', return_value=accounts)
+    mocker.patch.object(scanner, 'assume_role', return_value=mocker.MagicMock())
+
+    # Every region scan waits until all accounts are in flight at once
+    barrier = threading.Barrier(len(accounts) * 2, timeout=5)
+    region_scanner = mocker.MagicMock()
+    region_scanner.scan_global.return_value = None
+
+    def scan_region(inventory, session, region, account=None):
+        barrier.wait()
+        return RegionResult(region=region, services=[])
+
+    region_scanner.scan_region.side_effect = scan_region
+
+    results = scanner.scan_organization(org_inventory, region_scanner)
+
+    assert len(results) == 4
+    assert all(result.success for result in results)
+    assert sorted(result.account_id for result in results) == [a['id'] for a in accounts]
+    for result in results:
+        assert sorted(region.region for region in result.regions) == ["eu-west-1", "us-east-1"]
+
+
+def test_scan_organization_role_assumption_failure(mocker, org_inventory):
+    """Test that a failed role assumption is reported without stopping other accounts."""
+    accounts = [
+        {'id': '111111111111', 'name': 'Account1', 'email': 'a1@example.com'},
+        {'id': '222222222222', 'name': 'Account2', 'email': 'a2@example.com'}
+    ]
+    mocker.patch('boto3.Session')
+
+    scanner = OrganizationScanner(max_workers_accounts=2)
+    mocker.patch.object(scanner, 'get_organization_accounts', return_value=accounts)
+    mocker.patch.object(
+        scanner,
+        'assume_role',
+        side_effect=lambda session, account_id, role_name, sts_client=None: (
+            None if account_id == '222222222222' else mocker.MagicMock()
+        )
+    )
+
+    region_scanner = mocker.MagicMock()
+    region_scanner.scan_global.return_value = None
+    region_scanner.scan_region.side_effect = (
+        lambda inventory, session, region, account=None: RegionResult(region=region, services=[])
+    )
+
+    results = {result.account_id: result for result in scanner.scan_organization(org_inventory, region_scanner)}
+
+    assert results['111111111111'].success
+    assert len(results['111111111111'].regions) == 2
+    assert not results['222222222222'].success
+    assert results['222222222222'].regions == []
+    assert "Failed to assume role" in results['222222222222'].error
+
+
+def test_scan_organization_global_region_limit(mocker, org_inventory):
+    """Test that region scans in flight across all accounts never exceed the global limit."""
+    accounts = [
+        {'id': f'11111111111{i}', 'name': f'Account{i}', 'email': f'a{i}@example.com'}
+        for i in range(5)
+    ]
+    mocker.patch('boto3.Session')
+
+    scanner = OrganizationScanner(max_workers_accounts=5, max_workers_total=3)
+    mocker.patch.object(scanner, 'get_organization_accounts', return_value=accounts)
+    mocker.patch.object(scanner, 'assume_role', return_value=mocker.MagicMock())
+
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+    region_scanner = mocker.MagicMock()
+    region_scanner.scan_global.return_value = None
+
+    def scan_region(inventory, session, region, account=None):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        threading.Event().wait(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return RegionResult(region=region, services=[])
+
+    region_scanner.scan_region.side_effect = scan_region
+
+    results = scanner.scan_organization(org_inventory, region_scanner)
+
+    assert len(results) == 5
+    assert all(len(result.regions) == 2 for result in results)
+    assert peak[0] <= 3
@@ -0,0 +1,132 @@
+"""
+Tests for the scan planner.
+"""
+import pytest
+
+from aws_auto_inventory.config.models import Inventory, Sheet, AWSConfig
+from aws_auto_inventory.core.global_services import get_home_region
+from aws_auto_inventory.core.planner import ScanPlanner, build_service_regions
+from aws_auto_inventory.core.region import RegionScanner
+from aws_auto_inventory.core.service import ServiceResult
+
+
+@pytest.fixture
+def unsupported_region():
+    """Return a region offering EC2 but not WorkSpaces."""
+    regions = build_service_regions(["ec2", "workspaces"])
+    return sorted(set(regions["ec2"]) - set(regions["workspaces"]))[0]
+
+
+def test_service_availability(tmp_path, unsupported_region):
+    """Test that regional services are pruned and global services are not."""
+    planner = ScanPlanner(str(tmp_path))
+
+    assert planner.is_available("ec2", unsupported_region)
+    assert not planner.is_available("workspaces", unsupported_region)
+    assert planner.is_available("iam", unsupported_region)
+    assert (tmp_path / "service_regions.json").exists()
+
+
+def test_sheets_build_missing_services_once(mocker, tmp_path, unsupported_region):
+    """Test that the services of all sheets are looked up in one botocore pass."""
+    planner = ScanPlanner(str(tmp_path))
+    build = mocker.patch(
+        'aws_auto_inventory.core.planner.build_service_regions', wraps=build_service_regions
+    )
+    save = mocker.patch('aws_auto_inventory.core.planner._save_json')
+    sheets = [
+        Sheet(name="VPCs", service="ec2", function="describe_vpcs"),
+        Sheet(name="Desktops", service="workspaces", function="describe_workspaces"),
+        Sheet(name="Instances", service="ec2", function="describe_instances"),
+    ]
+
+    planned = planner.get_sheets(sheets, unsupported_region)
+    planner.get_sheets(sheets, unsupported_region)
+
+    assert [sheet.name for sheet in planned] == ["VPCs", "Instances"]
+    build.assert_called_once_with(["ec2", "workspaces"])
+    save.assert_called_once()
+
+
+def test_enabled_regions_are_cached(aws_credentials, mock_boto, mocker, tmp_path):
+    """Test that "all" regions are discovered once and then read from the cache."""
+    inventory = Inventory(
+        name="inv",
+        aws=AWSConfig(region=["all"]),
+        sheets=[Sheet(name="S3", service="s3", function="list_buckets")]
+    )
+    session = mock_boto.Session()
+
+    regions = ScanPlanner(str(tmp_path)).get_regions(inventory, session)
+    assert "us-east-1" in regions
+
+    # A new planner reads the cache instead of calling describe_regions again
+    client = mocker.patch.object(session, 'client')
+    assert ScanPlanner(str(tmp_path)).get_regions(inventory, session) == regions
+    client.assert_not_called()
+
+    # Configured regions are used as is
+    inventory.aws.region = ["eu-west-1"]
+    assert ScanPlanner(str(tmp_path)).get_regions(inventory, session) == ["eu-west-1"]
+
+
+def test_region_scanner_skips_unavailable_services(mocker, tmp_path, unsupported_region):
+    """Test that sheets are not sent to regions where their service does not exist."""
+    inventory = Inventory(
+        name="inv",
+        aws=AWSConfig(region=[unsupported_region]),
+        sheets=[
+            Sheet(name="EC2", service="ec2", function="describe_vpcs"),
+            Sheet(name="WorkSpaces", service="workspaces", function="describe_workspaces"),
+        ]
+    )
+    scanner = RegionScanner(planner=ScanPlanner(str(tmp_path)))
+    scan_service = mocker.patch.object(
+        scanner.service_scanner,
+        'scan_service',
+        side_effect=lambda sheet, session, region: ServiceResult(sheet.service, sheet.function, region, [])
+    )
+
+    result = scanner.scan_region(inventory, mocker.MagicMock(), unsupported_region)
+
+    assert [service.service for service in result.services] == ["ec2"]
+    assert scan_service.call_count == 1
+
+
+def test_global_sheets_scanned_once(mocker):
+    """Test that global sheets are scanned once, in their home region."""
+    inventory = Inventory(
+        name="inv",
+        aws=AWSConfig(region=["eu-west-1", "eu-central-1"]),
+        sheets=[
+            Sheet(name="EC2", service="ec2", function="describe_vpcs"),
+            Sheet(name="Users", service="iam", function="list_users"),
+            Sheet(name="Zones", service="route53", function="list_hosted_zones"),
+            Sheet(name="Buckets", service="s3", function="list_buckets", scope="global"),
+        ]
+    )
+    scanner = RegionScanner()
+    scan_service = mocker.patch.object(
+        scanner.service_scanner,
+        'scan_service',
+        side_effect=lambda sheet, session, region: ServiceResult(sheet.service, sheet.function, region, [])
+    )
+
+    regional = scanner.scan_region(inventory, mocker.MagicMock(), "eu-west-1")
+    result = scanner.scan_global(inventory, mocker.MagicMock(), inventory.aws.region)
+
+    assert [service.service for service in regional.services] == ["ec2"]
+    assert result.region == "global"
+    assert {service.service: service.region for service in result.services} == {
+        "iam": "eu-west-1",
+        "route53": "us-east-1",
+        "s3": "eu-west-1",
+    }
+    assert scan_service.call_count == 4
+
+
+def test_get_home_region_stays_in_partition():
+    """Test that global APIs are called in the partition being scanned."""
+    sheet = Sheet(name="Zones", service="route53", function="list_hosted_zones")
+    assert get_home_region(sheet, ["eu-west-1"]) == "us-east-1"
+    assert get_home_region(sheet, ["cn-north-1"]) == "cn-north-1"
@@ -0,0 +1,85 @@
+"""
+Tests for compiled jq queries.
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+from aws_auto_inventory.core.aws_client import extract_pages
+from aws_auto_inventory.core.query import QueryError, QuerySyntaxError, compile_query
+
+
+@pytest.fixture
+def reservations():
+    """Return a describe_instances response with boto3 datetimes."""
+    return {
+        "Reservations": [{
+            "Instances": [
+                {
+                    "InstanceId": "i-1",
+                    "LaunchTime": datetime(2024, 5, 1, tzinfo=timezone.utc),
+                    "Tags": [{"Key": "Name", "Value": "web"}, {"Key": "managed_by_terraform", "Value": "true"}]
+                },
+                {
+                    "InstanceId": "i-2",
+                    "LaunchTime": datetime(2022, 5, 1, tzinfo=timezone.utc),
+                    "Tags": [{"Key": "Name", "Value": "db"}]
+                }
+            ]
+        }]
+    }
+
+
+@pytest.mark.parametrize("expression,expected", [
+    (".Reservations[].Instances[].InstanceId", ["i-1", "i-2"]),
+    (".Reservations | .[] | .Instances | .[] | .Tags[]|select(.Key==\"Name\")|.Value", ["web", "db"]),
+    (
+        ".Reservations|.[]|.Instances |.[]| select((.Tags[]|select(.Key==\"managed_by_terraform\")))"
+        " | (.Tags[]|select(.Key==\"Name\")|.Value)",
+        ["web"]
+    ),
+    (".Reservations[].Instances[] | .InstanceId, (.Tags | length)", ["i-1", 2, "i-2", 1]),
+    (".Reservations[].Instances[] | {InstanceId, Name: (.Tags[] | select(.Key == \"Name\") | .Value)}",
+     [{"InstanceId": "i-1", "Name": "web"}, {"InstanceId": "i-2", "Name": "db"}]),
+    ("[.Reservations[].Instances[].InstanceId]", [["i-1", "i-2"]]),
+    (".Reservations[0].Instances[-1][\"InstanceId\"]", ["i-2"]),
+    (".Missing[]?", []),
+    (".Missing // \"none\"", ["none"]),
+    (".Reservations[].Instances | map(.InstanceId)", [["i-1", "i-2"]]),
+    (".Reservations[].Instances[] | select(has(\"Tags\") and (.InstanceId == \"i-2\" | not)) | .InstanceId", ["i-1"]),
+])
+def test_query_results(reservations, expression, expected):
+    """Test jq semantics of the supported expressions."""
+    assert compile_query(expression).all(reservations) == expected
+
+
+def test_query_keeps_boto3_types(reservations):
+    """Test that datetimes are returned as is and compare like their JSON strings."""
+    query = compile_query(".Reservations[].Instances[] | select(.LaunchTime > \"2023\") | .LaunchTime")
+
+    assert query.all(reservations) == [datetime(2024, 5, 1, tzinfo=timezone.utc)]
+
+
+def test_query_is_compiled_once():
+    """Test that compiled queries are cached by expression."""
+    assert compile_query(".Buckets[].Name") is compile_query(".Buckets[].Name")
+
+
+def test_query_errors():
+    """Test that syntax and type errors are reported."""
+    with pytest.raises(QuerySyntaxError):
+        compile_query(".Buckets[")
+    with pytest.raises(QuerySyntaxError):
+        compile_query("unknown_function(.a)")
+    with pytest.raises(QueryError):
+        compile_query(".Buckets[]").all({"Buckets": 1})
+
+
+def test_extract_pages_uses_compiled_query(mocker, reservations):
+    """Test that pages are queried without a JSON round trip."""
+    dumps = mocker.patch('aws_auto_inventory.core.aws_client.json.dumps')
+
+    pages = list(extract_pages([reservations, reservations], ".Reservations[].Instances[].InstanceId"))
+
+    assert pages == [["i-1", "i-2"], ["i-1", "i-2"]]
+    dumps.assert_not_called()
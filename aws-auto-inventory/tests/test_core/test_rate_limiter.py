@@ -0,0 +1,110 @@
+"""
+Tests for the adaptive rate limiter.
+"""
+from aws_auto_inventory.core.client_cache import ClientCache, get_session_key
+from aws_auto_inventory.core.rate_limiter import RateLimiter, TokenBucket, jittered_backoff
+
+
+class FakeClock:
+    """Deterministic replacement for time.monotonic and time.sleep."""
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_shrinks_and_recovers(mocker):
+    """Test that throttling halves the rate and it recovers over time."""
+    clock = FakeClock()
+    mocker.patch('aws_auto_inventory.core.rate_limiter.time', clock)
+    bucket = TokenBucket(max_rate=10.0, min_rate=1.0, recovery_rate=1.0)
+
+    bucket.on_throttle()
+    assert bucket.rate == 5.0
+    bucket.on_throttle()
+    bucket.on_throttle()
+    bucket.on_throttle()
+    assert bucket.rate == 1.0
+
+    clock.now += 4
+    bucket.acquire()
+    assert bucket.rate == 5.0
+
+    clock.now += 60
+    bucket.acquire()
+    assert bucket.rate == 10.0
+
+
+def test_token_bucket_limits_request_rate(mocker):
+    """Test that acquiring more tokens than the burst waits for refills."""
+    clock = FakeClock()
+    mocker.patch('aws_auto_inventory.core.rate_limiter.time', clock)
+    bucket = TokenBucket(max_rate=5.0, min_rate=1.0, recovery_rate=1.0)
+
+    for _ in range(15):
+        bucket.acquire()
+
+    # The first 5 tokens are the burst, the next 10 arrive at 5 per second
+    assert abs(clock.now - 2.0) < 1e-6
+
+
+def test_jittered_backoff_bounds():
+    """Test that the backoff stays within the upper half of the exponential window."""
+    for attempt in range(6):
+        window = min(30, 2 * 2 ** attempt)
+        delays = [jittered_backoff(attempt, 2, max_delay=30) for _ in range(50)]
+        assert all(window / 2 <= delay <= window for delay in delays)
+
+
+def test_register_limits_client_requests(aws_credentials, mock_boto, mocker):
+    """Test that clients from the cache acquire tokens and report throttling."""
+    rate_limiter = RateLimiter(max_rate=10.0)
+    cache = ClientCache(rate_limiter=rate_limiter)
+    session = mock_boto.Session()
+    client = cache.get_client(session, 'sts', 'us-east-1')
+
+    bucket = rate_limiter.get_bucket((get_session_key(session), 'us-east-1', 'sts'))
+    acquire = mocker.spy(bucket, 'acquire')
+
+    client.get_caller_identity()
+    client.get_caller_identity()
+    assert acquire.call_count == 2
+
+    bucket.needs_retry(response=(None, {'Error': {'Code': 'AccessDenied'}}))
+    assert bucket.throttle_count == 0
+
+    bucket.needs_retry(response=(None, {'Error': {'Code': 'Throttling'}}))
+    assert bucket.throttle_count == 1
+    assert bucket.rate < 10.0
+
+
+def test_rate_limiter_is_bounded():
+    """Test that the least recently used bucket is dropped when the limit is reached."""
+    rate_limiter = RateLimiter(max_buckets=2)
+    first = rate_limiter.get_bucket('a')
+    rate_limiter.get_bucket('b')
+    rate_limiter.get_bucket('a')
+    rate_limiter.get_bucket('c')
+
+    assert len(rate_limiter) == 2
+    assert rate_limiter.get_bucket('a') is first
+
+    rate_limiter.discard('a')
+    assert len(rate_limiter) == 1
+
+
+def test_client_eviction_discards_bucket(aws_credentials, mock_boto):
+    """Test that evicting a client from the cache also drops its bucket."""
+    rate_limiter = RateLimiter()
+    cache = ClientCache(max_size=1, rate_limiter=rate_limiter)
+    session = mock_boto.Session()
+
+    cache.get_client(session, 'sts', 'us-east-1')
+    cache.get_client(session, 'sts', 'eu-west-1')
+
+    assert len(cache) == 1
+    assert len(rate_limiter) == 1
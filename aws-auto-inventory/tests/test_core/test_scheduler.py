@@ -0,0 +1,80 @@
+"""
+Tests for the priority scheduler.
+"""
+import threading
+
+from aws_auto_inventory.config.models import Inventory, Sheet, AWSConfig
+from aws_auto_inventory.core.region import RegionScanner
+from aws_auto_inventory.core.scheduler import DurationHistory, PriorityScheduler
+from aws_auto_inventory.core.service import ServiceResult
+
+
+def test_longest_expected_tasks_run_first():
+    """Test that queued tasks run longest-expected-first, unknown tasks before known ones."""
+    history = DurationHistory()
+    history.record(["fast"], 0.1)
+    history.record(["slow"], 5.0)
+    history.record(["medium"], 1.0)
+    scheduler = PriorityScheduler(max_workers=1, history=history)
+
+    # Hold the only worker so every other task is queued before any runs
+    started = threading.Event()
+    gate = threading.Event()
+    scheduler.submit(lambda: started.set() or gate.wait())
+    started.wait(5)
+
+    order = []
+    futures = [
+        scheduler.submit(order.append, name, keys=[name])
+        for name in ["fast", "medium", "new", "slow"]
+    ]
+    assert scheduler.queued == 4
+
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+    scheduler.shutdown()
+
+    assert order == ["new", "slow", "medium", "fast"]
+
+
+def test_history_is_averaged_and_persisted(tmp_path):
+    """Test that durations are averaged, estimated from general keys and saved."""
+    path = str(tmp_path / "durations.json")
+    history = DurationHistory(path, alpha=0.5)
+    history.record(["inv/111/us-east-1/s3.list_buckets", "s3.list_buckets"], 2.0)
+    history.record(["inv/111/us-east-1/s3.list_buckets", "s3.list_buckets"], 4.0)
+    history.save()
+
+    history = DurationHistory(path)
+    assert history.expected(["inv/111/us-east-1/s3.list_buckets"]) == 3.0
+    assert history.expected(["inv/222/eu-west-1/s3.list_buckets", "s3.list_buckets"]) == 3.0
+    assert history.expected(["ec2.describe_vpcs"]) is None
+
+
+def test_region_scanner_uses_shared_scheduler(mocker):
+    """Test that sheets of every region are scanned by the shared scheduler."""
+    inventory = Inventory(
+        name="inv",
+        aws=AWSConfig(region=["us-east-1", "eu-west-1"]),
+        sheets=[
+            Sheet(name="VPCs", service="ec2", function="describe_vpcs"),
+            Sheet(name="Volumes", service="ec2", function="describe_volumes"),
+        ]
+    )
+    scheduler = PriorityScheduler(max_workers=2)
+    scanner = RegionScanner(scheduler=scheduler)
+    threads = set()
+
+    def scan_service(sheet, session, region):
+        threads.add(threading.current_thread().name)
+        return ServiceResult(sheet.service, sheet.function, region, [region])
+
+    mocker.patch.object(scanner.service_scanner, 'scan_service', side_effect=scan_service)
+
+    results = [scanner.scan_region(inventory, mocker.MagicMock(), region) for region in inventory.aws.region]
+    scheduler.shutdown()
+
+    assert [len(result.services) for result in results] == [2, 2]
+    assert all(thread.startswith("aws-auto-inventory-scheduler") for thread in threads)
+    assert scheduler.history.expected(["us-east-1/ec2.describe_vpcs"]) is not None
@@ -0,0 +1,118 @@
+"""
+Tests for the streaming JSONL output.
+"""
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+from aws_auto_inventory.config.models import Inventory, Sheet, AWSConfig
+from aws_auto_inventory.core.region import RegionScanner
+from aws_auto_inventory.core.service import ServiceResult
+from aws_auto_inventory.output.jsonl import JsonlSink, iter_records, load_scan_results
+
+
+def test_sink_round_trip_account_scan(tmp_path):
+    """Test that records are rebuilt into the single account format."""
+    path = str(tmp_path / "results.jsonl")
+    with JsonlSink(path) as sink:
+        sink.write("inv", ServiceResult("s3", "list_buckets", "us-east-1", [{"Name": "a"}]))
+        sink.write("inv", ServiceResult("ec2", "describe_vpcs", "eu-west-1", [], success=False, error="denied"))
+        sink.write("inv", ServiceResult("ec2", "describe_vpcs", "us-east-1", []))
+
+    assert sink.records_written == 3
+    results = load_scan_results(path)
+
+    assert results == [{
+        "inventory_name": "inv",
+        "account_results": [
+            {"region": "us-east-1", "services": [
+                {"service": "s3", "function": "list_buckets", "region": "us-east-1",
+                 "result": [{"Name": "a"}], "success": True, "error": None},
+                {"service": "ec2", "function": "describe_vpcs", "region": "us-east-1",
+                 "result": [], "success": True, "error": None},
+            ]},
+            {"region": "eu-west-1", "services": [
+                {"service": "ec2", "function": "describe_vpcs", "region": "eu-west-1",
+                 "result": [], "success": False, "error": "denied"},
+            ]},
+        ]
+    }]
+
+
+def test_sink_gzip_organization_scan(tmp_path):
+    """Test gzip output, tagging by account and encoding of boto3 types."""
+    path = str(tmp_path / "results.jsonl")
+    account = {"id": "111111111111", "name": "Account1"}
+    with JsonlSink(path, compression="gzip") as sink:
+        sink.write("org", ServiceResult("iam", "list_users", "us-east-1", [
+            {"CreateDate": datetime(2024, 1, 2, 3, 4, 5), "Blob": b"\x00\x01"}
+        ]), account)
+
+    assert sink.path.endswith(".jsonl.gz")
+    with gzip.open(sink.path, "rt") as f:
+        record = json.loads(f.readline())
+    assert record["account_id"] == "111111111111"
+    assert record["result"][0]["CreateDate"] == "2024-01-02T03:04:05"
+    assert record["result"][0]["Blob"] == {"__bytes_b64__": "AAE="}
+
+    results = load_scan_results(sink.path)
+    assert results[0]["organization_results"][0]["account_id"] == "111111111111"
+    assert results[0]["organization_results"][0]["regions"][0]["region"] == "us-east-1"
+
+
+def test_sink_rejects_unknown_compression(tmp_path):
+    """Test that unknown compression is rejected."""
+    with pytest.raises(ValueError):
+        JsonlSink(str(tmp_path / "results.jsonl"), compression="lz4")
+
+
+def test_region_scanner_streams_results(mocker, tmp_path):
+    """Test that the region scanner writes each result and can drop the payload."""
+    path = str(tmp_path / "results.jsonl")
+    inventory = Inventory(
+        name="inv",
+        aws=AWSConfig(region=["us-east-1"]),
+        sheets=[Sheet(name="S3", service="s3", function="list_buckets")]
+    )
+
+    with JsonlSink(path) as sink:
+        scanner = RegionScanner(sink=sink, retain_results=False)
+        mocker.patch.object(
+            scanner.service_scanner,
+            'scan_service',
+            return_value=ServiceResult("s3", "list_buckets", "us-east-1", [{"Name": "a"}])
+        )
+        region_result = scanner.scan_region(inventory, mocker.MagicMock(), "us-east-1")
+
+    assert region_result.services[0].result is None
+    records = list(iter_records(path))
+    assert records[0]["inventory"] == "inv"
+    assert records[0]["result"] == [{"Name": "a"}]
+
+
+def test_region_scanner_survives_sink_errors(mocker):
+    """Test that a failing sink does not abandon the region's remaining sheets."""
+    inventory = Inventory(
+        name="inv",
+        aws=AWSConfig(region=["us-east-1"]),
+        sheets=[
+            Sheet(name="S3", service="s3", function="list_buckets"),
+            Sheet(name="VPCs", service="ec2", function="describe_vpcs"),
+        ]
+    )
+    sink = mocker.MagicMock()
+    sink.write.side_effect = OSError("disk full")
+
+    scanner = RegionScanner(sink=sink)
+    mocker.patch.object(
+        scanner.service_scanner,
+        'scan_service',
+        side_effect=lambda sheet, session, region: ServiceResult(sheet.service, sheet.function, region, [])
+    )
+    region_result = scanner.scan_region(inventory, mocker.MagicMock(), "us-east-1")
+
+    assert len(region_result.services) == 2
+    assert all(not service.success for service in region_result.services)
+    assert all("disk full" in service.error for service in region_result.services)
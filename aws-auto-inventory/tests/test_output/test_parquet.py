@@ -0,0 +1,90 @@
+"""
+Tests for the columnar Parquet output.
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+from aws_auto_inventory.core.service import ServiceResult
+from aws_auto_inventory.output import parquet
+from aws_auto_inventory.output.parquet import ParquetSink, flatten_resource, load_dataset
+
+
+def test_flatten_resource():
+    """Test that nested dictionaries become dotted columns and lists JSON strings."""
+    row = flatten_resource({
+        "GroupId": "sg-1",
+        "Vpc": {"Id": "vpc-1", "Tags": {"Name": "main"}},
+        "IpPermissions": [{"IpRanges": [{"CidrIp": "0.0.0.0/0"}]}],
+        "Empty": {},
+        "CreateDate": datetime(2024, 1, 2, 3, 4, 5),
+    })
+
+    assert row == {
+        "GroupId": "sg-1",
+        "Vpc.Id": "vpc-1",
+        "Vpc.Tags.Name": "main",
+        "IpPermissions": '[{"IpRanges": [{"CidrIp": "0.0.0.0/0"}]}]',
+        "Empty": "{}",
+        "CreateDate": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    }
+    assert flatten_resource("https://queue") == {"value": "https://queue"}
+
+
+def test_sink_requires_pyarrow(tmp_path, monkeypatch):
+    """Test that a missing pyarrow is reported."""
+    monkeypatch.setattr(parquet, "pyarrow", None)
+
+    with pytest.raises(ValueError, match="pyarrow"):
+        ParquetSink(str(tmp_path))
+
+
+def test_sink_writes_partitioned_tables(tmp_path):
+    """Test one table per sheet, partitioned by account, across part files."""
+    pytest.importorskip("pyarrow")
+    import pyarrow.compute as pc
+
+    directory = str(tmp_path / "parquet")
+    accounts = [{"id": "111111111111", "name": "One"}, {"id": "222222222222", "name": "Two"}]
+    with ParquetSink(directory, max_buffered_rows=2) as sink:
+        for account in accounts:
+            sink.write("org", ServiceResult("ec2", "describe_security_groups", "us-east-1", [
+                {"GroupId": f"sg-{account['id']}", "IpPermissions": [{"CidrIp": "0.0.0.0/0"}]},
+                {"GroupId": "sg-private", "IpPermissions": [], "Vpc": {"Id": "vpc-1"}},
+            ]), account)
+        sink.write("org", ServiceResult("s3", "list_buckets", "us-east-1", [{"Name": "b"}]), accounts[0])
+        sink.write("org", ServiceResult("s3", "list_buckets", "eu-west-1", [], success=False, error="denied"))
+
+    assert sink.rows_written == 5
+
+    dataset = load_dataset(directory, "ec2", "describe_security_groups")
+    table = dataset.to_table(filter=pc.match_substring(pc.field("IpPermissions"), "0.0.0.0/0"))
+    assert sorted(table.column("GroupId").to_pylist()) == ["sg-111111111111", "sg-222222222222"]
+    assert set(dataset.to_table().column("account_id").to_pylist()) == {"111111111111", "222222222222"}
+    assert set(dataset.to_table().column("Vpc.Id").to_pylist()) == {None, "vpc-1"}
+
+    buckets = load_dataset(directory, "s3", "list_buckets").to_table()
+    assert buckets.column("Name").to_pylist() == ["b"]
+    assert buckets.column("region").to_pylist() == ["us-east-1"]
+    assert buckets.column("scan_time").to_pylist()[0] == sink.scan_time
+
+
+def test_sink_stores_drifting_columns_as_strings(tmp_path):
+    """Test that columns whose values change type are written and read as strings."""
+    pytest.importorskip("pyarrow")
+
+    directory = str(tmp_path / "parquet")
+    account = {"id": "111111111111", "name": "One"}
+    with ParquetSink(directory, max_buffered_rows=1) as sink:
+        for resources in (
+            [{"Id": "a", "Size": 1, "Tag": "x"}],
+            [{"Id": "b", "Size": "large", "Tag": None}],
+            [{"Id": "c", "Size": 2, "Tag": 3}, {"Id": "d", "Size": None, "Tag": "y"}],
+        ):
+            sink.write("inv", ServiceResult("ec2", "describe_volumes", "us-east-1", resources), account)
+
+    assert sink.rows_written == 4
+
+    table = load_dataset(directory, "ec2", "describe_volumes").to_table().sort_by("Id")
+    assert table.column("Size").to_pylist() == ["1", "large", "2", None]
+    assert table.column("Tag").to_pylist() == ["x", None, "3", "y"]
@@ -0,0 +1,156 @@
+"""
+Tests for the JSON and Excel output processor.
+"""
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from aws_auto_inventory.config.models import AWSConfig, Config, ExcelConfig, Inventory, Sheet
+from aws_auto_inventory.core.region import RegionResult
+from aws_auto_inventory.core.scan_engine import ScanResult
+from aws_auto_inventory.core.service import ServiceResult
+from aws_auto_inventory.output import processor
+from aws_auto_inventory.output.processor import OutputProcessor, get_shape_columns
+
+
+def make_config(transpose=False, organization=False):
+    return Config(inventories=[Inventory(
+        name="inv",
+        aws=AWSConfig(region=["us-east-1"], organization=organization),
+        sheets=[
+            Sheet(name="SecurityGroups", service="ec2", function="describe_security_groups",
+                  result_key="SecurityGroups"),
+            Sheet(name="Buckets", service="s3", function="list_buckets", result_key="Buckets"),
+        ],
+        excel=ExcelConfig(transpose=transpose, formatting={"header_style": {"bold": True, "bg_color": "#4F81BD"}})
+    )])
+
+
+def test_json_output(tmp_path):
+    """Test one JSON file per service result, skipping failures."""
+    results = [ScanResult("inv", region_results=[
+        RegionResult("us-east-1", [
+            ServiceResult("s3", "list_buckets", "us-east-1", [
+                {"Name": "a", "CreationDate": datetime(2024, 1, 2, tzinfo=timezone.utc)}
+            ]),
+            ServiceResult("ec2", "describe_vpcs", "us-east-1", [], success=False, error="denied"),
+        ])
+    ])]
+
+    OutputProcessor(str(tmp_path), ["json"]).process(results)
+
+    with open(tmp_path / "json" / "inv" / "us-east-1" / "s3-list_buckets.json") as f:
+        assert json.load(f) == [{"Name": "a", "CreationDate": "2024-01-02T00:00:00+00:00"}]
+    assert not (tmp_path / "json" / "inv" / "us-east-1" / "ec2-describe_vpcs.json").exists()
+
+
+def test_written_result_survives_scanner_dropping_it(tmp_path):
+    """Test that queued writes keep the result the scanner drops after writing."""
+    service_result = ServiceResult("s3", "list_buckets", "us-east-1", [{"Name": "a"}])
+    account = {"id": "111111111111", "name": "One"}
+
+    with OutputProcessor(str(tmp_path), ["json"]) as output:
+        output.write("inv", service_result, account)
+        service_result.result = None
+
+    with open(tmp_path / "json" / "inv" / "111111111111" / "us-east-1" / "s3-list_buckets.json") as f:
+        assert json.load(f) == [{"Name": "a"}]
+
+
+def test_excel_requires_xlsxwriter(tmp_path, monkeypatch):
+    """Test that a missing xlsxwriter is reported."""
+    monkeypatch.setattr(processor, "xlsxwriter", None)
+
+    with pytest.raises(ValueError, match="xlsxwriter"):
+        OutputProcessor(str(tmp_path), ["excel"])
+    with pytest.raises(ValueError, match="Unsupported"):
+        OutputProcessor(str(tmp_path), ["csv"])
+
+
+def test_shape_columns():
+    """Test that columns come from the botocore output shape."""
+    columns = get_shape_columns("ec2", "describe_security_groups", "SecurityGroups")
+
+    assert "GroupId" in columns and "IpPermissions" in columns
+    assert get_shape_columns("ec2", "no_such_function", "Items") == ()
+
+
+def test_excel_output(tmp_path):
+    """Test one worksheet per sheet, with header and extra keys in the Other column."""
+    pytest.importorskip("xlsxwriter")
+    openpyxl = pytest.importorskip("openpyxl")
+
+    account = {"id": "111111111111", "name": "One"}
+    with OutputProcessor(str(tmp_path), ["excel"], make_config(organization=True)) as output:
+        output.write("inv", ServiceResult("ec2", "describe_security_groups", "us-east-1", [
+            {"GroupId": "sg-1", "IpPermissions": [{"IpProtocol": "-1"}]},
+        ]), account)
+        output.write("inv", ServiceResult("ec2", "describe_security_groups", "eu-west-1", [
+            {"GroupId": "sg-2", "Custom": True},
+        ]), account)
+
+    workbook = openpyxl.load_workbook(tmp_path / "inv.xlsx")
+    assert workbook.sheetnames == ["SecurityGroups", "Buckets"]
+
+    rows = list(workbook["SecurityGroups"].iter_rows(values_only=True))
+    header = rows[0]
+    assert header[:3] == ("Account ID", "Account Name", "Region")
+    assert header[-1] == "Other"
+    records = [dict(zip(header, row)) for row in rows[1:]]
+    assert records[0]["GroupId"] == "sg-1"
+    assert json.loads(records[0]["IpPermissions"]) == [{"IpProtocol": "-1"}]
+    assert records[1]["Region"] == "eu-west-1"
+    assert json.loads(records[1]["Other"]) == {"Custom": True}
+    assert workbook["SecurityGroups"]["A1"].font.bold
+
+
+def test_excel_transposed_output(tmp_path):
+    """Test transposed worksheets with one column per resource."""
+    pytest.importorskip("xlsxwriter")
+    openpyxl = pytest.importorskip("openpyxl")
+
+    results = [ScanResult("inv", region_results=[
+        RegionResult("us-east-1", [
+            ServiceResult("s3", "list_buckets", "us-east-1", [{"Name": "a"}, {"Name": "b"}]),
+        ])
+    ])]
+    OutputProcessor(str(tmp_path), ["excel"], make_config(transpose=True)).process(results)
+
+    rows = list(openpyxl.load_workbook(tmp_path / "inv.xlsx")["Buckets"].iter_rows(values_only=True))
+    assert rows == [("Region", "us-east-1", "us-east-1"), ("Name", "a", "b")]
+
+
+def test_sheets_sharing_a_function(tmp_path):
+    """Test that sheets calling the same API function get their own file and worksheet."""
+    pytest.importorskip("xlsxwriter")
+    openpyxl = pytest.importorskip("openpyxl")
+
+    config = Config(inventories=[Inventory(
+        name="inv",
+        aws=AWSConfig(region=["us-east-1"]),
+        sheets=[
+            Sheet(name="WorkSpaces", service="workspaces", function="describe_workspaces",
+                  result_key="Workspaces"),
+            Sheet(name="WorkSpaces_Encryption", service="workspaces", function="describe_workspaces",
+                  result_key="Workspaces"),
+        ]
+    )])
+    with OutputProcessor(str(tmp_path), ["json", "excel"], config) as output:
+        output.write("inv", ServiceResult("workspaces", "describe_workspaces", "us-east-1",
+                                          [{"WorkspaceId": "ws-1"}], sheet="WorkSpaces"))
+        output.write("inv", ServiceResult("workspaces", "describe_workspaces", "us-east-1",
+                                          [{"WorkspaceId": "ws-2"}], sheet="WorkSpaces_Encryption"))
+
+    directory = tmp_path / "json" / "inv" / "us-east-1"
+    with open(directory / "WorkSpaces.json") as f:
+        assert json.load(f) == [{"WorkspaceId": "ws-1"}]
+    with open(directory / "WorkSpaces_Encryption.json") as f:
+        assert json.load(f) == [{"WorkspaceId": "ws-2"}]
+
+    workbook = openpyxl.load_workbook(tmp_path / "inv.xlsx")
+    assert workbook.sheetnames == ["WorkSpaces", "WorkSpaces_Encryption"]
+    for name, workspace_id in (("WorkSpaces", "ws-1"), ("WorkSpaces_Encryption", "ws-2")):
+        rows = list(workbook[name].iter_rows(values_only=True))
+        assert len(rows) == 2
+        assert workspace_id in rows[1]
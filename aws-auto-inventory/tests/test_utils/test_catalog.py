@@ -0,0 +1,66 @@
+"""
+Tests for the operation catalog.
+"""
+import botocore
+import pytest
+
+from aws_auto_inventory.utils import catalog
+from aws_auto_inventory.utils.catalog import build_catalog, get_scannable_operations, load_catalog
+
+
+def test_build_catalog():
+    """Test pagination, result keys, required parameters and read-only classification."""
+    result = build_catalog(["ec2", "s3"], max_workers=1)
+
+    assert result["botocore_version"] == botocore.__version__
+    assert list(result["services"]) == ["ec2", "s3"]
+    ec2 = result["services"]["ec2"]
+    assert ec2["describe_instances"] == {
+        "operation": "DescribeInstances",
+        "read_only": True,
+        "paginated": True,
+        "result_key": "Reservations",
+        "required_parameters": [],
+    }
+    assert ec2["describe_instance_attribute"]["required_parameters"] == ["InstanceId", "Attribute"]
+    assert ec2["run_instances"]["read_only"] is False
+    # REST APIs are classified by HTTP method
+    assert result["services"]["s3"]["head_bucket"]["read_only"] is True
+    assert result["services"]["s3"]["put_object"]["read_only"] is False
+
+
+def test_build_catalog_in_parallel():
+    """Test that building in worker processes gives the same catalog."""
+    services = ["iam", "lambda", "sqs"]
+
+    assert build_catalog(services, max_workers=2) == build_catalog(services, max_workers=1)
+
+
+def test_load_catalog_is_cached_by_botocore_version(tmp_path, monkeypatch):
+    """Test that the catalog is built once per botocore version."""
+    built = []
+
+    def fake_build_catalog(max_workers=None):
+        built.append(botocore.__version__)
+        return {"botocore_version": botocore.__version__, "services": {}}
+
+    monkeypatch.setattr(catalog, "build_catalog", fake_build_catalog)
+
+    load_catalog(str(tmp_path))
+    load_catalog(str(tmp_path))
+    assert len(built) == 1
+
+    monkeypatch.setattr(botocore, "__version__", "0.0.0")
+    load_catalog(str(tmp_path))
+    assert len(built) == 2
+    assert sorted(path.name for path in tmp_path.iterdir())[0] == "operation_catalog-0.0.0.json"
+
+
+def test_get_scannable_operations():
+    """Test that only read-only operations without required parameters are scannable."""
+    operations = get_scannable_operations(build_catalog(["sqs"], max_workers=1))
+
+    assert {"service": "sqs", "function": "list_queues", "result_key": "QueueUrls"} in operations
+    functions = {operation["function"] for operation in operations}
+    assert "get_queue_attributes" not in functions
+    assert "delete_queue" not in functions
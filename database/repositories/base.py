@@ -93,3 +93,14 @@ class BaseRepository(Generic[T]):
         """Find records by specific field value"""
         result = self.client.table(self.table_name).select('*').eq(field, value).execute()
         return [self.model_class.from_dict(item) for item in result.data]
+    
+    def find_by_field_values(self, field: str, values: List[Any], chunk_size: int = 100) -> List[T]:
+        """Find records whose field matches any of the values, in one query per chunk of values"""
+        records = []
+        values = list(dict.fromkeys(values))
+        # Chunks keep the filter within URL length limits
+        for index in range(0, len(values), chunk_size):
+            chunk = values[index:index + chunk_size]
+            result = self.client.table(self.table_name).select('*').in_(field, chunk).execute()
+            records.extend(self.model_class.from_dict(item) for item in result.data)
+        return records
@@ -19,6 +19,10 @@ class PciAwsConfigMappingRepository(BaseRepository[PciAwsConfigMapping]):
         mappings = self.find_by_field('control_id', control_id)
         return mappings[0] if mappings else None
     
+    def find_by_control_ids(self, control_ids: List[str]) -> List[PciAwsConfigMapping]:
+        """Find mappings of several PCI control IDs at once"""
+        return self.find_by_field_values('control_id', control_ids)
+    
     def find_by_config_rule(self, config_rule_name: str) -> List[PciAwsConfigMapping]:
         """Find mappings that contain a specific AWS Config rule"""
         # This requires a more complex query to search within the JSONB array
@@ -18,6 +18,10 @@ class PciControlRepository(BaseRepository[PciControl]):
         """Find records by control ID"""
         return self.find_by_field('control_id', control_id)
     
+    def find_by_control_ids(self, control_ids: List[str]) -> List[PciControl]:
+        """Find records of several control IDs at once"""
+        return self.find_by_field_values('control_id', control_ids)
+    
     def find_by_requirement(self, requirement: str) -> List[PciControl]:
         """Find records by requirement text"""
         return self.find_by_field('requirement', requirement)
@@ -1,21 +1,9 @@
-import boto3
 import json
 
+from evidence_collector import collect_config_evidence, get_rule_names
+
 def collect_aws_config_evidence(config_rules):
-    config = boto3.client('config')
-    all_evidence = {}
-    
-    for rule in config_rules:
-        rule_name = rule['rule_name']
-        try:
-            compliance_details = config.get_compliance_details_by_config_rule(
-                ConfigRuleName=rule_name
-            )
-            all_evidence[rule_name] = compliance_details
-        except Exception as e:
-            all_evidence[rule_name] = {"error": str(e)}
-    
-    return all_evidence
+    return collect_config_evidence(get_rule_names(config_rules))
 
 def main():
     # Read the JSON file with config rules
@@ -33,7 +21,7 @@ def main():
     
     # Save to evidence file
     with open('evidence/all_evidence.json', 'w') as f:
-        json.dump(result, f, indent=2)
+        json.dump(result, f, indent=2, default=str)
     
     print("Evidence collection completed successfully!")
 
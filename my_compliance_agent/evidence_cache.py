@@ -0,0 +1,136 @@
+"""
+Content-addressed cache of AWS Config rule evidence.
+
+Evidence is stored once per distinct content under objects/<sha256>.json, and
+index/<key>.json maps each (account, region, rule) to the object it last
+returned, with the time it was fetched. Many PCI controls share the same
+rules, so a batch fetches each rule once and every control reuses it until the
+TTL expires.
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import concurrent.futures
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".evidence_cache")
+DEFAULT_TTL = 3600
+
+
+class EvidenceCache:
+    """Evidence of (account, region, rule) keys, fresh for ttl seconds"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # Fetches in progress, so workers needing the same rule wait for one fetch
+        self.pending = {}
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "index"), exist_ok=True)
+
+    def get(self, account_id, region, rule_name):
+        """Get the evidence of a rule if it was fetched within the TTL, otherwise None"""
+        entry = self._read_json(self._index_path(account_id, region, rule_name))
+        if entry is None or time.time() - entry["fetched_at"] >= self.ttl:
+            return None
+
+        evidence = self._read_json(self._object_path(entry["digest"]))
+        if evidence is None:
+            return None
+
+        evidence["CollectionTiming"] = dict(entry.get("timing") or {}, cached=True)
+        return evidence
+
+    def put(self, account_id, region, rule_name, evidence):
+        """Store the evidence of a rule and return the digest of its content"""
+        content = {key: value for key, value in evidence.items() if key != "CollectionTiming"}
+        data = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            self._write(object_path, data)
+
+        entry = {
+            "account_id": account_id,
+            "region": region,
+            "rule_name": rule_name,
+            "digest": digest,
+            "fetched_at": time.time(),
+            "timing": evidence.get("CollectionTiming"),
+        }
+        self._write(self._index_path(account_id, region, rule_name), json.dumps(entry).encode("utf-8"))
+        return digest
+
+    def claim(self, account_id, region, rule_names):
+        """Split rules into those this caller must fetch and those another caller is fetching.
+
+        Returns (claimed, waiting): claimed is the list of rules to fetch and then
+        release, waiting maps the other rules to the future of their fetch.
+        """
+        claimed = []
+        waiting = {}
+        with self.lock:
+            for rule_name in rule_names:
+                key = (account_id, region, rule_name)
+                if key in self.pending:
+                    waiting[rule_name] = self.pending[key]
+                else:
+                    self.pending[key] = concurrent.futures.Future()
+                    claimed.append(rule_name)
+        return claimed, waiting
+
+    def release(self, account_id, region, rule_name, evidence):
+        """Hand the evidence of a claimed rule to the callers waiting for it"""
+        with self.lock:
+            future = self.pending.pop((account_id, region, rule_name), None)
+        if future is not None:
+            future.set_result(evidence)
+
+    def prune(self):
+        """Delete expired index entries and the objects no entry refers to. Returns the number of files deleted"""
+        deleted = 0
+        referenced = set()
+        index_dir = os.path.join(self.directory, "index")
+        for name in os.listdir(index_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(index_dir, name)
+            entry = self._read_json(path)
+            if entry is None or time.time() - entry["fetched_at"] >= self.ttl:
+                os.remove(path)
+                deleted += 1
+            else:
+                referenced.add(entry["digest"])
+
+        objects_dir = os.path.join(self.directory, "objects")
+        for name in os.listdir(objects_dir):
+            if name.endswith(".json") and name[:-len(".json")] not in referenced:
+                os.remove(os.path.join(objects_dir, name))
+                deleted += 1
+
+        return deleted
+
+    def _index_path(self, account_id, region, rule_name):
+        key = json.dumps([account_id, region, rule_name]).encode("utf-8")
+        return os.path.join(self.directory, "index", f"{hashlib.sha256(key).hexdigest()}.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", f"{digest}.json")
+
+    def _read_json(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path, data):
+        # Write atomically, so concurrent batches never read a partial file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
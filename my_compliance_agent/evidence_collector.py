@@ -0,0 +1,202 @@
+"""
+AWS Config evidence collection shared by the compliance agents.
+
+Rules are queried concurrently on one Config client. Compliance details are
+followed across every NextToken page, the summary status of all rules is read
+with batched describe_compliance_by_config_rule calls, and throttled calls are
+retried by botocore's adaptive retry mode.
+"""
+import time
+import concurrent.futures
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+# describe_compliance_by_config_rule accepts at most 25 rule names per call
+SUMMARY_BATCH_SIZE = 25
+
+# Largest page get_compliance_details_by_config_rule returns
+DETAILS_PAGE_SIZE = 100
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_ATTEMPTS = 10
+
+
+def create_config_client(session=None, region=None, max_attempts=DEFAULT_MAX_ATTEMPTS, max_workers=DEFAULT_MAX_WORKERS):
+    """Create a Config client that retries throttled calls and has a connection per worker"""
+    session = session or boto3.Session()
+    return session.client(
+        'config',
+        region_name=region,
+        config=Config(
+            retries={"max_attempts": max_attempts, "mode": "adaptive"},
+            max_pool_connections=max(10, max_workers),
+        ),
+    )
+
+
+def get_rule_names(config_rules):
+    """Get the rule names of a requirement's config_rules, in order and without duplicates"""
+    rule_names = []
+    for rule in config_rules:
+        if isinstance(rule, dict) and rule.get('rule_name'):
+            rule_names.append(rule['rule_name'])
+        elif isinstance(rule, str) and rule:
+            rule_names.append(rule)
+    return list(dict.fromkeys(rule_names))
+
+
+def collect_config_evidence(
+    rule_names, session=None, region=None, client=None, max_workers=DEFAULT_MAX_WORKERS, cache=None, account_id=None
+):
+    """Collect the compliance evidence of AWS Config rules.
+
+    With an EvidenceCache, rules fetched for the account and region within the
+    cache's TTL are reused, rules another thread is fetching are waited for, and
+    only the others are fetched. account_id is required with a cache.
+
+    Returns a dict of rule name to its evidence:
+    EvaluationResults: every evaluation result of the rule, across all pages
+    Compliance: summary status from describe_compliance_by_config_rule, if any
+    CollectionTiming: seconds spent, pages fetched and evaluations returned
+    Rules that cannot be read get {"error": message} instead.
+    """
+    rule_names = list(dict.fromkeys(rule_names))
+    if not rule_names:
+        return {}
+
+    client = client or create_config_client(session, region, max_workers=max_workers)
+
+    if cache is not None:
+        return _collect_cached(rule_names, client, max_workers, cache, account_id)
+
+    return _collect(rule_names, client, max_workers)
+
+
+def _collect_cached(rule_names, client, max_workers, cache, account_id):
+    if account_id is None:
+        raise ValueError("account_id is required to cache evidence")
+    region = client.meta.region_name
+
+    evidence = {}
+    for rule_name in rule_names:
+        cached = cache.get(account_id, region, rule_name)
+        if cached is not None:
+            evidence[rule_name] = cached
+
+    claimed, waiting = cache.claim(account_id, region, [rule_name for rule_name in rule_names if rule_name not in evidence])
+    try:
+        # A fetch may have completed between the lookup and the claim
+        for rule_name in claimed:
+            cached = cache.get(account_id, region, rule_name)
+            if cached is not None:
+                evidence[rule_name] = cached
+        to_fetch = [rule_name for rule_name in claimed if rule_name not in evidence]
+
+        fetched = _collect(to_fetch, client, max_workers) if to_fetch else {}
+        for rule_name, rule_evidence in fetched.items():
+            # Errors such as throttling are not cached, so the next control tries again
+            if "error" not in rule_evidence:
+                cache.put(account_id, region, rule_name, rule_evidence)
+        evidence.update(fetched)
+    finally:
+        for rule_name in claimed:
+            cache.release(account_id, region, rule_name, evidence.get(rule_name, {"error": "Evidence collection failed"}))
+
+    for rule_name, future in waiting.items():
+        evidence[rule_name] = future.result()
+
+    return {rule_name: evidence[rule_name] for rule_name in rule_names}
+
+
+def _collect(rule_names, client, max_workers):
+    summaries = describe_compliance(client, rule_names)
+
+    evidence = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(rule_names)))) as executor:
+        futures = {
+            executor.submit(fetch_compliance_details, client, rule_name): rule_name
+            for rule_name in rule_names
+            if not isinstance(summaries.get(rule_name), Exception)
+        }
+        for future in concurrent.futures.as_completed(futures):
+            evidence[futures[future]] = future.result()
+
+    for rule_name in rule_names:
+        summary = summaries.get(rule_name)
+        if isinstance(summary, Exception):
+            evidence[rule_name] = {"error": str(summary)}
+        elif "error" not in evidence[rule_name]:
+            evidence[rule_name]["Compliance"] = summary
+
+    # Keep the order of the requirement's rules
+    return {rule_name: evidence[rule_name] for rule_name in rule_names}
+
+
+def describe_compliance(client, rule_names):
+    """Get the summary compliance of rules, SUMMARY_BATCH_SIZE rules per call.
+
+    Returns a dict of rule name to its Compliance, None if AWS Config has no
+    result for it yet, or the exception raised for rules that cannot be read.
+    """
+    summaries = {}
+    for index in range(0, len(rule_names), SUMMARY_BATCH_SIZE):
+        batch = rule_names[index:index + SUMMARY_BATCH_SIZE]
+        try:
+            summaries.update(_describe_compliance_batch(client, batch))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "NoSuchConfigRuleException" or len(batch) == 1:
+                summaries.update({rule_name: e for rule_name in batch})
+                continue
+            # One unknown rule fails the whole call, so find it by asking for each rule alone
+            for rule_name in batch:
+                try:
+                    summaries.update(_describe_compliance_batch(client, [rule_name]))
+                except ClientError as rule_error:
+                    summaries[rule_name] = rule_error
+
+    return summaries
+
+
+def _describe_compliance_batch(client, rule_names):
+    summaries = {rule_name: None for rule_name in rule_names}
+    paginator = client.get_paginator('describe_compliance_by_config_rule')
+    for page in paginator.paginate(ConfigRuleNames=rule_names):
+        for item in page.get('ComplianceByConfigRules', []):
+            summaries[item['ConfigRuleName']] = item.get('Compliance')
+    return summaries
+
+
+def fetch_compliance_details(client, rule_name):
+    """Get every evaluation result of a rule, following NextToken, with the time it took"""
+    started = time.monotonic()
+    evaluation_results = []
+    pages = 0
+
+    try:
+        paginator = client.get_paginator('get_compliance_details_by_config_rule')
+        for page in paginator.paginate(
+            ConfigRuleName=rule_name,
+            PaginationConfig={"PageSize": DETAILS_PAGE_SIZE},
+        ):
+            pages += 1
+            evaluation_results.extend(page.get('EvaluationResults', []))
+    except (ClientError, BotoCoreError) as e:
+        return {
+            "error": str(e),
+            "CollectionTiming": _timing(started, pages, len(evaluation_results)),
+        }
+
+    return {
+        "EvaluationResults": evaluation_results,
+        "CollectionTiming": _timing(started, pages, len(evaluation_results)),
+    }
+
+
+def _timing(started, pages, evaluations):
+    return {
+        "seconds": round(time.monotonic() - started, 3),
+        "pages": pages,
+        "evaluations": evaluations,
+    }
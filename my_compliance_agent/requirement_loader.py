@@ -0,0 +1,107 @@
+"""
+Requirement loader reading PCI DSS controls and their AWS Config rule mappings
+straight from the database repositories.
+"""
+import os
+import sys
+import json
+import threading
+
+# The database package lives next to this directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+class RequirementLoader:
+    """Cache of requirement records (control_id, requirement, config_rules) for one batch.
+
+    prefetch() loads every control of the batch with two bulk queries. Controls
+    missing from the cache are looked up one by one with find_by_control_id.
+    """
+
+    def __init__(self, control_repository=None, mapping_repository=None):
+        if control_repository is None or mapping_repository is None:
+            from database.repositories import PciControlRepository, PciAwsConfigMappingRepository
+
+            control_repository = control_repository or PciControlRepository()
+            mapping_repository = mapping_repository or PciAwsConfigMappingRepository()
+
+        self.control_repository = control_repository
+        self.mapping_repository = mapping_repository
+        self.requirements = {}
+        self.config_rules = {}
+        # Controls the database was already asked for and does not know
+        self.missing = set()
+        self.lock = threading.Lock()
+
+    def prefetch(self, control_ids=None):
+        """Load the controls and mappings of a batch, or of every control if control_ids is None.
+
+        Returns the number of controls with a requirement or a mapping.
+        """
+        if control_ids is None:
+            controls = self.control_repository.find_all()
+            mappings = self.mapping_repository.find_all()
+        else:
+            controls = self.control_repository.find_by_control_ids(control_ids)
+            mappings = self.mapping_repository.find_by_control_ids(control_ids)
+
+        with self.lock:
+            for control in controls:
+                # A control has one row per chunk of its text; any row with a requirement will do
+                if control.requirement and not self.requirements.get(control.control_id):
+                    self.requirements[control.control_id] = control.requirement
+            for mapping in mappings:
+                self.config_rules.setdefault(mapping.control_id, mapping.config_rules or [])
+
+            found = set(self.requirements) | set(self.config_rules)
+            self.missing.update(control_id for control_id in control_ids or [] if control_id not in found)
+
+            return len(found)
+
+    def get(self, control_id):
+        """Get the requirement record of a control, or None if the database does not know it"""
+        with self.lock:
+            cached = control_id in self.requirements or control_id in self.config_rules or control_id in self.missing
+
+        if not cached:
+            controls = self.control_repository.find_by_control_id(control_id)
+            mapping = self.mapping_repository.find_by_control_id(control_id)
+
+            with self.lock:
+                requirement = next((control.requirement for control in controls if control.requirement), None)
+                if requirement:
+                    self.requirements[control_id] = requirement
+                if mapping is not None:
+                    self.config_rules[control_id] = mapping.config_rules or []
+
+        with self.lock:
+            if control_id not in self.requirements and control_id not in self.config_rules:
+                self.missing.add(control_id)
+                return None
+
+            return {
+                "control_id": control_id,
+                "requirement": self.requirements.get(control_id),
+                "config_rules": self.config_rules.get(control_id, []),
+            }
+
+    def write_requirement_file(self, control_id, path):
+        """Write the requirement file of a control, in the format the audit agents read.
+
+        Returns the record written, or None if the database does not know the control.
+        """
+        record = self.get(control_id)
+        if record is None:
+            return None
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(record, f, indent=2)
+
+        return record
+
+    def get_mapped_control_ids(self):
+        """Get every control ID with AWS Config rule mappings"""
+        return self.mapping_repository.get_all_control_ids()